@@ -0,0 +1,132 @@
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+
+class AnswerCache:
+    """분석 결과 캐시 (정규화 입력 + 검색된 청크 ID 집합 키, 유사 질의는 임베딩 코사인 유사도로 매칭)
+
+    청크 ID 는 내용 해시 기반이므로 인덱스 내용이 바뀌면 검색 결과의 ID 집합이 달라져 자연히 다른 키가 된다.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600.0, similarity_threshold: float = 0.97):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        return " ".join(unicodedata.normalize("NFC", text).split()).lower()
+
+    @staticmethod
+    def make_context_key(chunk_ids: List[str]) -> str:
+        return hashlib.sha256("\n".join(sorted(chunk_ids)).encode("utf-8")).hexdigest()
+
+    @classmethod
+    def make_key(cls, user_input: str, chunk_ids: List[str]) -> str:
+        text_hash = hashlib.sha256(cls.normalize_text(user_input).encode("utf-8")).hexdigest()
+        return f"{text_hash}:{cls.make_context_key(chunk_ids)}"
+
+    def get(self, user_input: str, chunk_ids: List[str],
+            query_embedding: Union[List[float], Callable[[], Optional[List[float]]], None] = None) -> Optional[Dict]:
+        """캐시 조회 (정확히 같은 입력 → 같은 컨텍스트의 유사 입력 순)
+
+        query_embedding 이 함수이면 정확한 키가 없을 때만 (잠금 밖에서) 호출한다.
+        """
+        key = self.make_key(user_input, chunk_ids)
+        context_key = self.make_context_key(chunk_ids)
+        now = time.monotonic()
+
+        with self._lock:
+            self._purge_expired(now)
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        if callable(query_embedding):
+            query_embedding = query_embedding()
+
+        with self._lock:
+            if query_embedding:
+                match_key = self._find_similar(context_key, query_embedding)
+                if match_key is not None:
+                    self._entries.move_to_end(match_key)
+                    self.similar_hits += 1
+                    return self._entries[match_key]
+
+            self.misses += 1
+            return None
+
+    def put(self, user_input: str, chunk_ids: List[str], query_embedding: Optional[List[float]],
+            text: str, usage: Optional[Dict] = None):
+        vector = None
+        if query_embedding:
+            vector = np.asarray(query_embedding, dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            vector = vector / norm if norm else None
+
+        entry = {
+            "text": text,
+            "usage": usage,
+            "context_key": self.make_context_key(chunk_ids),
+            "vector": vector,
+            "created_at": time.monotonic()
+        }
+        key = self.make_key(user_input, chunk_ids)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """인덱스가 바뀌었을 때 전체 무효화"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses
+            }
+
+    def _find_similar(self, context_key: str, query_embedding: List[float]) -> Optional[str]:
+        candidates = [
+            (key, entry["vector"]) for key, entry in self._entries.items()
+            if entry["context_key"] == context_key and entry["vector"] is not None
+        ]
+        if not candidates:
+            return None
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if not norm:
+            return None
+
+        similarities = np.stack([vector for _, vector in candidates]) @ (query / norm)
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.similarity_threshold:
+            return candidates[best][0]
+        return None
+
+    def _purge_expired(self, now: float):
+        expired = [key for key, entry in self._entries.items() if now - entry["created_at"] > self.ttl]
+        for key in expired:
+            del self._entries[key]
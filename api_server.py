@@ -0,0 +1,185 @@
+"""유사 과제 검색/요구사항 분석 HTTP API
+
+Streamlit 화면 없이 다른 도구에서 검색, 분석(스트리밍), 문서 인제스트를 호출할 수 있도록 한다.
+워커 프로세스마다 get_app_services() 로 클라이언트 풀/캐시/처리기를 한 번만 만들어 모든 요청이 공유하고,
+동기 SDK 호출은 스레드 풀에서 실행해 이벤트 루프를 막지 않는다.
+
+사용법:
+    python api_server.py --port 8080 --workers 4
+    uvicorn api_server:app --port 8080 --workers 4
+
+엔드포인트:
+    POST /search    {"query", "top_k", "filters"} -> 유사 과제 목록
+    POST /analyze   {"title", "requirements", "top_k", "filters", "stream"} -> NDJSON 스트림 (stream=false 이면 JSON)
+    POST /ingest    multipart 파일 + project_type/technology/department 폼 필드
+    GET  /metrics   단계별 지연/토큰 사용량, 할당량 스케줄러 상태 (Prometheus 텍스트 형식)
+    GET  /healthz   프로세스 상태
+
+filters 는 {"project_type" | "technology" | "department": 값 또는 값 목록, "date_from" | "date_to": "YYYY-MM-DD"}
+형식이며, 그 외의 키나 잘못된 값/날짜는 422 로 거절한다.
+"""
+import argparse
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+import anyio
+import uvicorn
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, field_validator
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from chatbot import AppServices, Config, get_app_services, logger
+from retrieval import validate_filters
+
+# 검색 결과로 내보내는 필드 (질의 벡터 등 내부 값 제외)
+PROJECT_FIELDS = (
+    "chunk_id", "filename", "chunk", "project_type", "technology", "department", "score", "matched_identifiers"
+)
+
+
+class FilteredRequest(BaseModel):
+    filters: Optional[Dict] = None
+
+    @field_validator("filters")
+    @classmethod
+    def check_filters(cls, filters: Optional[Dict]) -> Optional[Dict]:
+        # 허용 필드/값 형식/날짜를 검색 전에 검증 (잘못되면 422)
+        return validate_filters(filters)
+
+
+class SearchRequest(FilteredRequest):
+    query: str = Field(min_length=1)
+    top_k: int = Field(default=2, ge=1, le=20)
+
+
+class AnalyzeRequest(FilteredRequest):
+    title: str = ""
+    requirements: str = Field(min_length=1)
+    top_k: int = Field(default=2, ge=1, le=20)
+    stream: bool = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    missing_vars = Config.get_missing_vars()
+    if missing_vars:
+        raise RuntimeError(f"Missing environment variables: {', '.join(missing_vars)}")
+    # 동기 호출용 스레드 수를 HTTP 커넥션 풀 크기에 맞춤 (풀보다 많으면 커넥션을 버리고 다시 맺음)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = Config.API_THREAD_LIMIT
+    app.state.services = await run_in_threadpool(get_app_services)
+    yield
+    # /ingest 가 재사용하던 비동기 클라이언트는 만든 이벤트 루프에서 닫음
+    await app.state.services.ingestion_engine.aclose()
+
+
+app = FastAPI(title="KOS Billing AI ChatBot API", lifespan=lifespan)
+
+
+def services() -> AppServices:
+    return app.state.services
+
+
+def to_project(project: Dict) -> Dict:
+    return {field: project.get(field) for field in PROJECT_FIELDS if field in project}
+
+
+@app.get("/healthz")
+async def healthz() -> Dict:
+    return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(services().to_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/search")
+async def search(request: SearchRequest) -> Dict:
+    start = time.perf_counter()
+    projects = await run_in_threadpool(
+        services().project_analyzer.search_similar_projects, request.query, request.top_k, request.filters or None
+    )
+    return {
+        "results": [to_project(project) for project in projects],
+        "search_ms": (time.perf_counter() - start) * 1000
+    }
+
+
+@app.post("/analyze")
+async def analyze(request: AnalyzeRequest):
+    project_analyzer = services().project_analyzer
+    start = time.perf_counter()
+    # 화면의 분석 탭과 같은 방식: 검색은 제목 + 요구사항, 분석은 요구사항
+    projects = await run_in_threadpool(
+        project_analyzer.search_similar_projects,
+        f"{request.title} {request.requirements}", request.top_k, request.filters or None
+    )
+    searched = time.perf_counter()
+    stream = await run_in_threadpool(project_analyzer.analyze_requirements_stream, request.requirements, projects)
+
+    def summary() -> Dict:
+        # 스트림 도중 오류는 앞부분 + 오류 문구가 되므로 텍스트 비교가 아닌 failed 플래그로 판단
+        return {
+            "status": "failed" if stream.failed else "ok",
+            "cached": stream.cached,
+            "coalesced": stream.coalesced,
+            "usage": stream.usage,
+            "timings": {
+                "search_ms": (searched - start) * 1000,
+                "first_token_ms": stream.time_to_first_token * 1000 if stream.time_to_first_token is not None else None,
+                "total_ms": (time.perf_counter() - start) * 1000
+            }
+        }
+
+    if not request.stream:
+        analysis = "".join(await run_in_threadpool(list, stream))
+        result = {"similar_projects": [to_project(project) for project in projects], "analysis": analysis, **summary()}
+        if result["status"] != "ok":
+            raise HTTPException(status_code=502, detail=result)
+        return result
+
+    async def events() -> AsyncIterator[str]:
+        # NDJSON: 유사 과제 -> 생성되는 대로 텍스트 조각 -> 사용량/소요 시간
+        yield json.dumps({"type": "similar_projects", "data": [to_project(project) for project in projects]}, ensure_ascii=False) + "\n"
+        async for text in iterate_in_threadpool(iter(stream)):
+            yield json.dumps({"type": "delta", "text": text}, ensure_ascii=False) + "\n"
+        yield json.dumps({"type": "done", **summary()}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.post("/ingest")
+async def ingest(files: List[UploadFile] = File(...), project_type: str = Form("Billing"),
+                 technology: str = Form(""), department: str = Form("DEV")) -> Dict:
+    app_services = services()
+    metadata = {"project_type": project_type, "technology": technology, "department": department}
+    # 업로드 파일(SpooledTemporaryFile)을 그대로 넘겨 큰 파일은 스트리밍 인제스트
+    entries = [(file.filename, file.file, dict(metadata)) for file in files]
+
+    # 화면 업로드와 같은 비동기 인제스트 엔진 (네트워크 I/O 는 이벤트 루프, 청킹/토큰화/역색인 갱신은 스레드에서 실행)
+    results = await app_services.ingestion_engine.ingest_files(entries)
+    app_services.service_monitor.invalidate()
+    if app_services.project_analyzer.answer_cache:
+        app_services.project_analyzer.answer_cache.invalidate()
+
+    failed = [result["filename"] for result in results if not result["uploaded"] or result["error"]]
+    if failed:
+        logger.warning(f"Ingest failed for {len(failed)} file(s): {', '.join(failed)}")
+    return {"results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="유사 과제 검색/분석 HTTP API 서버를 실행합니다.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=Config.API_WORKERS, help="워커 프로세스 수")
+    args = parser.parse_args(argv)
+    # 여러 워커를 띄우려면 앱을 import 문자열로 넘겨야 함
+    uvicorn.run("api_server:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
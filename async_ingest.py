@@ -0,0 +1,344 @@
+import asyncio
+import atexit
+import io
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import BinaryIO, Dict, List, Tuple, Union
+
+from embedding_batch import embedding_options, fill_embeddings, split_rejected_batch
+from rate_limiter import BACKGROUND
+from tracing import payload_size
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncIngestionEngine:
+    """비동기 문서 인제스트 엔진
+
+    Blob 업로드, 배치 임베딩, AI Search 업로드를 동시 실행 수 제한 안에서 겹쳐 실행한다.
+    청킹/임베딩 배치 구성은 DocumentProcessor 를 그대로 사용한다.
+    파일 내용은 bytes 또는 읽기 가능한 파일 객체이며, STREAMING_INGEST_THRESHOLD 보다 큰 파일 객체는
+    DocumentProcessor.ingest_stream 으로 한 번에 하나씩 스트리밍 처리한다 (메모리 사용량이 파일 크기와 무관).
+    비동기 클라이언트(OpenAI/Blob/AI Search)는 처음 인제스트할 때 한 번 만들어, 같은 이벤트 루프의 호출이 모두 재사용한다.
+    """
+
+    def __init__(self, document_processor, config, concurrency: int = 8):
+        self.document_processor = document_processor
+        self.config = config
+        self.concurrency = max(1, concurrency)
+        self._clients = None
+        self._clients_loop = None
+        # run() 호출이 공유하는 이벤트 루프 (호출마다 루프를 새로 만들면 클라이언트를 재사용할 수 없음)
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    def run(self, files: List[Tuple[str, Union[bytes, BinaryIO], Dict]]) -> List[Dict]:
+        """동기 코드(Streamlit 등)에서 호출용 (엔진 전용 이벤트 루프 스레드에서 실행)"""
+        return asyncio.run_coroutine_threadsafe(self.ingest_files(files), self._background_loop()).result()
+
+    async def ingest_files(self, files: List[Tuple[str, Union[bytes, BinaryIO], Dict]]) -> List[Dict]:
+        """여러 파일을 동시에 인제스트하고 파일별 결과 반환"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # 대용량 파일은 하나씩 (파일마다 업로드 블록/임베딩 배치만큼 메모리를 쓰므로)
+        stream_semaphore = asyncio.Semaphore(1)
+
+        loop = asyncio.get_running_loop()
+        if self._clients is None:
+            self._clients, self._clients_loop = self._create_clients(), loop
+        # 클라이언트는 만든 루프에 묶이므로, 다른 루프에서 호출하면 이번 호출에서만 쓰고 닫음
+        shared = self._clients_loop is loop
+        clients = self._clients if shared else self._create_clients()
+
+        try:
+            return await asyncio.gather(*[
+                self._dispatch_file(clients, semaphore, stream_semaphore, filename, file_content, metadata)
+                for filename, file_content, metadata in files
+            ])
+        finally:
+            if not shared:
+                await self._close_clients(clients)
+
+    async def aclose(self):
+        """재사용 중인 비동기 클라이언트 종료 (클라이언트를 만든 이벤트 루프에서 호출)"""
+        clients, self._clients, self._clients_loop = self._clients, None, None
+        if clients is not None:
+            await self._close_clients(clients)
+
+    def close(self):
+        """run() 용 이벤트 루프의 클라이언트를 닫고 루프 종료 (프로세스 종료 시 자동 호출)"""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._clients_loop is loop:
+            asyncio.run_coroutine_threadsafe(self.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="async-ingest", daemon=True).start()
+                atexit.register(self.close)
+            return self._loop
+
+    def _create_clients(self) -> Tuple:
+        # 비동기 SDK 는 인제스트할 때만 import (앱 시작 시간 단축)
+        from azure.core.credentials import AzureKeyCredential
+        from azure.search.documents.aio import SearchClient
+        from azure.storage.blob.aio import BlobServiceClient
+        from openai import AsyncAzureOpenAI
+
+        config = self.config
+        openai_client = AsyncAzureOpenAI(
+            api_key=config.AZURE_OPENAI_KEY,
+            api_version=config.AZURE_OPENAI_API_VERSION,
+            azure_endpoint=config.AZURE_OPENAI_ENDPOINT,
+            # 429/일시 오류 재시도는 DocumentProcessor 의 RateLimiter 가 처리
+            max_retries=0
+        )
+        blob_service_client = BlobServiceClient.from_connection_string(config.BLOB_CONNECTION_STRING)
+        search_client = SearchClient(
+            endpoint=config.SEARCH_SERVICE_ENDPOINT,
+            index_name=config.SEARCH_INDEX_NAME,
+            credential=AzureKeyCredential(config.SEARCH_API_KEY)
+        )
+        return openai_client, blob_service_client, search_client
+
+    @staticmethod
+    async def _close_clients(clients: Tuple):
+        for client in clients:
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Error closing ingestion client: {str(e)}")
+
+    async def _dispatch_file(self, clients, semaphore: asyncio.Semaphore, stream_semaphore: asyncio.Semaphore,
+                             filename: str, file_content: Union[bytes, BinaryIO], metadata: Dict) -> Dict:
+        """작은 파일은 메모리로 읽어 비동기 경로로, 큰 파일 객체는 스트리밍 경로로 처리"""
+        if isinstance(file_content, (bytes, bytearray)):
+            return await self._ingest_file(clients, semaphore, filename, bytes(file_content), metadata)
+
+        size = self._stream_size(file_content)
+        if size is not None and size <= self.config.STREAMING_INGEST_THRESHOLD:
+            file_content = await asyncio.to_thread(file_content.read)
+            return await self._ingest_file(clients, semaphore, filename, file_content, metadata)
+
+        async with stream_semaphore:
+            return await self._ingest_stream(filename, file_content, metadata)
+
+    async def _ingest_stream(self, filename: str, file_stream: BinaryIO, metadata: Dict) -> Dict:
+        result = {"filename": filename, "uploaded": False, "indexed_chunks": 0,
+                  "unchanged_chunks": 0, "deleted_chunks": 0, "failed_chunks": 0, "error": None}
+        try:
+            # 동기 파이프라인(블록 업로드 + 배치 임베딩/인덱싱)을 스레드에서 실행
+            stats = await asyncio.to_thread(self.document_processor.ingest_stream, filename, file_stream, metadata)
+            result.update({
+                "uploaded": stats["uploaded"],
+                "indexed_chunks": stats["embedded"],
+                "unchanged_chunks": stats["unchanged"],
+                "deleted_chunks": stats["deleted"],
+                "failed_chunks": stats["failed"]
+            })
+            if stats["failed"]:
+                result["error"] = f"{stats['failed']} chunk(s) could not be embedded"
+        except Exception as e:
+            logger.error(f"Error ingesting {filename}: {str(e)}")
+            result["error"] = str(e)
+        return result
+
+    @staticmethod
+    def _stream_size(file_stream: BinaryIO):
+        """파일 객체의 남은 크기 (알 수 없으면 None → 스트리밍 처리)"""
+        size = getattr(file_stream, "size", None)
+        if isinstance(size, int):
+            return size
+        try:
+            position = file_stream.tell()
+            end = file_stream.seek(0, os.SEEK_END)
+            file_stream.seek(position)
+            return end - position
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return None
+
+    async def _ingest_file(self, clients, semaphore: asyncio.Semaphore, filename: str,
+                           file_content: bytes, metadata: Dict) -> Dict:
+        openai_client, blob_service_client, search_client = clients
+        result = {
+            "filename": filename,
+            "uploaded": False,
+            "indexed_chunks": 0,
+            "unchanged_chunks": 0,
+            "deleted_chunks": 0,
+            "failed_chunks": 0,
+            "error": None
+        }
+
+        try:
+            metadata = dict(metadata)
+            metadata.update({
+                "upload_date": datetime.now().isoformat(),
+                "processed": "false"
+            })
+
+            upload_task = asyncio.create_task(
+                self._upload_blob(blob_service_client, semaphore, filename, file_content, metadata)
+            )
+
+            # 텍스트 추출/청킹/토큰화/역색인 갱신은 CPU 작업이므로 모두 스레드에서 실행 (API 이벤트 루프를 막지 않도록)
+            entries_by_id = await asyncio.to_thread(self._chunk_file, filename, file_content, metadata)
+
+            # 인덱스에 이미 있는 청크는 건너뛰고 새로 생기거나 바뀐 청크만 임베딩
+            existing = await self._get_indexed_chunk_ids(
+                search_client, semaphore, sorted({name for name, _, _ in entries_by_id.values()})
+            )
+            entries = [entry for chunk_id, entry in entries_by_id.items() if chunk_id not in existing]
+            await asyncio.to_thread(self._index_unchanged, entries_by_id, existing & set(entries_by_id))
+            result["unchanged_chunks"] = len(entries_by_id) - len(entries)
+            texts = [chunk for _, chunk, _ in entries]
+            embeddings: List[List[float]] = [[] for _ in texts]
+            missing = await asyncio.to_thread(
+                self.document_processor.fill_cached_embeddings, texts, list(range(len(texts))), embeddings
+            )
+            batches = await asyncio.to_thread(
+                lambda: list(self.document_processor.iter_embedding_batches(texts, missing))
+            )
+
+            # 캐시 적중분은 바로 업로드, 나머지는 배치별로 임베딩 → 업로드
+            cached_indices = [i for i in range(len(texts)) if embeddings[i]]
+            batch_size = self.config.EMBEDDING_BATCH_SIZE
+            batch_tasks = [
+                self._index_batch(search_client, semaphore, entries, embeddings, cached_indices[start:start + batch_size])
+                for start in range(0, len(cached_indices), batch_size)
+            ]
+            batch_tasks += [
+                self._embed_and_index_batch(openai_client, search_client, semaphore, entries, texts, embeddings, batch)
+                for batch in batches
+            ]
+            indexed_counts = await asyncio.gather(*batch_tasks)
+
+            await asyncio.to_thread(self.document_processor.store_cached_embeddings, texts, missing, embeddings)
+
+            # 이전 버전에만 있던 청크는 한 번에 삭제
+            stale = sorted(existing - set(entries_by_id))
+            if stale:
+                async with semaphore:
+                    await search_client.delete_documents([{"chunk_id": chunk_id} for chunk_id in stale])
+                await asyncio.to_thread(self.document_processor.remove_from_indexes, stale)
+            result["deleted_chunks"] = len(stale)
+            if self.document_processor.autosave_indexes:
+                await asyncio.to_thread(self.document_processor.save_indexes)
+
+            result["uploaded"] = await upload_task
+            result["indexed_chunks"] = sum(indexed_counts)
+            # 임베딩하지 못해 올리지 못한 청크는 실패로 보고 (다시 인제스트하면 빠진 청크만 처리)
+            result["failed_chunks"] = len(entries) - result["indexed_chunks"]
+            if result["failed_chunks"]:
+                result["error"] = f"{result['failed_chunks']} chunk(s) could not be embedded"
+            logger.info(
+                f"Indexed {filename}: {result['indexed_chunks']} new, {result['unchanged_chunks']} unchanged, "
+                f"{result['deleted_chunks']} deleted, {result['failed_chunks']} failed chunks"
+            )
+        except Exception as e:
+            logger.error(f"Error ingesting {filename}: {str(e)}")
+            result["error"] = str(e)
+
+        return result
+
+    def _chunk_file(self, filename: str, file_content: bytes, metadata: Dict) -> Dict[str, Tuple[str, str, Dict]]:
+        """청크 ID → (문서명, 청크, 메타데이터) (스레드에서 실행)"""
+        return {
+            self.document_processor.make_chunk_id(name, chunk): (name, chunk, chunk_metadata)
+            for name, chunk, chunk_metadata in self.document_processor.iter_document_chunks(filename, file_content, metadata)
+        }
+
+    def _index_unchanged(self, entries_by_id: Dict[str, Tuple[str, str, Dict]], chunk_ids: set):
+        """이미 인덱스에 있는 청크도 식별자 역색인에 등록 (스레드에서 실행)"""
+        for chunk_id in chunk_ids:
+            self.document_processor.index_identifiers(chunk_id, entries_by_id[chunk_id][1])
+
+    async def _get_indexed_chunk_ids(self, search_client, semaphore: asyncio.Semaphore,
+                                     filenames: List[str], batch_size: int = 50) -> set:
+        """파일명별로 현재 인덱스에 있는 청크 ID 조회 (실패 시 빈 집합 → 전체 업로드)"""
+        chunk_ids = set()
+        try:
+            for start in range(0, len(filenames), batch_size):
+                async with semaphore:
+                    results = await search_client.search(
+                        search_text="*",
+                        filter=self.document_processor.build_filename_filter(filenames[start:start + batch_size]),
+                        select=["chunk_id"]
+                    )
+                    async for item in results:
+                        chunk_ids.add(item["chunk_id"])
+        except Exception as e:
+            logger.warning(f"Error listing indexed chunks: {str(e)}")
+        return chunk_ids
+
+    async def _upload_blob(self, blob_service_client, semaphore: asyncio.Semaphore, filename: str,
+                           file_content: bytes, metadata: Dict) -> bool:
+        async with semaphore:
+            try:
+                blob_client = blob_service_client.get_blob_client(
+                    container=self.config.BLOB_CONTAINER_NAME,
+                    blob=filename
+                )
+                with self.document_processor.tracer.span("blob_upload", bytes=len(file_content)):
+                    await blob_client.upload_blob(file_content, metadata=metadata, overwrite=True)
+                return True
+            except Exception as e:
+                logger.error(f"Error uploading document: {str(e)}")
+                return False
+
+    async def _embed_and_index_batch(self, openai_client, search_client, semaphore: asyncio.Semaphore,
+                                     entries, texts: List[str], embeddings: List[List[float]], batch: List[int]) -> int:
+        await self._embed_batch(openai_client, semaphore, texts, batch, embeddings)
+        return await self._index_batch(search_client, semaphore, entries, embeddings, batch)
+
+    async def _embed_batch(self, openai_client, semaphore: asyncio.Semaphore, texts: List[str],
+                           batch: List[int], embeddings: List[List[float]]):
+        """배치 임베딩 요청 (429/일시 오류 재시도는 rate_limiter, 입력 오류 분할은 split_rejected_batch 가 담당)"""
+        inputs = [texts[i] for i in batch]
+        n_tokens = await asyncio.to_thread(self.document_processor.count_tokens, inputs)
+
+        async def create():
+            async with semaphore:
+                return await openai_client.embeddings.create(input=inputs, **embedding_options(self.config))
+
+        try:
+            # 할당량 순서를 먼저 받고 나서 동시 실행 슬롯을 잡음 (대기 중에 Blob/Search 업로드를 막지 않도록)
+            tracer = self.document_processor.tracer
+            with tracer.span("chunk_embedding", inputs=len(inputs), bytes=payload_size(inputs)) as span:
+                response = await self.document_processor.rate_limiter.call_async(
+                    create, n_tokens, BACKGROUND
+                )
+                span.set_usage(response.usage)
+        except Exception as e:
+            await asyncio.gather(*[
+                self._embed_batch(openai_client, semaphore, texts, part, embeddings)
+                for part in split_rejected_batch(e, batch)
+            ])
+            return
+
+        fill_embeddings(response, batch, embeddings)
+
+    async def _index_batch(self, search_client, semaphore: asyncio.Semaphore, entries,
+                           embeddings: List[List[float]], batch: List[int]) -> int:
+        documents = []
+        for i in batch:
+            name, chunk, metadata = entries[i]
+            document = self.document_processor.build_search_document(name, chunk, embeddings[i], metadata)
+            if document is None:
+                logger.error(f"Failed to embed a chunk of {name}, marking it as failed.")
+                continue
+            documents.append(document)
+
+        if not documents:
+            return 0
+        async with semaphore:
+            with self.document_processor.tracer.span("search_upload", documents=len(documents)):
+                await search_client.merge_or_upload_documents(documents)
+        await asyncio.to_thread(self.document_processor.add_to_indexes, documents)
+        return len(documents)
@@ -0,0 +1,230 @@
+"""JSONL 요청 파일 일괄 분석 CLI
+
+한 줄에 요청 하나({"title", "requirements", "filters"})를 읽어 유사 과제 검색 + 요구사항 분석을
+여러 작업자로 동시에 실행하고, 끝나는 대로 결과를 JSONL 로 기록한다 (요청별 소요 시간/토큰 사용량 포함).
+출력 파일에 성공으로 기록된 요청은 다시 실행하지 않으므로, 중단된 뒤 같은 명령으로 이어서 실행할 수 있다.
+
+사용법:
+    python batch_analyze.py requests.jsonl --output results.jsonl --workers 4
+    python batch_analyze.py requests.jsonl --output results.jsonl --limit 50   # 이어서 50건만 실행
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Iterator, List, Set, Tuple
+
+from chatbot import Config, ProjectAnalyzer, get_app_services, logger
+from retrieval import InvalidFilterError, validate_filters
+
+# 요청 ID / 요구사항 본문으로 인식하는 필드 (앞쪽 우선)
+ID_FIELDS = ("request_id", "id")
+REQUIREMENT_FIELDS = ("requirements", "body")
+
+
+def read_requests(path: str) -> Iterator[Tuple[str, Dict]]:
+    """(요청 ID, 레코드) 생성 (ID 필드가 없으면 줄 번호 사용, 빈 줄은 건너뜀)"""
+    with open(path, encoding="utf-8-sig") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"Invalid JSON at {path}:{line_number}: {str(e)}")
+                continue
+            request_id = next((str(record[field]) for field in ID_FIELDS if record.get(field)), f"line-{line_number}")
+            yield request_id, record
+
+
+def load_completed(path: str) -> Set[str]:
+    """이전 실행에서 성공한 요청 ID (중단으로 잘린 마지막 줄은 무시)"""
+    completed = set()
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if result.get("status") == "ok":
+                completed.add(result["id"])
+    return completed
+
+
+class ResultWriter:
+    """결과를 한 줄씩 추가하고 바로 flush (여러 작업자 스레드에서 호출)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        needs_newline = os.path.exists(path) and os.path.getsize(path) > 0 and not self._ends_with_newline(path)
+        self._file = open(path, "a", encoding="utf-8")
+        if needs_newline:
+            self._file.write("\n")
+
+    @staticmethod
+    def _ends_with_newline(path: str) -> bool:
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def write(self, result: Dict):
+        line = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class BatchAnalyzer:
+    """요청 레코드별 검색 + 분석 실행"""
+
+    def __init__(self, project_analyzer: ProjectAnalyzer, top_k: int = 2):
+        self.project_analyzer = project_analyzer
+        self.top_k = top_k
+
+    def analyze(self, request_id: str, record: Dict) -> Dict:
+        title = (record.get("title") or "").strip()
+        requirements = next((record[field] for field in REQUIREMENT_FIELDS if record.get(field)), "").strip()
+        if not requirements:
+            return {"id": request_id, "title": title, "status": "failed", "error": "요구사항이 비어 있습니다."}
+        try:
+            filters = validate_filters(record.get("filters"))
+        except InvalidFilterError as e:
+            return {"id": request_id, "title": title, "status": "failed", "error": f"검색 필터 오류: {str(e)}"}
+
+        start = time.perf_counter()
+        # 화면의 분석 탭과 같은 방식: 검색은 제목 + 요구사항, 분석은 요구사항
+        similar_projects = self.project_analyzer.search_similar_projects(
+            f"{title} {requirements}", top_k=self.top_k, filters=filters
+        )
+        searched = time.perf_counter()
+
+        # 스트리밍 응답을 끝까지 읽어 토큰 사용량(usage)과 첫 토큰 시간을 함께 얻음
+        stream = self.project_analyzer.analyze_requirements_stream(requirements, similar_projects)
+        analysis = "".join(stream)
+        finished = time.perf_counter()
+
+        return {
+            "id": request_id,
+            "title": title,
+            # 중간에 끊긴 스트림은 앞부분 + 오류 문구이므로 문자열 비교 대신 failed 로 판단 (다음 실행에서 재시도)
+            "status": "failed" if stream.failed else "ok",
+            "similar_projects": [
+                {
+                    "chunk_id": project.get("chunk_id"),
+                    "filename": project.get("filename"),
+                    "score": project.get("score"),
+                    "matched_identifiers": project.get("matched_identifiers")
+                }
+                for project in similar_projects
+            ],
+            "analysis": analysis,
+            "cached": stream.cached,
+            "coalesced": stream.coalesced,
+            "usage": stream.usage,
+            "timings": {
+                "search_ms": (searched - start) * 1000,
+                "analysis_ms": (finished - searched) * 1000,
+                "first_token_ms": stream.time_to_first_token * 1000 if stream.time_to_first_token is not None else None,
+                "total_ms": (finished - start) * 1000
+            },
+            "finished_at": datetime.now().isoformat()
+        }
+
+    def run(self, requests: List[Tuple[str, Dict]], writer: ResultWriter, workers: int) -> Dict:
+        counts = {"ok": 0, "failed": 0}
+        tokens = 0
+        start = time.perf_counter()
+
+        executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        try:
+            futures = {executor.submit(self.analyze, request_id, record): request_id for request_id, record in requests}
+            for future in as_completed(futures):
+                request_id = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Error analyzing {request_id}: {str(e)}")
+                    result = {"id": request_id, "status": "failed", "error": str(e)}
+                writer.write(result)
+                counts[result["status"]] += 1
+                tokens += (result.get("usage") or {}).get("total_tokens") or 0
+                total_ms = result.get("timings", {}).get("total_ms")
+                print(f"[{result['status']:>6}] {request_id}" + (f" ({total_ms / 1000:.1f}s)" if total_ms else ""))
+        finally:
+            # 중단(Ctrl+C) 시 대기 중인 요청은 취소 (기록되지 않은 요청은 다음 실행에서 다시 처리)
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        elapsed = time.perf_counter() - start
+        processed = counts["ok"] + counts["failed"]
+        return {
+            **counts,
+            "tokens": tokens,
+            "elapsed_sec": elapsed,
+            "requests_per_min": processed / elapsed * 60 if elapsed else 0.0
+        }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="JSONL 요청 파일의 과제를 일괄 분석합니다.")
+    parser.add_argument("input", help="요청 JSONL 파일 (예: requests.jsonl)")
+    parser.add_argument("--output", help="결과 JSONL 경로 (기본: <input>.results.jsonl)")
+    parser.add_argument("--workers", type=int, default=4, help="동시에 분석할 요청 수")
+    parser.add_argument("--top-k", type=int, default=2, help="요청별 유사 과제 수")
+    parser.add_argument("--limit", type=int, help="이번 실행에서 처리할 최대 요청 수")
+    return parser.parse_args(argv)
+
+
+def default_output_path(input_path: str) -> str:
+    stem, _ = os.path.splitext(input_path)
+    return f"{stem}.results.jsonl"
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if not os.path.isfile(args.input):
+        print(f"요청 파일을 찾을 수 없습니다: {args.input}", file=sys.stderr)
+        return 2
+
+    missing_vars = Config.get_missing_vars()
+    if missing_vars:
+        print(f"다음 환경변수가 설정되지 않았습니다: {', '.join(missing_vars)}", file=sys.stderr)
+        return 2
+
+    output = args.output or default_output_path(args.input)
+    completed = load_completed(output)
+    pending = [(request_id, record) for request_id, record in read_requests(args.input) if request_id not in completed]
+    if args.limit is not None:
+        pending = pending[:args.limit]
+    print(f"완료 {len(completed)}건 건너뜀, {len(pending)}건 분석 -> {output}")
+    if not pending:
+        return 0
+
+    batch_analyzer = BatchAnalyzer(get_app_services().project_analyzer, top_k=args.top_k)
+    writer = ResultWriter(output)
+    try:
+        summary = batch_analyzer.run(pending, writer, args.workers)
+    finally:
+        writer.close()
+
+    print(f"\n성공 {summary['ok']} / 실패 {summary['failed']}")
+    print(
+        f"{summary['elapsed_sec']:.1f}s, {summary['requests_per_min']:.1f} requests/min, "
+        f"{summary['tokens']} tokens"
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""청킹 마이크로 벤치마크: 기존 chunk_text vs TextChunker
+
+사용법:
+    python benchmarks/bench_chunking.py --repeat 5 --scale 1 10
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import tiktoken
+
+from chunker import TextChunker
+
+
+def legacy_chunk_text(tokenizer, text: str, max_tokens: int = 1000) -> List[str]:
+    """기존 DocumentProcessor.chunk_text 구현 (비교 기준)"""
+    sentences = text.split('.')
+    chunks = []
+    current_chunk = ""
+
+    for sentence in sentences:
+        test_chunk = current_chunk + sentence + "."
+        if len(tokenizer.encode(test_chunk)) <= max_tokens:
+            current_chunk = test_chunk
+        else:
+            if current_chunk:
+                chunks.append(current_chunk.strip())
+            current_chunk = sentence + "."
+
+    if current_chunk:
+        chunks.append(current_chunk.strip())
+
+    return chunks
+
+
+def load_corpus(corpus_dir: Path) -> List[str]:
+    """sample_doc 의 txt/csv 파일을 텍스트로 로드"""
+    texts = []
+    for path in sorted(corpus_dir.iterdir()):
+        if path.suffix.lower() in ('.txt', '.csv'):
+            texts.append(path.read_bytes().decode('utf-8-sig', errors='ignore'))
+    return texts
+
+
+def best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default=str(ROOT / "sample_doc"))
+    parser.add_argument("--max-tokens", type=int, default=1000)
+    parser.add_argument("--overlap", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10],
+                        help="코퍼스를 N배 이어붙인 문서로도 측정")
+    args = parser.parse_args()
+
+    tokenizer = tiktoken.encoding_for_model("gpt-4")
+    texts = load_corpus(Path(args.corpus))
+    chunker = TextChunker(tokenizer, max_tokens=args.max_tokens, overlap_tokens=args.overlap)
+
+    print(f"corpus: {args.corpus} ({len(texts)} files)")
+    print(f"{'scale':>6} {'chars':>10} {'legacy(s)':>10} {'new(s)':>10} {'speedup':>8} {'chunks':>12}")
+    for scale in args.scale:
+        docs = ["\n".join([text] * scale) for text in texts]
+        legacy = best_of(lambda: [legacy_chunk_text(tokenizer, d, args.max_tokens) for d in docs], args.repeat)
+        new = best_of(lambda: [chunker.chunk(d) for d in docs], args.repeat)
+        n_legacy = sum(len(legacy_chunk_text(tokenizer, d, args.max_tokens)) for d in docs)
+        n_new = sum(len(chunker.chunk(d)) for d in docs)
+        chars = sum(len(d) for d in docs)
+        print(f"{scale:>6} {chars:>10} {legacy:>10.4f} {new:>10.4f} {legacy / new:>7.1f}x {n_legacy:>5}->{n_new:<5}")
+
+
+if __name__ == "__main__":
+    main()
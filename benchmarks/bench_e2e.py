@@ -0,0 +1,267 @@
+"""오프라인 엔드투엔드 벤치마크: 인제스트 처리량 + 질의 지연(p50/p95/p99)
+
+Azure 서비스를 benchmarks/fakes.py 의 로컬 대역으로 바꿔 DocumentProcessor / ProjectAnalyzer 를
+그대로 실행한다. 결과는 JSON 으로 저장하며 --compare 로 이전 결과와 비교할 수 있다.
+
+사용법:
+    python benchmarks/bench_e2e.py --scale 1 10 100 --output bench_e2e.json
+    python benchmarks/bench_e2e.py --compare baseline.json --output current.json
+"""
+import argparse
+import csv
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from chatbot import Config, DocumentProcessor, ProjectAnalyzer, logger
+from fakes import create_fake_services
+from retrieval import LocalVectorBackend
+from tracing import Tracer
+
+DEFAULT_QUERIES = [
+    "MVNO 신규 요금제 2종 개발 요청",
+    "OTT 부가서비스 환불 처리 프로세스 개선",
+    "비과세 상품 부가세 계산 오류 수정",
+    "IPTV 통합상품 신규 출시에 따른 과금 개발",
+    "요금제 데이터 제공량 변경 및 할인 적용"
+]
+
+
+def load_corpus(corpus_dir: Path) -> List[Tuple[str, bytes]]:
+    """sample_doc 의 txt/csv 파일을 (파일명, 내용)으로 로드"""
+    return [
+        (path.name, path.read_bytes())
+        for path in sorted(corpus_dir.iterdir())
+        if path.suffix.lower() in (".txt", ".csv")
+    ]
+
+
+def scale_corpus(files: List[Tuple[str, bytes]], scale: int) -> List[Tuple[str, bytes]]:
+    """원본을 N벌 복제 (복제본마다 파일명/문서명/본문을 달리해 서로 다른 청크가 되도록 함)"""
+    scaled = []
+    for copy in range(scale):
+        for filename, content in files:
+            if copy == 0:
+                scaled.append((filename, content))
+                continue
+            stem, ext = filename.rsplit(".", 1)
+            marker = f"[사본 {copy}]"
+            if ext.lower() == "csv":
+                scaled.append((f"{stem}-{copy}.{ext}", rename_csv_rows(content, marker)))
+            else:
+                text = content.decode("utf-8-sig", errors="ignore")
+                scaled.append((f"{stem}-{copy}.{ext}", f"{marker}\n{text}".encode("utf-8")))
+    return scaled
+
+
+def rename_csv_rows(content: bytes, marker: str) -> bytes:
+    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig", errors="ignore"), newline=""))
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=reader.fieldnames)
+    writer.writeheader()
+    for row in reader:
+        if row.get("filename"):
+            row["filename"] = f"{row['filename']} {marker}"
+        if row.get("content"):
+            row["content"] = f"{marker}\n{row['content']}"
+        writer.writerow(row)
+    return output.getvalue().encode("utf-8")
+
+
+def percentiles(samples: List[float]) -> Dict:
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples) * 1000
+    return {
+        "count": len(samples),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max())
+    }
+
+
+def run_ingest(document_processor: DocumentProcessor, files: List[Tuple[str, bytes]]) -> Dict:
+    chunks = 0
+    tokens = 0
+    file_latencies = []
+    start = time.perf_counter()
+    for filename, content in files:
+        file_start = time.perf_counter()
+        metadata = {"project_type": "Billing", "technology": "", "department": "DEV"}
+        document_processor.upload_document(content, filename, dict(metadata))
+        result = document_processor.index_file(filename, content, metadata)
+        chunks += result["chunks"]
+        tokens += result["tokens"]
+        file_latencies.append(time.perf_counter() - file_start)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "files": len(files),
+        "bytes": sum(len(content) for _, content in files),
+        "chunks": chunks,
+        "tokens": tokens,
+        "elapsed_sec": elapsed,
+        "files_per_sec": len(files) / elapsed if elapsed else 0.0,
+        "chunks_per_sec": chunks / elapsed if elapsed else 0.0,
+        "tokens_per_sec": tokens / elapsed if elapsed else 0.0,
+        "file_latency": percentiles(file_latencies)
+    }
+
+
+def run_queries(project_analyzer: ProjectAnalyzer, queries: List[str], count: int, top_k: int) -> Dict:
+    search_latencies = []
+    analyze_latencies = []
+    total_latencies = []
+    for i in range(count):
+        # 같은 질의가 반복되면 임베딩 캐시 효과가 섞이므로 번호를 붙여 매번 다른 질의로 만든다
+        query = f"{queries[i % len(queries)]} #{i}"
+        start = time.perf_counter()
+        similar_projects = project_analyzer.search_similar_projects(query, top_k=top_k)
+        searched = time.perf_counter()
+        project_analyzer.analyze_requirements(query, similar_projects)
+        finished = time.perf_counter()
+
+        search_latencies.append(searched - start)
+        analyze_latencies.append(finished - searched)
+        total_latencies.append(finished - start)
+
+    return {
+        "search": percentiles(search_latencies),
+        "analyze": percentiles(analyze_latencies),
+        "total": percentiles(total_latencies)
+    }
+
+
+def run_scale(files: List[Tuple[str, bytes]], scale: int, args) -> Dict:
+    services = create_fake_services(
+        embedding_latency=args.embedding_latency_ms / 1000,
+        embedding_per_input_latency=args.embedding_per_input_ms / 1000,
+        chat_latency=args.chat_latency_ms / 1000,
+        dimensions=args.dimensions
+    )
+    tracer = Tracer(window=100000)
+    document_processor = DocumentProcessor(services, embedding_cache=None, tracer=tracer)
+    ingest = run_ingest(document_processor, scale_corpus(files, scale))
+
+    backend = None
+    if args.backend == "local":
+        backend = LocalVectorBackend.from_search_client(services.search_client)
+    project_analyzer = ProjectAnalyzer(services, embedding_cache=None, answer_cache=None, backend=backend,
+                                       tracer=tracer)
+    queries = run_queries(project_analyzer, DEFAULT_QUERIES, args.queries, args.top_k)
+
+    embeddings = services.openai_client.embeddings
+    return {
+        "scale": scale,
+        "indexed_chunks": services.search_client.get_document_count(),
+        "embedding_requests": embeddings.requests,
+        "embedding_inputs": embeddings.inputs,
+        "ingest": ingest,
+        "query": queries,
+        "stages": tracer.snapshot()["stages"]
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def print_comparison(baseline: Dict, current: Dict):
+    """같은 배율끼리 주요 지표 변화율 출력"""
+    previous = {run["scale"]: run for run in baseline.get("runs", [])}
+    metrics = [
+        ("ingest chunks/s", lambda run: run["ingest"]["chunks_per_sec"]),
+        ("search p95(ms)", lambda run: run["query"]["search"].get("p95_ms", 0.0)),
+        ("total p95(ms)", lambda run: run["query"]["total"].get("p95_ms", 0.0))
+    ]
+    print(f"\ncompare with {baseline.get('revision') or 'baseline'}:")
+    for run in current["runs"]:
+        if run["scale"] not in previous:
+            continue
+        for name, metric in metrics:
+            old, new = metric(previous[run["scale"]]), metric(run)
+            change = (new - old) / old * 100 if old else 0.0
+            print(f"  x{run['scale']:<4} {name:<16} {old:>10.2f} -> {new:>10.2f} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default=str(ROOT / "sample_doc"))
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100], help="코퍼스 복제 배율")
+    parser.add_argument("--queries", type=int, default=200, help="배율별 질의 수")
+    parser.add_argument("--top-k", type=int, default=2)
+    parser.add_argument("--backend", default="azure", choices=["azure", "local"], help="검색 백엔드")
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--embedding-latency-ms", type=float, default=20.0, help="임베딩 요청당 지연")
+    parser.add_argument("--embedding-per-input-ms", type=float, default=0.5, help="임베딩 입력당 추가 지연")
+    parser.add_argument("--chat-latency-ms", type=float, default=50.0, help="채팅 완성 요청당 지연")
+    parser.add_argument("--output", default="bench_e2e.json", help="결과 JSON 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    # 문서마다 남는 INFO 로그가 측정을 방해하지 않도록 경고 이상만 출력
+    logger.setLevel("WARNING")
+
+    files = load_corpus(Path(args.corpus))
+    print(f"corpus: {args.corpus} ({len(files)} files)")
+    print(f"{'scale':>6} {'files':>6} {'chunks':>7} {'chunks/s':>9} {'search p50/p95/p99(ms)':>24} {'total p50/p95/p99(ms)':>24}")
+
+    runs = []
+    for scale in args.scale:
+        run = run_scale(files, scale, args)
+        runs.append(run)
+        search, total = run["query"]["search"], run["query"]["total"]
+        print(
+            f"{scale:>6} {run['ingest']['files']:>6} {run['ingest']['chunks']:>7} {run['ingest']['chunks_per_sec']:>9.1f} "
+            f"{search['p50_ms']:>8.1f}/{search['p95_ms']:.1f}/{search['p99_ms']:.1f} "
+            f"{total['p50_ms']:>8.1f}/{total['p95_ms']:.1f}/{total['p99_ms']:.1f}"
+        )
+
+    result = {
+        "benchmark": "bench_e2e",
+        "created_at": datetime.now().isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "settings": {
+            "backend": args.backend,
+            "queries": args.queries,
+            "top_k": args.top_k,
+            "dimensions": args.dimensions,
+            "embedding_latency_ms": args.embedding_latency_ms,
+            "embedding_per_input_ms": args.embedding_per_input_ms,
+            "chat_latency_ms": args.chat_latency_ms,
+            "chunk_max_tokens": Config.CHUNK_MAX_TOKENS,
+            "chunk_overlap_tokens": Config.CHUNK_OVERLAP_TOKENS,
+            "embedding_batch_size": Config.EMBEDDING_BATCH_SIZE
+        },
+        "runs": runs
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\nresults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""임베딩 차원 축소/양자화 재현율-크기 리포트
+
+sample_doc 코퍼스를 청킹해 한 번만 전체 차원(1536)으로 임베딩한 뒤, 차원(dimensions) x 저장 형식
+(float32/float16/int8) 조합마다 LocalVectorBackend 를 만들어 기준(1536 / float32) top-k 와의 재현율과
+벡터 저장 크기를 비교한다. text-embedding-3 의 dimensions 파라미터는 전체 벡터 앞부분을 잘라
+다시 정규화한 것과 같으므로 차원별로 API 를 다시 호출하지 않는다.
+
+기본값은 오프라인 대역(BagOfWordsEmbeddings)이며, --source azure 는 .env 의 Azure OpenAI 로 실제 임베딩을 만든다.
+
+사용법:
+    python benchmarks/bench_quantization.py --dimensions 1536 1024 512 256 --output bench_quantization.json
+    python benchmarks/bench_quantization.py --source azure --queries 100
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from bench_e2e import DEFAULT_QUERIES, git_revision, load_corpus
+from chatbot import AzureServices, Config, DocumentProcessor, logger
+from chunker import split_sentences
+from fakes import BagOfWordsEmbeddings, create_fake_services
+from quantization import VECTOR_DTYPES, vector_bytes
+from retrieval import LocalVectorBackend
+
+FULL_DIMENSIONS = 1536
+
+
+def chunk_corpus(document_processor: DocumentProcessor, files) -> List[Dict]:
+    chunks = []
+    for filename, content in files:
+        for name, chunk, _ in document_processor.iter_document_chunks(filename, content, {}):
+            chunks.append({"chunk_id": document_processor.make_chunk_id(name, chunk), "filename": name, "chunk": chunk})
+    return chunks
+
+
+def sample_queries(chunks: List[Dict], count: int, seed: int) -> List[str]:
+    """고정 질의 + 청크에서 뽑은 문장 (코퍼스 안의 표현으로 찾는 경우)"""
+    rng = random.Random(seed)
+    queries = list(DEFAULT_QUERIES)
+    while len(queries) < count:
+        sentences = [s.strip() for s in split_sentences(rng.choice(chunks)["chunk"]) if len(s.strip()) > 20]
+        if sentences:
+            queries.append(rng.choice(sentences))
+    return queries[:count]
+
+
+def truncate(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """dimensions 파라미터와 같은 결과 (앞부분 + 재정규화)"""
+    vectors = vectors[:, :dimensions]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_ids(backend: LocalVectorBackend, query_vectors: np.ndarray, top_k: int) -> List[List[str]]:
+    return [[hit["chunk_id"] for hit in hits] for hits in backend.search_batch(query_vectors, top_k)]
+
+
+def recall(expected: List[List[str]], actual: List[List[str]]) -> float:
+    scores = [len(set(e) & set(a)) / len(e) for e, a in zip(expected, actual) if e]
+    return float(np.mean(scores)) if scores else 0.0
+
+
+def file_size(backend: LocalVectorBackend) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.npz")
+        backend.save(path)
+        return os.path.getsize(path)
+
+
+def python_list_bytes(dimensions: int) -> int:
+    """index_document 가 들고 있는 list[float] 하나의 메모리 (리스트 + float 객체)"""
+    vector = [float(i) for i in range(dimensions)]
+    return sys.getsizeof(vector) + sum(sys.getsizeof(value) for value in vector)
+
+
+def run_config(chunks: List[Dict], chunk_vectors: np.ndarray, query_vectors: np.ndarray,
+               dimensions: int, dtype: str, baseline: Dict, top_k: int) -> Dict:
+    backend = LocalVectorBackend(dtype=dtype)
+    backend.add_documents(
+        {**chunk, "text_vector": vector.tolist()} for chunk, vector in zip(chunks, truncate(chunk_vectors, dimensions))
+    )
+    queries = truncate(query_vectors, dimensions)
+
+    start = time.perf_counter()
+    ids = top_ids(backend, queries, top_k)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "dimensions": dimensions,
+        "dtype": dtype,
+        "vector_bytes": vector_bytes(dimensions, dtype),
+        "index_bytes": backend.nbytes,
+        "file_bytes": file_size(backend),
+        "compression": baseline["vector_bytes"] / vector_bytes(dimensions, dtype) if baseline else 1.0,
+        "recall_at_k": recall(baseline["ids"], ids) if baseline else 1.0,
+        "recall_at_1": recall([i[:1] for i in baseline["ids"]], [i[:1] for i in ids]) if baseline else 1.0,
+        "search_ms_per_query": elapsed / len(queries) * 1000,
+        "ids": ids
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default=str(ROOT / "sample_doc"))
+    parser.add_argument("--source", default="fake", choices=["fake", "azure"], help="임베딩 생성 방식")
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[1536, 1024, 512, 256])
+    parser.add_argument("--dtypes", nargs="+", default=list(VECTOR_DTYPES), choices=VECTOR_DTYPES)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_quantization.json", help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    logger.setLevel("WARNING")
+    # 기준 벡터는 항상 전체 차원으로 생성
+    Config.EMBEDDING_DIMENSIONS = 0
+
+    if args.source == "azure":
+        Config.validate_config()
+        services = AzureServices()
+    else:
+        services = create_fake_services()
+        services.openai_client.embeddings = BagOfWordsEmbeddings(FULL_DIMENSIONS)
+    document_processor = DocumentProcessor(services, embedding_cache=None)
+
+    files = load_corpus(Path(args.corpus))
+    chunks = chunk_corpus(document_processor, files)
+    queries = sample_queries(chunks, args.queries, args.seed)
+    chunk_vectors = np.asarray(document_processor.get_embeddings([chunk["chunk"] for chunk in chunks]), dtype=np.float32)
+    query_vectors = np.asarray(document_processor.get_embeddings(queries), dtype=np.float32)
+    print(f"corpus: {args.corpus} ({len(files)} files, {len(chunks)} chunks), {len(queries)} queries, "
+          f"source={args.source}, top_k={args.top_k}")
+    print(f"list[float] per {FULL_DIMENSIONS}-dim vector in memory: {python_list_bytes(FULL_DIMENSIONS) / 1024:.1f} KB")
+    print(f"{'dims':>5} {'dtype':>8} {'bytes/vec':>10} {'index(KB)':>10} {'file(KB)':>9} {'x smaller':>9} "
+          f"{'recall@k':>9} {'recall@1':>9} {'ms/query':>9}")
+
+    baseline = None
+    runs = []
+    for dimensions in sorted(set(args.dimensions), reverse=True):
+        for dtype in args.dtypes:
+            run = run_config(chunks, chunk_vectors, query_vectors, dimensions, dtype, baseline, args.top_k)
+            if baseline is None:
+                # 가장 큰 차원의 첫 형식(기본 1536 / float32)이 기준
+                baseline = run
+            runs.append(run)
+            print(
+                f"{dimensions:>5} {dtype:>8} {run['vector_bytes']:>10} {run['index_bytes'] / 1024:>10.1f} "
+                f"{run['file_bytes'] / 1024:>9.1f} {run['compression']:>9.1f} {run['recall_at_k']:>9.3f} "
+                f"{run['recall_at_1']:>9.3f} {run['search_ms_per_query']:>9.3f}"
+            )
+
+    result = {
+        "benchmark": "bench_quantization",
+        "created_at": datetime.now().isoformat(),
+        "revision": git_revision(),
+        "settings": {
+            "source": args.source,
+            "files": len(files),
+            "chunks": len(chunks),
+            "queries": len(queries),
+            "top_k": args.top_k,
+            "baseline": f"{baseline['dimensions']}/{baseline['dtype']}",
+            "python_list_bytes": python_list_bytes(FULL_DIMENSIONS)
+        },
+        "runs": [{key: value for key, value in run.items() if key != "ids"} for run in runs]
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\nresults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""콜드 스타트 벤치마크: import 시간, 서비스 준비 시간, 첫 요청 지연
+
+새 파이썬 프로세스를 --runs 번 띄워 단계별 시간을 잰다 (모듈이 메모리에 없는 실제 시작과 같은 조건).
+
+    import_ms       import chatbot (또는 --module api_server)
+    services_ms     AppServices() 생성
+    ready_ms        import + 서비스 생성 (요청을 받을 수 있는 시점)
+    clients_ms      OpenAI/Blob/Search 클라이언트 첫 생성 (SDK import 포함, 네트워크 호출 없음)
+    tokenizer_ms    tiktoken 인코더 첫 로드 (TIKTOKEN_CACHE_DIR 에 BPE 파일이 없으면 다운로드 포함)
+    first_query_ms  오프라인 대역(fakes)으로 유사 과제 검색 + 스트리밍 분석 1회
+    first_request_ms  clients + tokenizer + first_query (warm-up 이 끝나기 전에 첫 요청이 온 경우)
+
+Azure 자격 증명은 필요 없다 (더미 설정으로 클라이언트만 만들고 호출하지 않음).
+
+사용법:
+    python benchmarks/bench_startup.py --runs 5 --output bench_startup.json
+    python benchmarks/bench_startup.py --module api_server --importtime
+"""
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# 자식 프로세스용 더미 설정 (클라이언트 생성만 하고 네트워크 호출은 하지 않음)
+DUMMY_ENV = {
+    "AZURE_OPENAI_ENDPOINT": "https://example.openai.azure.com",
+    "AZURE_OPENAI_KEY": "dummy",
+    "AZURE_SEARCH_ENDPOINT": "https://example.search.windows.net",
+    "AZURE_SEARCH_KEY": "dummy",
+    "AZURE_BLOB_CONNECTION_STRING": (
+        "DefaultEndpointsProtocol=https;AccountName=example;AccountKey=ZHVtbXk=;EndpointSuffix=core.windows.net"
+    ),
+    "RETRIEVAL_BACKEND": "azure"
+}
+
+METRICS = ["import_ms", "services_ms", "ready_ms", "clients_ms", "tokenizer_ms", "first_query_ms", "first_request_ms"]
+QUERY = "MVNO 신규 요금제 2종 개발 요청"
+
+
+def elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(module: str) -> Dict:
+    """자식 프로세스에서 단계별 시간 측정"""
+    result: Dict = {}
+    start = time.perf_counter()
+    importlib.import_module(module)
+    result["import_ms"] = elapsed_ms(start)
+
+    import chatbot
+    chatbot.logger.setLevel("WARNING")
+    step = time.perf_counter()
+    services = chatbot.AppServices()
+    result["services_ms"] = elapsed_ms(step)
+    result["ready_ms"] = elapsed_ms(start)
+
+    step = time.perf_counter()
+    services.azure_services.warm_up()
+    result["clients_ms"] = elapsed_ms(step)
+
+    step = time.perf_counter()
+    try:
+        chatbot.get_tokenizer()
+    except Exception as e:
+        result["tokenizer_error"] = str(e)
+        return result
+    result["tokenizer_ms"] = elapsed_ms(step)
+
+    # 대역 서비스에 문서 하나를 넣어 두고 (측정 제외) 첫 검색 + 분석 시간만 측정
+    sys.path.insert(0, str(ROOT / "benchmarks"))
+    from fakes import create_fake_services
+    fake_services = create_fake_services()
+    document_processor = chatbot.DocumentProcessor(fake_services)
+    path = next(path for path in sorted((ROOT / "sample_doc").iterdir()) if path.suffix.lower() == ".txt")
+    document_processor.index_file(path.name, path.read_bytes(), {})
+    project_analyzer = chatbot.ProjectAnalyzer(fake_services)
+
+    step = time.perf_counter()
+    projects = project_analyzer.search_similar_projects(QUERY)
+    "".join(project_analyzer.analyze_requirements_stream(QUERY, projects))
+    result["first_query_ms"] = elapsed_ms(step)
+    result["first_request_ms"] = result["clients_ms"] + result["tokenizer_ms"] + result["first_query_ms"]
+    return result
+
+
+def run_child(module: str, workdir: str, importtime: bool = False) -> Dict:
+    env = {
+        **os.environ,
+        **DUMMY_ENV,
+        "EMBEDDING_CACHE_PATH": os.path.join(workdir, "embeddings.sqlite3"),
+        "IDENTIFIER_INDEX_PATH": os.path.join(workdir, "identifier_index.json")
+    }
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + [__file__, "--child", "--module", module]
+    start = time.perf_counter()
+    completed = subprocess.run(command, env=env, cwd=workdir, capture_output=True, text=True)
+    process_ms = elapsed_ms(start)
+    if completed.returncode != 0:
+        raise RuntimeError(f"child process failed:\n{completed.stderr[-2000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_ms"] = process_ms
+    if importtime:
+        result["importtime"] = completed.stderr
+    return result
+
+
+def top_imports(importtime_log: str, count: int) -> List[Dict]:
+    """-X importtime 출력에서 누적 시간이 큰 최상위 패키지"""
+    totals: Dict[str, int] = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        name = name.rstrip()
+        # 들여쓰기가 없는 줄이 최상위 import
+        if name.startswith(" ") and not name.startswith("  "):
+            totals[name.strip()] = totals.get(name.strip(), 0) + int(cumulative)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:count]
+    return [{"module": module, "ms": us / 1000} for module, us in ranked]
+
+
+def summarize(runs: List[Dict]) -> Dict:
+    summary = {}
+    for metric in METRICS + ["process_ms"]:
+        values = [run[metric] for run in runs if run.get(metric) is not None]
+        if values:
+            summary[metric] = {"median": statistics.median(values), "min": min(values), "max": max(values)}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="chatbot", choices=["chatbot", "api_server"], help="시작 시 import 하는 모듈")
+    parser.add_argument("--runs", type=int, default=5, help="새 프로세스 실행 횟수")
+    parser.add_argument("--importtime", action="store_true", help="import 시간 상위 모듈 출력")
+    parser.add_argument("--output", default="bench_startup.json", help="결과 JSON 경로")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.module)))
+        return
+
+    runs = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(args.runs):
+            runs.append(run_child(args.module, workdir))
+        imports = top_imports(run_child(args.module, workdir, importtime=True)["importtime"], 15) if args.importtime else []
+
+    errors = {run["tokenizer_error"] for run in runs if run.get("tokenizer_error")}
+    summary = summarize(runs)
+    print(f"module: {args.module}, runs: {args.runs}, TIKTOKEN_CACHE_DIR: {os.getenv('TIKTOKEN_CACHE_DIR') or '(default)'}")
+    print(f"{'metric':>18} {'median':>9} {'min':>9} {'max':>9}")
+    for metric, stats in summary.items():
+        print(f"{metric:>18} {stats['median']:>9.1f} {stats['min']:>9.1f} {stats['max']:>9.1f}")
+    for error in errors:
+        print(f"\ntokenizer load failed (BPE 파일 캐시 확인: python prefetch_tokenizer.py): {error}")
+    if imports:
+        print("\ntop imports (cumulative ms):")
+        for entry in imports:
+            print(f"  {entry['module']:<40} {entry['ms']:>8.1f}")
+
+    from bench_e2e import git_revision
+    result = {
+        "benchmark": "bench_startup",
+        "created_at": datetime.now().isoformat(),
+        "revision": git_revision(),
+        "settings": {"module": args.module, "runs": args.runs, "python": sys.version.split()[0]},
+        "summary": summary,
+        "top_imports": imports,
+        "runs": runs
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\nresults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
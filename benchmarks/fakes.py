@@ -0,0 +1,240 @@
+"""오프라인 벤치마크용 Azure 서비스 대역 (임베딩/채팅/Blob/AI Search)
+
+AzureServices 와 같은 속성(openai_client, blob_service_client, search_client)을 제공하므로
+DocumentProcessor / ProjectAnalyzer 를 코드 수정 없이 그대로 실행할 수 있다.
+"""
+import hashlib
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from retrieval import LocalVectorBackend
+
+FILTER_CLAUSE_PATTERN = re.compile(r"(\w+) eq '((?:[^']|'')*)'")
+SEARCH_IN_PATTERN = re.compile(r"search\.in\((\w+), '([^']*)', ','\)")
+
+
+def parse_filter(expression: Optional[str]) -> Dict[str, set]:
+    """`field eq 'v'` / `search.in(field, 'a,b', ',')` 절을 필드별 허용 값 집합으로 변환
+
+    같은 필드는 or, 다른 필드는 and 로 본다 (날짜 범위 등 다른 절은 무시).
+    """
+    filters: Dict[str, set] = {}
+    for field, value in FILTER_CLAUSE_PATTERN.findall(expression or ""):
+        filters.setdefault(field, set()).add(value.replace("''", "'"))
+    for field, values in SEARCH_IN_PATTERN.findall(expression or ""):
+        filters.setdefault(field, set()).update(values.split(","))
+    return filters
+
+
+class Usage(SimpleNamespace):
+    """openai 응답의 usage 객체 대역"""
+
+    def model_dump(self) -> Dict:
+        return dict(vars(self))
+
+
+class FakeEmbeddings:
+    """텍스트 해시로 시드를 정하는 결정적 임베딩 (요청당/입력당 지연 설정 가능)
+
+    dimensions 파라미터는 실제 text-embedding-3 처럼 전체 벡터 앞부분을 잘라 다시 정규화한다.
+    """
+
+    def __init__(self, dimensions: int = 1536, latency: float = 0.0, per_input_latency: float = 0.0):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.per_input_latency = per_input_latency
+        self.requests = 0
+        self.inputs = 0
+        self._lock = threading.Lock()
+
+    def create(self, model: str, input, dimensions: Optional[int] = None, **kwargs):
+        texts = [input] if isinstance(input, str) else list(input)
+        with self._lock:
+            self.requests += 1
+            self.inputs += len(texts)
+        time.sleep(self.latency + self.per_input_latency * len(texts))
+
+        data = [SimpleNamespace(index=i, embedding=self.embed(text, dimensions)) for i, text in enumerate(texts)]
+        tokens = sum(len(text) for text in texts)
+        return SimpleNamespace(data=data, usage=Usage(prompt_tokens=tokens, total_tokens=tokens))
+
+    def embed(self, text: str, dimensions: Optional[int] = None) -> List[float]:
+        vector = self.full_vector(text)[:dimensions or self.dimensions]
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def full_vector(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(self.dimensions).astype(np.float32)
+
+
+class BagOfWordsEmbeddings(FakeEmbeddings):
+    """단어별 해시 벡터의 합 (단어가 겹치는 텍스트끼리 가까워지므로 재현율 비교에 사용)
+
+    앞쪽 차원일수록 분산이 크게 만들어, 실제 모델처럼 앞부분만 잘라도 유사도 순서가 대체로 유지되게 한다.
+    """
+
+    WORD_PATTERN = re.compile(r"[0-9A-Za-z_]+|[가-힣]+")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._decay = (1.0 / np.sqrt(1.0 + np.arange(self.dimensions) / 64)).astype(np.float32)
+        self._words: Dict[str, np.ndarray] = {}
+
+    def full_vector(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in self.WORD_PATTERN.findall(text.lower()):
+            word_vector = self._words.get(word)
+            if word_vector is None:
+                word_vector = self._words[word] = super().full_vector(word) * self._decay
+            vector += word_vector
+        if not vector.any():
+            vector = super().full_vector(text)
+        return vector
+
+
+class FakeChatCompletions:
+    """고정 답변을 돌려주는 채팅 완성 (stream=True 이면 단어 단위 청크)"""
+
+    def __init__(self, answer: str, latency: float = 0.0, token_latency: float = 0.0):
+        self.answer = answer
+        self.latency = latency
+        self.token_latency = token_latency
+        self.requests = 0
+
+    def create(self, model: str, messages: List[Dict], stream: bool = False, **kwargs):
+        self.requests += 1
+        prompt_tokens = sum(len(message["content"]) for message in messages)
+        usage = Usage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=len(self.answer),
+            total_tokens=prompt_tokens + len(self.answer)
+        )
+        time.sleep(self.latency)
+
+        if not stream:
+            message = SimpleNamespace(content=self.answer)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+        return self._stream(usage)
+
+    def _stream(self, usage: Usage):
+        for word in re.findall(r"\S+\s*", self.answer):
+            time.sleep(self.token_latency)
+            delta = SimpleNamespace(content=word)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        yield SimpleNamespace(choices=[], usage=usage)
+
+
+class FakeOpenAI:
+    def __init__(self, embeddings: FakeEmbeddings, chat_completions: FakeChatCompletions):
+        self.embeddings = embeddings
+        self.chat = SimpleNamespace(completions=chat_completions)
+
+
+class InMemoryBlobClient:
+    def __init__(self, store: "InMemoryBlobService", key):
+        self.store = store
+        self.key = key
+
+    def upload_blob(self, data, metadata: Optional[Dict] = None, overwrite: bool = False, **kwargs):
+        if hasattr(data, "read"):
+            data = data.read()
+        with self.store.lock:
+            if not overwrite and self.key in self.store.blobs:
+                raise ValueError(f"Blob already exists: {self.key[1]}")
+            self.store.blobs[self.key] = (bytes(data), dict(metadata or {}))
+
+    def stage_block(self, block_id: str, data, length: Optional[int] = None, **kwargs):
+        with self.store.lock:
+            self.store.blocks.setdefault(self.key, {})[block_id] = bytes(data)
+
+    def commit_block_list(self, block_list: List[str], metadata: Optional[Dict] = None, **kwargs):
+        with self.store.lock:
+            blocks = self.store.blocks.pop(self.key, {})
+            self.store.blobs[self.key] = (b"".join(blocks[block_id] for block_id in block_list), dict(metadata or {}))
+
+    def delete_blob(self):
+        with self.store.lock:
+            self.store.blobs.pop(self.key)
+
+
+class InMemoryBlobService:
+    def __init__(self):
+        self.blobs: Dict = {}
+        self.blocks: Dict = {}  # 커밋 전 블록 (stage_block)
+        self.lock = threading.Lock()
+
+    def get_blob_client(self, container: str, blob: str) -> InMemoryBlobClient:
+        return InMemoryBlobClient(self, (container, blob))
+
+    def get_account_information(self) -> Dict:
+        return {"sku_name": "Standard_LRS", "account_kind": "StorageV2"}
+
+
+class InMemorySearchIndex:
+    """AI Search 클라이언트 대역 (필터 목록 조회 + LocalVectorBackend 벡터 검색, 키워드 점수는 무시)"""
+
+    def __init__(self):
+        self.documents: Dict[str, Dict] = {}
+        self.vectors = LocalVectorBackend()
+        self._lock = threading.Lock()
+
+    def merge_or_upload_documents(self, documents: Iterable[Dict]):
+        documents = list(documents)
+        with self._lock:
+            for document in documents:
+                merged = {**self.documents.get(document["chunk_id"], {}), **document}
+                self.documents[document["chunk_id"]] = merged
+            self.vectors.add_documents([self.documents[document["chunk_id"]] for document in documents])
+        return [SimpleNamespace(key=document["chunk_id"], succeeded=True) for document in documents]
+
+    upload_documents = merge_or_upload_documents
+
+    def delete_documents(self, documents: Iterable[Dict]):
+        chunk_ids = [document["chunk_id"] for document in documents]
+        with self._lock:
+            for chunk_id in chunk_ids:
+                self.documents.pop(chunk_id, None)
+            self.vectors.delete_documents(chunk_ids)
+        return [SimpleNamespace(key=chunk_id, succeeded=True) for chunk_id in chunk_ids]
+
+    def get_document_count(self) -> int:
+        return len(self.documents)
+
+    def search(self, search_text: Optional[str] = None, vector_queries=None, filter: Optional[str] = None,
+               select: Optional[List[str]] = None, top: Optional[int] = None, **kwargs) -> List[Dict]:
+        filters = parse_filter(filter)
+        with self._lock:
+            if vector_queries:
+                query = vector_queries[0]
+                k = top or query.k_nearest_neighbors
+                hits = self.vectors.search(search_text, query.vector, k, filters)
+                results = [(self.documents[hit["chunk_id"]], hit["score"]) for hit in hits]
+            else:
+                results = [
+                    (document, 1.0) for document in self.documents.values()
+                    if all(document.get(field) in values for field, values in filters.items())
+                ][:top]
+
+        return [
+            {**{field: document.get(field) for field in (select or document)}, "@search.score": score}
+            for document, score in results
+        ]
+
+
+def create_fake_services(embedding_latency: float = 0.0, embedding_per_input_latency: float = 0.0,
+                         chat_latency: float = 0.0, chat_token_latency: float = 0.0,
+                         dimensions: int = 1536, answer: str = "") -> SimpleNamespace:
+    """AzureServices 와 같은 모양의 로컬 서비스 묶음"""
+    embeddings = FakeEmbeddings(dimensions, embedding_latency, embedding_per_input_latency)
+    chat = FakeChatCompletions(answer or "## 분석 결과\n- 벤치마크용 고정 답변입니다.", chat_latency, chat_token_latency)
+    return SimpleNamespace(
+        openai_client=FakeOpenAI(embeddings, chat),
+        blob_service_client=InMemoryBlobService(),
+        search_client=InMemorySearchIndex(),
+        search_index_client=None
+    )
@@ -0,0 +1,108 @@
+import io
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BlockBlobWriter:
+    """블록 블롭을 블록 단위로 병렬 업로드 (write 한 순서대로 stage, commit 때 블록 목록 확정)
+
+    업로드 중인 블록이 max_concurrency 개를 넘으면 write 가 기다리므로,
+    메모리에 있는 데이터는 파일 크기와 관계없이 block_size x (max_concurrency + 1) 이하이다.
+    커밋하지 않은 블록은 Azure 가 일주일 뒤 자동으로 지운다.
+    """
+
+    def __init__(self, blob_client, block_size: int = 4 * 1024 * 1024, max_concurrency: int = 4):
+        self.blob_client = blob_client
+        self.block_size = max(1, block_size)
+        self.size = 0
+        self.error: Optional[BaseException] = None
+        self._buffer = bytearray()
+        self._block_ids: List[str] = []
+        self._futures: List[Future] = []
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrency))
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="blob-block")
+
+    def write(self, data: bytes):
+        self.size += len(data)
+        if self.error is not None:
+            return
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            block = bytes(self._buffer[:self.block_size])
+            del self._buffer[:self.block_size]
+            self._stage(block)
+
+    def commit(self, metadata: Optional[Dict] = None) -> bool:
+        """남은 데이터를 올리고 블록 목록을 커밋 (실패한 블록이 있으면 커밋하지 않고 False)"""
+        try:
+            if self._buffer:
+                self._stage(bytes(self._buffer))
+                self._buffer.clear()
+            for future in self._futures:
+                future.result()
+            if self.error is not None:
+                raise self.error
+            self.blob_client.commit_block_list(self._block_ids, metadata=metadata)
+            return True
+        except Exception as e:
+            logger.error(f"Error uploading document blocks: {str(e)}")
+            return False
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def abort(self):
+        """업로드 중단 (대기 중인 블록 취소, 커밋하지 않음)"""
+        self._buffer.clear()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _stage(self, block: bytes):
+        # 블록 ID 는 모두 같은 길이여야 함 (SDK 가 base64 인코딩)
+        block_id = f"{len(self._block_ids):08d}"
+        self._block_ids.append(block_id)
+        self._slots.acquire()
+        future = self._executor.submit(self._stage_block, block_id, block)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def _stage_block(self, block_id: str, block: bytes):
+        if self.error is not None:
+            return
+        try:
+            self.blob_client.stage_block(block_id, block, length=len(block))
+        except Exception as e:
+            # 이후 블록은 올리지 않음 (읽기는 계속해서 인덱싱은 마무리)
+            self.error = e
+            raise
+
+
+class TeeReader(io.RawIOBase):
+    """원본 스트림에서 읽은 바이트를 sink 에도 그대로 넘기는 읽기 전용 스트림
+
+    io.BufferedReader 로 감싸 TextIOWrapper/csv 에 넘기면, 파싱하며 읽은 순서대로 sink(업로드)에 전달된다.
+    """
+
+    def __init__(self, source: BinaryIO, sink: Callable[[bytes], None], read_size: int = 1024 * 1024):
+        super().__init__()
+        self.source = source
+        self.sink = sink
+        self.read_size = read_size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.source.read(len(buffer))
+        if not data:
+            return 0
+        self.sink(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+    def drain(self):
+        """파서가 읽지 않고 남긴 나머지를 끝까지 읽어 sink 에 전달"""
+        for data in iter(lambda: self.source.read(self.read_size), b""):
+            self.sink(data)
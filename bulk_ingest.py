@@ -0,0 +1,253 @@
+"""문서 디렉터리 일괄 인제스트 CLI
+
+변경된 파일만 다시 인덱싱하고, 삭제된 파일의 인덱스 항목은 제거한다.
+
+사용법:
+    python bulk_ingest.py sample_doc --jobs 4
+    python bulk_ingest.py sample_doc --dry-run
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from chatbot import Config, DocumentProcessor, get_app_services, logger
+
+MANIFEST_FILENAME = ".ingest_manifest.json"
+
+
+class IngestManifest:
+    """파일별 내용 해시와 인덱싱된 청크 ID 기록"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.files: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.files = json.load(f).get("files", {})
+
+    def get(self, rel_path: str) -> Optional[Dict]:
+        with self._lock:
+            return self.files.get(rel_path)
+
+    def set(self, rel_path: str, entry: Dict):
+        with self._lock:
+            self.files[rel_path] = entry
+
+    def remove(self, rel_path: str):
+        with self._lock:
+            self.files.pop(rel_path, None)
+
+    def save(self):
+        """임시 파일에 쓴 뒤 교체 (중단되어도 매니페스트가 깨지지 않음)"""
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"files": self.files}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_directory(root: str, extensions: List[str]) -> Dict[str, str]:
+    """인제스트 대상 파일 목록 (상대 경로 -> 절대 경로)"""
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for name in filenames:
+            if name.startswith(".") or name.rsplit(".", 1)[-1].lower() not in extensions:
+                continue
+            path = os.path.join(dirpath, name)
+            files[os.path.relpath(path, root).replace(os.sep, "/")] = path
+    return files
+
+
+class BulkIngestor:
+    """디렉터리와 인덱스를 매니페스트 기준으로 동기화"""
+
+    def __init__(self, document_processor: DocumentProcessor, manifest: IngestManifest,
+                 metadata: Dict, upload_blobs: bool = True, dry_run: bool = False):
+        self.document_processor = document_processor
+        self.manifest = manifest
+        self.metadata = metadata
+        self.upload_blobs = upload_blobs
+        self.dry_run = dry_run
+
+    def ingest_file(self, rel_path: str, path: str) -> Dict:
+        """파일 하나 처리 (내용 해시가 같으면 건너뜀)"""
+        content_hash = file_sha256(path)
+        previous = self.manifest.get(rel_path)
+        if previous and previous.get("sha256") == content_hash:
+            return {"status": "skipped", "chunks": 0, "tokens": 0}
+        if self.dry_run:
+            return {"status": "changed" if previous else "new", "chunks": 0, "tokens": 0}
+
+        # 하위 디렉터리의 같은 이름 파일이 서로 덮어쓰지 않도록 상대 경로를 문서/Blob 이름으로 사용
+        filename = rel_path
+        metadata = dict(self.metadata)
+
+        if os.path.getsize(path) > Config.STREAMING_INGEST_THRESHOLD:
+            # 큰 파일은 읽는 만큼씩 블록 업로드 + 청킹/인덱싱
+            with open(path, "rb") as f:
+                result = self.document_processor.ingest_stream(filename, f, metadata, upload=self.upload_blobs)
+            if self.upload_blobs and not result["uploaded"]:
+                return {"status": "failed", "chunks": 0, "tokens": 0}
+        else:
+            with open(path, "rb") as f:
+                file_content = f.read()
+
+            if self.upload_blobs and not self.document_processor.upload_document(file_content, filename, metadata):
+                return {"status": "failed", "chunks": 0, "tokens": 0}
+
+            result = self.document_processor.index_file(filename, file_content, metadata)
+        # 일부 청크라도 인덱싱하지 못했으면 매니페스트에 기록하지 않음 (다음 실행에서 빠진 청크만 다시 처리)
+        if len(result["chunk_ids"]) != result["chunks"]:
+            logger.error(f"Indexed {len(result['chunk_ids'])}/{result['chunks']} chunks of {rel_path}")
+            return {"status": "failed", "chunks": 0, "tokens": 0}
+
+        # 같은 문서명의 이전 청크는 sync_chunks 에서 정리되므로, 사라진 문서명(CSV 행 등)의 청크만 제거
+        if previous:
+            current_ids = set(result["chunk_ids"])
+            stale = [chunk_id for chunk_id in previous.get("chunk_ids", []) if chunk_id not in current_ids]
+            deleted = self.document_processor.delete_chunks(stale)
+            # 일부라도 지우지 못했으면 이전 기록을 유지 (해시가 달라 다음 실행에서 다시 처리하며 삭제 재시도)
+            if deleted != len(stale):
+                logger.error(f"Deleted {deleted}/{len(stale)} stale chunks of {rel_path}")
+                return {"status": "failed", "chunks": 0, "tokens": 0}
+
+        self.manifest.set(rel_path, {
+            "sha256": content_hash,
+            "filename": filename,
+            "chunk_ids": result["chunk_ids"],
+            "indexed_at": datetime.now().isoformat()
+        })
+        return {"status": "changed" if previous else "new", "chunks": result["chunks"], "tokens": result["tokens"]}
+
+    def remove_file(self, rel_path: str) -> Dict:
+        """디렉터리에서 사라진 파일의 인덱스 항목 제거"""
+        entry = self.manifest.get(rel_path) or {}
+        if not self.dry_run:
+            chunk_ids = entry.get("chunk_ids", [])
+            deleted = self.document_processor.delete_chunks(chunk_ids)
+            # 일부라도 지우지 못했으면 기록을 남겨 다음 실행에서 다시 삭제
+            if deleted != len(chunk_ids):
+                logger.error(f"Deleted {deleted}/{len(chunk_ids)} chunks of {rel_path}")
+                return {"status": "failed", "chunks": 0, "tokens": 0}
+            if self.upload_blobs and entry.get("filename"):
+                self.document_processor.delete_document(entry["filename"])
+            self.manifest.remove(rel_path)
+        return {"status": "deleted", "chunks": 0, "tokens": 0}
+
+    def sync(self, root: str, extensions: List[str], jobs: int) -> Dict:
+        files = scan_directory(root, extensions)
+        removed = [rel_path for rel_path in list(self.manifest.files) if rel_path not in files]
+
+        counts = {"new": 0, "changed": 0, "skipped": 0, "deleted": 0, "failed": 0}
+        chunks = 0
+        tokens = 0
+        start = time.perf_counter()
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+                futures = {executor.submit(self.ingest_file, rel_path, path): rel_path for rel_path, path in files.items()}
+                futures.update({executor.submit(self.remove_file, rel_path): rel_path for rel_path in removed})
+
+                for future in as_completed(futures):
+                    rel_path = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Error ingesting {rel_path}: {str(e)}")
+                        result = {"status": "failed", "chunks": 0, "tokens": 0}
+                    counts[result["status"]] += 1
+                    chunks += result["chunks"]
+                    tokens += result["tokens"]
+                    print(f"[{result['status']:>7}] {rel_path}")
+        finally:
+            if not self.dry_run:
+                self.manifest.save()
+                self.document_processor.save_indexes()
+
+        elapsed = time.perf_counter() - start
+        processed = counts["new"] + counts["changed"]
+        return {
+            **counts,
+            "chunks": chunks,
+            "tokens": tokens,
+            "elapsed_sec": elapsed,
+            "files_per_sec": processed / elapsed if elapsed else 0.0,
+            "chunks_per_sec": chunks / elapsed if elapsed else 0.0,
+            "tokens_per_sec": tokens / elapsed if elapsed else 0.0
+        }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="문서 디렉터리를 AI Search 인덱스와 동기화합니다.")
+    parser.add_argument("directory", help="인제스트할 문서 디렉터리 (예: sample_doc)")
+    parser.add_argument("--jobs", type=int, default=4, help="동시에 처리할 파일 수")
+    parser.add_argument("--manifest", help=f"매니페스트 경로 (기본: <directory>/{MANIFEST_FILENAME})")
+    parser.add_argument("--extensions", default="txt,csv", help="대상 확장자 (쉼표 구분)")
+    parser.add_argument("--project-type", default="Billing", choices=["Billing", "Order", "SETL"])
+    parser.add_argument("--technology", default="")
+    parser.add_argument("--department", default="DEV", choices=["DEV", "OPS", "QA"])
+    parser.add_argument("--no-blob", action="store_true", help="Blob Storage 업로드/삭제 생략")
+    parser.add_argument("--dry-run", action="store_true", help="변경 대상만 출력")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if not os.path.isdir(args.directory):
+        print(f"디렉터리를 찾을 수 없습니다: {args.directory}", file=sys.stderr)
+        return 2
+
+    missing_vars = Config.get_missing_vars()
+    if missing_vars:
+        print(f"다음 환경변수가 설정되지 않았습니다: {', '.join(missing_vars)}", file=sys.stderr)
+        return 2
+
+    document_processor = get_app_services().document_processor
+    # 역색인/로컬 인덱스는 파일마다 저장하지 않고 sync 가 끝날 때 한 번만 저장
+    document_processor.autosave_indexes = False
+    manifest = IngestManifest(args.manifest or os.path.join(args.directory, MANIFEST_FILENAME))
+    ingestor = BulkIngestor(
+        document_processor,
+        manifest,
+        metadata={
+            "project_type": args.project_type,
+            "technology": args.technology,
+            "department": args.department
+        },
+        upload_blobs=not args.no_blob,
+        dry_run=args.dry_run
+    )
+
+    extensions = [ext.strip().lower().lstrip(".") for ext in args.extensions.split(",") if ext.strip()]
+    summary = ingestor.sync(args.directory, extensions, args.jobs)
+
+    print(
+        f"\n신규 {summary['new']} / 변경 {summary['changed']} / 건너뜀 {summary['skipped']} / "
+        f"삭제 {summary['deleted']} / 실패 {summary['failed']}"
+    )
+    print(
+        f"{summary['elapsed_sec']:.2f}s, {summary['files_per_sec']:.2f} files/s, "
+        f"{summary['chunks_per_sec']:.1f} chunks/s, {summary['tokens_per_sec']:.0f} tokens/s"
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,41 @@
 import streamlit as st
 import os
+import io
+import csv
 import json
 import asyncio
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, Iterable, Tuple, BinaryIO
 import logging
 import urllib.parse
 import base64
 import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
 
-# Azure SDK imports
-from azure.storage.blob import BlobServiceClient, BlobClient
-from azure.search.documents import SearchClient
-from azure.search.documents.indexes import SearchIndexClient
-from azure.search.documents.models import VectorizedQuery
-from azure.core.credentials import AzureKeyCredential
-from openai import AzureOpenAI
+# Azure/OpenAI SDK 는 무거워서 AzureServices 가 클라이언트를 처음 만들 때 import
 import tiktoken
 from dotenv import load_dotenv
 
+from chunker import TextChunker
+from blob_stream import BlockBlobWriter, TeeReader
+from embedding_cache import EmbeddingCache
+from async_ingest import AsyncIngestionEngine
+from service_monitor import ServiceMonitor
+from answer_cache import AnswerCache
+from retrieval import (
+    RetrievalBackend, AzureSearchBackend, LocalVectorBackend, mmr_rerank, dedupe_by_file, format_odata_datetime,
+    InvalidFilterError, validate_filters
+)
+from identifier_index import IdentifierIndex
+from tracing import Tracer, payload_size
+from context_packer import ContextPacker
+from singleflight import SingleFlight, make_key
+from rate_limiter import RateLimiter, INTERACTIVE, BACKGROUND, estimate_chat_tokens
+from embedding_batch import embedding_options, split_rejected_batch, fill_embeddings
+
 # 환경 변수 로드 (개발환경에서만, Azure에서는 App Settings 사용)
 # if os.path.exists('.env'):
 
@@ -28,22 +45,104 @@ class Config:
     # Azure OpenAI 설정
     AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
     AZURE_OPENAI_KEY = os.getenv("AZURE_OPENAI_KEY")
-    AZURE_OPENAI_API_VERSION = "2024-02-01"
+    AZURE_OPENAI_API_VERSION = "2024-10-21"  # 스트리밍 usage(stream_options) 지원 버전
     CHAT_MODEL = "gpt-4o-mini-dprua"
     EMBEDDING_MODEL = "text-embedding-3-small"
+    # 토큰 수 계산용 tiktoken 인코더와 BPE 파일 캐시 디렉터리 (앱과 함께 배포하면 시작 시 내려받지 않음)
+    TOKENIZER_MODEL = "gpt-4"
+    TIKTOKEN_CACHE_DIR = os.getenv(
+        "TIKTOKEN_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tiktoken_cache")
+    )
+    # 임베딩 차원 축소 (text-embedding-3 의 dimensions 파라미터, 0 이면 모델 기본값 1536)
+    # AI Search 인덱스의 text_vector 차원과 같아야 하므로 바꾸면 인덱스를 새로 만들고 다시 인제스트해야 함
+    EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0"))
+    
+    # 임베딩 배치 설정 (요청당 입력 수 / 토큰 수 상한)
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "100000"))
+    
+    # 임베딩 디스크 캐시 설정 (경로를 비우면 캐시 사용 안 함)
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+    # 캐시 벡터 저장 형식 (float32, float16, int8)
+    # 캐시된 벡터는 AI Search 에 text_vector 로 다시 올라가고 질의 임베딩으로도 쓰이므로 기본값은 손실 없는 float32
+    EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float32")
+    # 로컬 인덱스 벡터 저장 형식 (로컬 점수 계산에만 쓰이고 AI Search 에는 올리지 않음)
+    LOCAL_INDEX_DTYPE = os.getenv("LOCAL_INDEX_DTYPE", "float16")
     
     # Azure AI Search 설정
     SEARCH_SERVICE_ENDPOINT = os.getenv("AZURE_SEARCH_ENDPOINT")
     SEARCH_API_KEY = os.getenv("AZURE_SEARCH_KEY")
     SEARCH_INDEX_NAME = "rag-1757924013216"
+    # 기간 필터용 날짜 필드 (인덱스에 filterable Edm.DateTimeOffset 필드를 추가한 경우에만 설정)
+    SEARCH_DATE_FIELD = os.getenv("SEARCH_DATE_FIELD", "")
+    
+    # HTTP 커넥션 풀 설정 (프로세스 전체에서 공유)
+    HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "60"))
     
     # Azure Blob Storage 설정
     BLOB_CONNECTION_STRING = os.getenv("AZURE_BLOB_CONNECTION_STRING")
     BLOB_CONTAINER_NAME = "project-documents"
     
+    # 청킹 설정
+    CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "1000"))
+    CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "100"))
+    
+    # CSV 인제스트 설정 (행 단위 문서, 임베딩/업로드 파이프라인 버퍼 크기)
+    CSV_METADATA_COLUMNS = ("project_type", "technology", "department")
+    CSV_PIPELINE_BATCH_SIZE = int(os.getenv("CSV_PIPELINE_BATCH_SIZE", "64"))
+    
+    # 대용량 파일 스트리밍 인제스트 (이 크기보다 큰 파일은 통째로 읽지 않고 블록 단위로 업로드하며 추출/인덱싱)
+    STREAMING_INGEST_THRESHOLD = int(os.getenv("STREAMING_INGEST_THRESHOLD", str(8 * 1024 * 1024)))
+    BLOB_BLOCK_SIZE = int(os.getenv("BLOB_BLOCK_SIZE", str(4 * 1024 * 1024)))
+    BLOB_UPLOAD_CONCURRENCY = int(os.getenv("BLOB_UPLOAD_CONCURRENCY", "4"))
+    
+    # 분석 결과 캐시 설정 (유사 질의 판정 코사인 유사도 임계값)
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "256"))
+    ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+    ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.97"))
+    
+    # 사이드바 서비스 상태/문서 통계 캐시 유효시간(초)
+    SERVICE_STATUS_TTL = float(os.getenv("SERVICE_STATUS_TTL", "60"))
+    
+    # 비동기 인제스트 동시 실행 수 (임베딩/Blob/Search 요청 합산)
+    INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "8"))
+    
+    # 분석 프롬프트에 넣을 유사 과제 컨텍스트 토큰 예산
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+    
+    # 유사 과제 검색 백엔드 ("azure": AI Search, "local": 프로세스 내 NumPy 인덱스)
+    RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "azure")
+    LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", ".cache/local_index.npz")
+    
+    # 검색 후보 수와 MMR 재정렬 설정 (관련도 가중치, 파일당 최대 청크 수)
+    RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", "50"))
+    MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))
+    MAX_CHUNKS_PER_FILE = int(os.getenv("MAX_CHUNKS_PER_FILE", "1"))
+    
+    # 상품 ID/테이블/Java BO·DO 식별자 역색인 경로 (빈 값이면 사용 안 함)
+    IDENTIFIER_INDEX_PATH = os.getenv("IDENTIFIER_INDEX_PATH", ".cache/identifier_index.json")
+    
+    # HTTP API 서버 설정 (워커 프로세스 수, 워커당 동기 호출 스레드 수 = 기본 커넥션 풀 크기)
+    API_WORKERS = int(os.getenv("API_WORKERS", "2"))
+    API_THREAD_LIMIT = int(os.getenv("API_THREAD_LIMIT", str(HTTP_POOL_MAXSIZE)))
+    
+    # Azure OpenAI 배포별 분당 할당량 (TPM/RPM, 0 이면 제한 없음)과 동시 요청 수 상한
+    CHAT_TOKENS_PER_MINUTE = int(os.getenv("CHAT_TOKENS_PER_MINUTE", "0"))
+    CHAT_REQUESTS_PER_MINUTE = int(os.getenv("CHAT_REQUESTS_PER_MINUTE", "0"))
+    EMBEDDING_TOKENS_PER_MINUTE = int(os.getenv("EMBEDDING_TOKENS_PER_MINUTE", "0"))
+    EMBEDDING_REQUESTS_PER_MINUTE = int(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", "0"))
+    OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", str(HTTP_POOL_MAXSIZE)))
+    # 429/일시 오류 재시도 설정 (최대 대기 시간: 화면/API 질의, 백그라운드 인제스트)
+    OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    INTERACTIVE_MAX_WAIT = float(os.getenv("INTERACTIVE_MAX_WAIT", "30"))
+    BACKGROUND_MAX_WAIT = float(os.getenv("BACKGROUND_MAX_WAIT", "600"))
+    
     # 환경변수 검증
     @classmethod
-    def validate_config(cls):
+    def get_missing_vars(cls) -> List[str]:
         required_vars = [
             'AZURE_OPENAI_ENDPOINT',
             'AZURE_OPENAI_KEY', 
@@ -52,7 +151,11 @@ class Config:
             'BLOB_CONNECTION_STRING'
         ]
         
-        missing_vars = [var for var in required_vars if not getattr(cls, var)]
+        return [var for var in required_vars if not getattr(cls, var)]
+    
+    @classmethod
+    def validate_config(cls):
+        missing_vars = cls.get_missing_vars()
         
         if missing_vars:
             st.error(f"다음 환경변수가 설정되지 않았습니다: {', '.join(missing_vars)}")
@@ -63,36 +166,187 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class AzureServices:
-    """Azure 서비스 연동 클래스"""
+    """Azure 서비스 연동 클래스 (HTTP 커넥션 풀을 클라이언트 간 공유, 클라이언트는 처음 사용할 때 생성)"""
+    
+    CLIENT_NAMES = ("openai_client", "blob_service_client", "search_client", "search_index_client")
     
     def __init__(self):
-        self.openai_client = AzureOpenAI(
+        self._clients: Dict[str, object] = {}
+        # 클라이언트 생성 중에 공유 세션을 만들 수 있도록 재진입 가능한 잠금 사용
+        self._lock = threading.RLock()
+    
+    @property
+    def http_session(self):
+        """Blob/Search 클라이언트가 함께 쓰는 requests 세션 (커넥션 풀, 첫 클라이언트 생성 때 import)"""
+        return self._client("http_session", self._create_http_session)
+    
+    @property
+    def openai_client(self):
+        return self._client("openai_client", self._create_openai_client)
+    
+    @property
+    def blob_service_client(self):
+        return self._client("blob_service_client", self._create_blob_service_client)
+    
+    @property
+    def search_client(self):
+        return self._client("search_client", self._create_search_client)
+    
+    @property
+    def search_index_client(self):
+        return self._client("search_index_client", self._create_search_index_client)
+    
+    def warm_up(self):
+        """모든 클라이언트를 미리 생성 (SDK import 포함, 네트워크 호출 없음)"""
+        for name in self.CLIENT_NAMES:
+            getattr(self, name)
+    
+    def _client(self, name: str, factory):
+        client = self._clients.get(name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = self._clients[name] = factory()
+        return client
+    
+    def _create_http_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=Config.HTTP_POOL_CONNECTIONS,
+            pool_maxsize=Config.HTTP_POOL_MAXSIZE
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    
+    def _create_openai_client(self):
+        import httpx
+        from openai import AzureOpenAI, DefaultHttpxClient
+        return AzureOpenAI(
             api_key=Config.AZURE_OPENAI_KEY,
             api_version=Config.AZURE_OPENAI_API_VERSION,
-            azure_endpoint=Config.AZURE_OPENAI_ENDPOINT
+            azure_endpoint=Config.AZURE_OPENAI_ENDPOINT,
+            # 429/일시 오류 재시도는 RateLimiter 가 할당량을 보며 처리
+            max_retries=0,
+            http_client=DefaultHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=Config.HTTP_POOL_MAXSIZE,
+                    max_keepalive_connections=Config.HTTP_POOL_MAXSIZE
+                ),
+                timeout=Config.HTTP_TIMEOUT
+            )
         )
-        
-        self.blob_service_client = BlobServiceClient.from_connection_string(
-            Config.BLOB_CONNECTION_STRING
+    
+    def _create_blob_service_client(self):
+        from azure.storage.blob import BlobServiceClient
+        return BlobServiceClient.from_connection_string(
+            Config.BLOB_CONNECTION_STRING,
+            transport=self._shared_transport()
         )
-        
-        self.search_client = SearchClient(
+    
+    def _create_search_client(self):
+        from azure.core.credentials import AzureKeyCredential
+        from azure.search.documents import SearchClient
+        return SearchClient(
             endpoint=Config.SEARCH_SERVICE_ENDPOINT,
             index_name=Config.SEARCH_INDEX_NAME,
-            credential=AzureKeyCredential(Config.SEARCH_API_KEY)
+            credential=AzureKeyCredential(Config.SEARCH_API_KEY),
+            transport=self._shared_transport()
         )
-        
-        self.search_index_client = SearchIndexClient(
+    
+    def _create_search_index_client(self):
+        from azure.core.credentials import AzureKeyCredential
+        from azure.search.documents.indexes import SearchIndexClient
+        return SearchIndexClient(
             endpoint=Config.SEARCH_SERVICE_ENDPOINT,
-            credential=AzureKeyCredential(Config.SEARCH_API_KEY)
+            credential=AzureKeyCredential(Config.SEARCH_API_KEY),
+            transport=self._shared_transport()
         )
+    
+    def _shared_transport(self):
+        from azure.core.pipeline.transport import RequestsTransport
+        return RequestsTransport(
+            session=self.http_session,
+            session_owner=False,
+            connection_timeout=Config.HTTP_TIMEOUT,
+            read_timeout=Config.HTTP_TIMEOUT
+        )
+
+@st.cache_resource(show_spinner=False)
+def get_tokenizer():
+    """프로세스 전체에서 공유하는 tiktoken 인코더 (Streamlit 재실행 간 재사용)"""
+    # 앱과 함께 배포한 BPE 캐시가 있으면 사용 (없으면 tiktoken 기본 위치에서 찾거나 내려받음)
+    if os.path.isdir(Config.TIKTOKEN_CACHE_DIR):
+        os.environ["TIKTOKEN_CACHE_DIR"] = Config.TIKTOKEN_CACHE_DIR
+    return tiktoken.encoding_for_model(Config.TOKENIZER_MODEL)
+
+def create_embedding_cache() -> Optional[EmbeddingCache]:
+    """임베딩 캐시 생성 (실패 시 캐시 없이 동작)"""
+    if not Config.EMBEDDING_CACHE_PATH:
+        return None
+    try:
+        return EmbeddingCache(
+            Config.EMBEDDING_CACHE_PATH,
+            max_entries=Config.EMBEDDING_CACHE_MAX_ENTRIES,
+            dtype=Config.EMBEDDING_CACHE_DTYPE
+        )
+    except Exception as e:
+        logger.warning(f"Embedding cache disabled: {str(e)}")
+        return None
+
+def embedding_cache_model() -> str:
+    """임베딩 캐시 키에 쓰는 모델 식별자 (차원 수 포함)"""
+    return EmbeddingCache.model_key(Config.EMBEDDING_MODEL, Config.EMBEDDING_DIMENSIONS)
+
+def create_rate_limiter(name: str, tokens_per_minute: int, requests_per_minute: int) -> RateLimiter:
+    """배포 하나의 할당량 스케줄러 생성 (프로세스 안의 모든 호출이 공유)"""
+    return RateLimiter(
+        name,
+        tokens_per_minute=tokens_per_minute,
+        requests_per_minute=requests_per_minute,
+        max_concurrency=Config.OPENAI_MAX_CONCURRENCY,
+        max_retries=Config.OPENAI_MAX_RETRIES,
+        interactive_max_wait=Config.INTERACTIVE_MAX_WAIT,
+        background_max_wait=Config.BACKGROUND_MAX_WAIT
+    )
+
+def create_identifier_index() -> Optional[IdentifierIndex]:
+    """식별자 역색인 생성 (실패 시 역색인 없이 동작)"""
+    if not Config.IDENTIFIER_INDEX_PATH:
+        return None
+    try:
+        return IdentifierIndex(Config.IDENTIFIER_INDEX_PATH)
+    except Exception as e:
+        logger.warning(f"Identifier index disabled: {str(e)}")
+        return None
 
 class DocumentProcessor:
     """문서 처리 및 인덱싱 클래스"""
     
-    def __init__(self, azure_services: AzureServices):
+    def __init__(self, azure_services: AzureServices, embedding_cache: Optional[EmbeddingCache] = None,
+                 tracer: Optional[Tracer] = None, identifier_index: Optional[IdentifierIndex] = None,
+                 rate_limiter: Optional[RateLimiter] = None, local_index: Optional[LocalVectorBackend] = None):
         self.azure_services = azure_services
-        self.tokenizer = tiktoken.encoding_for_model("gpt-4")
+        self.embedding_cache = embedding_cache
+        self.tracer = tracer or Tracer()
+        self.identifier_index = identifier_index
+        # 임베딩 배포 할당량 (인제스트 임베딩은 화면/API 질의보다 뒤로 양보)
+        self.rate_limiter = rate_limiter or RateLimiter("embedding")
+        # RETRIEVAL_BACKEND=local 이면 AI Search 에 올리거나 지운 청크를 로컬 벡터 인덱스에도 반영
+        self.local_index = local_index
+        # 문서마다 역색인/로컬 인덱스 파일 저장 (일괄 인제스트는 끄고 마지막에 한 번 저장)
+        self.autosave_indexes = True
+        self._tokenizer = None
+    
+    @property
+    def tokenizer(self):
+        """tiktoken 인코더 (처음 사용할 때 로드)"""
+        if self._tokenizer is None:
+            self._tokenizer = get_tokenizer()
+        return self._tokenizer
     
     def upload_document(self, file_content: bytes, filename: str, metadata: Dict) -> bool:
         """문서를 Blob Storage에 업로드"""
@@ -108,11 +362,12 @@ class DocumentProcessor:
                 "processed": "false"
             })
             
-            blob_client.upload_blob(
-                file_content,
-                metadata=metadata,
-                overwrite=True
-            )
+            with self.tracer.span("blob_upload", bytes=len(file_content)):
+                blob_client.upload_blob(
+                    file_content,
+                    metadata=metadata,
+                    overwrite=True
+                )
             
             logger.info(f"Document uploaded successfully: {filename}")
             return True
@@ -141,208 +396,934 @@ class DocumentProcessor:
             logger.error(f"Error extracting text: {str(e)}")
             return ""
     
-    def chunk_text(self, text: str, max_tokens: int = 1000) -> List[str]:
-        """텍스트를 청크로 분할"""
-        sentences = text.split('.')
-        chunks = []
-        current_chunk = ""
+    def chunk_text(self, text: str, max_tokens: int = Config.CHUNK_MAX_TOKENS) -> List[str]:
+        """텍스트를 청크로 분할 (문장별 1회 토큰화, 누적 토큰 수 기준)"""
+        chunker = TextChunker(
+            self.tokenizer,
+            max_tokens=max_tokens,
+            overlap_tokens=min(Config.CHUNK_OVERLAP_TOKENS, max_tokens // 2)
+        )
+        with self.tracer.span("chunking", chars=len(text)) as span:
+            chunks = chunker.chunk(text)
+            span.set(chunks=len(chunks))
+        return chunks
+    
+    def chunk_text_stream(self, blocks: Iterable[str], max_tokens: int = Config.CHUNK_MAX_TOKENS) -> Iterator[str]:
+        """텍스트 조각 스트림을 청크로 분할 (chunk_text 와 같은 결과, 전체 텍스트를 메모리에 두지 않음)"""
+        chunker = TextChunker(
+            self.tokenizer,
+            max_tokens=max_tokens,
+            overlap_tokens=min(Config.CHUNK_OVERLAP_TOKENS, max_tokens // 2)
+        )
+        return chunker.chunk_stream(blocks)
+    
+    def iter_text_blocks(self, file_stream: BinaryIO, file_type: str, block_chars: int = 1024 * 1024) -> Iterator[str]:
+        """텍스트 파일을 조각 단위로 디코딩 (extract_text_from_document 의 스트리밍 버전)
+        
+        디코딩 오류는 그대로 발생시킨다. 여기서 끝내면 sync_chunks 가 앞부분만 있는 문서를 완전한 새 버전으로 보고
+        뒷부분의 기존 청크를 지워 버린다.
+        """
+        errors = "strict" if file_type.lower() == "txt" else "ignore"
+        text_stream = io.TextIOWrapper(file_stream, encoding="utf-8", errors=errors, newline="")
+        try:
+            yield from iter(lambda: text_stream.read(block_chars), "")
+        except UnicodeDecodeError as e:
+            logger.error(f"Error extracting text: {str(e)}")
+            raise
+        finally:
+            # 업로드 파일 객체가 함께 닫히지 않도록 분리
+            text_stream.detach()
+    
+    def get_embedding(self, text: str) -> List[float]:
+        """텍스트 임베딩 생성"""
+        if not isinstance(text, str) or not text.strip():
+            logger.error("Embedding input must be a non-empty string")
+            return []
+        return self.get_embeddings([text])[0]
+    
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """여러 텍스트의 임베딩을 배치 요청으로 생성 (입력 순서 유지, 입력 오류로 거절된 항목은 빈 리스트)
         
-        for sentence in sentences:
-            test_chunk = current_chunk + sentence + "."
-            if len(self.tokenizer.encode(test_chunk)) <= max_tokens:
-                current_chunk = test_chunk
+        인증/설정 오류나 할당량 대기 초과처럼 입력과 무관한 오류는 그대로 발생시킨다.
+        """
+        embeddings: List[List[float]] = [[] for _ in texts]
+        valid_indices = [
+            i for i, text in enumerate(texts)
+            if isinstance(text, str) and text.strip()
+        ]
+        
+        missing = self.fill_cached_embeddings(texts, valid_indices, embeddings)
+        
+        for batch in self.iter_embedding_batches(texts, missing):
+            self._embed_batch(texts, batch, embeddings)
+        
+        self.store_cached_embeddings(texts, missing, embeddings)
+        return embeddings
+    
+    def fill_cached_embeddings(self, texts: List[str], indices: List[int], embeddings: List[List[float]]) -> List[int]:
+        """캐시에 있는 항목은 API 호출 없이 채우고, 캐시에 없는 인덱스 반환"""
+        if not self.embedding_cache or not indices:
+            return list(indices)
+        
+        cached = self.embedding_cache.get_many(
+            embedding_cache_model(), [texts[i] for i in indices]
+        )
+        missing = []
+        for i, embedding in zip(indices, cached):
+            if embedding is None:
+                missing.append(i)
             else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence + "."
+                embeddings[i] = embedding
+        return missing
+    
+    def store_cached_embeddings(self, texts: List[str], indices: List[int], embeddings: List[List[float]]):
+        """새로 생성한 임베딩을 캐시에 저장"""
+        if self.embedding_cache and indices:
+            self.embedding_cache.put_many(
+                embedding_cache_model(),
+                [texts[i] for i in indices],
+                [embeddings[i] for i in indices]
+            )
+    
+    def count_tokens(self, texts: List[str]) -> int:
+        """임베딩 요청의 할당량 차감 추정치"""
+        return sum(len(self.tokenizer.encode(text)) for text in texts)
+    
+    def iter_embedding_batches(self, texts: List[str], indices: List[int]) -> Iterator[List[int]]:
+        """입력 수와 토큰 수 상한을 모두 지키도록 인덱스 배치 생성"""
+        batch: List[int] = []
+        batch_tokens = 0
         
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        for i in indices:
+            n_tokens = len(self.tokenizer.encode(texts[i]))
+            if batch and (
+                len(batch) >= Config.EMBEDDING_BATCH_SIZE
+                or batch_tokens + n_tokens > Config.EMBEDDING_BATCH_MAX_TOKENS
+            ):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append(i)
+            batch_tokens += n_tokens
         
-        return chunks
+        if batch:
+            yield batch
     
-    def get_embedding(self, text: str) -> List[float]:
-        """텍스트 임베딩 생성"""
+    def _embed_batch(self, texts: List[str], batch: List[int], embeddings: List[List[float]]):
+        """배치 임베딩 요청 (429/일시 오류 재시도는 rate_limiter, 입력 오류 분할은 split_rejected_batch 가 담당)"""
+        inputs = [texts[i] for i in batch]
         try:
-            if not isinstance(text, str) or not text.strip():
-                logger.error("Embedding input must be a non-empty string")
-                return []
-            
-            response = self.azure_services.openai_client.embeddings.create(
-                model=Config.EMBEDDING_MODEL,
-                input=text
-            )
-            
-            embedding = response.data[0].embedding
-            
-            # 임베딩이 2차원 배열로 반환되는 경우 1차원으로 평탄화
-            if isinstance(embedding, list) and isinstance(embedding[0], list):
-                embedding = embedding[0]  # 첫 번째 배열을 선택
-            
-            return embedding
+            with self.tracer.span("chunk_embedding", inputs=len(inputs), bytes=payload_size(inputs)) as span:
+                response = self.rate_limiter.call(
+                    lambda: self.azure_services.openai_client.embeddings.create(
+                        input=inputs,
+                        **embedding_options(Config)
+                    ),
+                    self.count_tokens(inputs), BACKGROUND
+                )
+                span.set_usage(response.usage)
         except Exception as e:
-            logger.error(f"Error getting embedding: {str(e)}")
-            return []
+            for part in split_rejected_batch(e, batch):
+                self._embed_batch(texts, part, embeddings)
+            return
         
+        fill_embeddings(response, batch, embeddings)
+    
     def index_document(self, filename: str, content: str, metadata: Dict) -> bool:
-        """문서를 AI Search에 인덱싱"""
+        """문서를 AI Search에 인덱싱 (변경된 청크만 임베딩/업로드)"""
         try:
-            chunks = self.chunk_text(content)
-            documents = []
+            result = self.sync_chunks(
+                (filename, chunk, metadata) for chunk in self.chunk_text(content)
+            )
+            logger.info(
+                f"Indexed {filename}: {result['embedded']} new, {result['unchanged']} unchanged, "
+                f"{result['deleted']} deleted chunks"
+            )
+            return bool(result["chunk_ids"]) and not result["failed"]
             
-            for i, chunk in enumerate(chunks):
-                embedding = self.get_embedding(chunk)
-                if not embedding or not isinstance(embedding, list) or not all(isinstance(val, (int, float)) for val in embedding):
-                    logger.warning(f"Invalid embedding for chunk {i}, skipping this chunk.")
+        except Exception as e:
+            logger.error(f"Error indexing document: {str(e)}")
+            return False
+    
+    @staticmethod
+    def make_chunk_id(filename: str, chunk: str) -> str:
+        """파일명 + 청크 내용 해시 기반 청크 키 (같은 내용이면 항상 같은 키)"""
+        filename_hash = hashlib.sha1(filename.encode("utf-8")).hexdigest()[:16]
+        chunk_hash = hashlib.sha256(chunk.encode("utf-8")).hexdigest()[:32]
+        return f"{filename_hash}_{chunk_hash}"
+    
+    def build_search_document(self, filename: str, chunk: str, embedding: List[float], metadata: Dict) -> Optional[Dict]:
+        """AI Search 업로드용 문서 구성 (임베딩이 유효하지 않으면 None)"""
+        if not embedding or not isinstance(embedding, list) or not all(isinstance(val, (int, float)) for val in embedding):
+            return None
+        
+        document = {
+            "chunk_id": self.make_chunk_id(filename, chunk),
+            "filename": filename,
+            "chunk": chunk,
+            "text_vector": embedding,
+            "project_type": metadata.get("project_type"),  # 이미 영어
+            "technology": metadata.get("technology"),
+            "department": metadata.get("department")      # 이미 영어
+            # "chunk_index": i
+        }
+        if Config.SEARCH_DATE_FIELD:
+            document[Config.SEARCH_DATE_FIELD] = format_odata_datetime(metadata.get("upload_date") or datetime.now())
+        return document
+    
+    @staticmethod
+    def build_filename_filter(filenames: List[str]) -> str:
+        """파일명 목록에 대한 OData 필터"""
+        return " or ".join(
+            "filename eq '{}'".format(filename.replace("'", "''")) for filename in filenames
+        )
+    
+    def get_indexed_chunk_ids(self, filenames: List[str], batch_size: int = 50) -> set:
+        """파일명별로 현재 인덱스에 있는 청크 ID 조회 (실패 시 빈 집합 → 전체 업로드)"""
+        chunk_ids = set()
+        filenames = list(filenames)
+        try:
+            for start in range(0, len(filenames), batch_size):
+                results = self.azure_services.search_client.search(
+                    search_text="*",
+                    filter=self.build_filename_filter(filenames[start:start + batch_size]),
+                    select=["chunk_id"]
+                )
+                chunk_ids.update(result["chunk_id"] for result in results)
+        except Exception as e:
+            logger.warning(f"Error listing indexed chunks: {str(e)}")
+        return chunk_ids
+    
+    def iter_csv_records(self, file_stream: BinaryIO, source_name: str, default_metadata: Dict) -> Iterator[Tuple[str, str, Dict]]:
+        """CSV를 행 단위로 스트리밍하여 (문서명, 본문, 메타데이터) 생성"""
+        text_stream = io.TextIOWrapper(file_stream, encoding="utf-8-sig", errors="ignore", newline="")
+        try:
+            reader = csv.DictReader(text_stream)
+            for row_number, row in enumerate(reader, 1):
+                content = (row.get("content") or "").strip()
+                if not content:
+                    # content 컬럼이 없으면 메타데이터 외 컬럼을 "컬럼: 값" 형태로 구성
+                    content = "\n".join(
+                        f"{key}: {value.strip()}" for key, value in row.items()
+                        if key and key not in Config.CSV_METADATA_COLUMNS and key != "filename"
+                        and isinstance(value, str) and value.strip()
+                    )
+                if not content:
                     continue
                 
-                import uuid
-                doc_id = str(uuid.uuid4())
-                document = {
-                    "chunk_id": doc_id,
-                    "filename": filename,
-                    "chunk": chunk,
-                    "text_vector": embedding,
-                    "project_type": metadata.get("project_type"),  # 이미 영어
-                    "technology": metadata.get("technology"),
-                    "department": metadata.get("department")      # 이미 영어
-                    # "chunk_index": i
-                }
-                documents.append(document)
+                name = (row.get("filename") or "").strip() or f"{source_name}#{row_number}"
+                metadata = dict(default_metadata)
+                for column in Config.CSV_METADATA_COLUMNS:
+                    value = (row.get(column) or "").strip()
+                    if value:
+                        metadata[column] = value
+                
+                yield name, content, metadata
+        finally:
+            # 업로드 파일 객체가 함께 닫히지 않도록 분리
+            text_stream.detach()
+    
+    def iter_document_chunks(self, filename: str, file_content: bytes, metadata: Dict) -> Iterator[Tuple[str, str, Dict]]:
+        """파일 형식에 맞게 (문서명, 청크, 메타데이터) 생성 (CSV는 행 단위)"""
+        file_type = filename.split('.')[-1]
+        if file_type.lower() == 'csv':
+            for name, content, row_metadata in self.iter_csv_records(io.BytesIO(file_content), filename, metadata):
+                for chunk in self.chunk_text(content):
+                    yield name, chunk, row_metadata
+        else:
+            content = self.extract_text_from_document(file_content, file_type)
+            for chunk in self.chunk_text(content):
+                yield filename, chunk, metadata
+    
+    def iter_stream_chunks(self, filename: str, file_stream: BinaryIO, metadata: Dict) -> Iterator[Tuple[str, str, Dict]]:
+        """iter_document_chunks 의 스트리밍 버전: 파일을 읽는 만큼씩 (문서명, 청크, 메타데이터) 생성"""
+        file_type = filename.split('.')[-1]
+        if file_type.lower() == 'csv':
+            for name, content, row_metadata in self.iter_csv_records(file_stream, filename, metadata):
+                for chunk in self.chunk_text(content):
+                    yield name, chunk, row_metadata
+        elif file_type.lower() in ('pdf', 'docx'):
+            # 스트리밍 추출기가 없는 형식은 전체를 읽어 추출
+            content = self.extract_text_from_document(file_stream.read(), file_type)
+            for chunk in self.chunk_text(content):
+                yield filename, chunk, metadata
+        else:
+            for chunk in self.chunk_text_stream(self.iter_text_blocks(file_stream, file_type)):
+                yield filename, chunk, metadata
+    
+    def ingest_stream(self, filename: str, file_stream: BinaryIO, metadata: Dict, upload: bool = True) -> Dict:
+        """파일 스트림을 한 번만 읽으면서 Blob 블록 업로드와 추출 → 청킹 → 임베딩 → 인덱싱을 함께 진행
         
-            # AI Search에 문서 업로드
-            if documents:
-                result = self.azure_services.search_client.upload_documents(documents)
-                logger.info(f"Indexed {len(documents)} chunks for {filename}")
-                return True
-            
-            return False
-            
+        파일 전체, 추출한 텍스트, 전체 청크/임베딩 목록을 메모리에 두지 않으므로 파일 크기와 관계없이
+        업로드 블록(BLOB_BLOCK_SIZE x 동시 업로드 수)과 CSV_PIPELINE_BATCH_SIZE 만큼의 청크/임베딩만 유지한다.
+        결과는 sync_chunks 결과에 Blob 업로드 여부(uploaded)를 더한 것.
+        읽는 도중 오류(디코딩 실패 등)가 나면 이전 버전의 청크를 지우지 않고 Blob 업로드를 취소한 뒤 예외를 발생시킨다.
+        """
+        metadata = dict(metadata)
+        metadata.update({
+            "upload_date": datetime.now().isoformat(),
+            "processed": "false"
+        })
+        
+        writer = None
+        source = file_stream
+        if upload:
+            writer = BlockBlobWriter(
+                self.azure_services.blob_service_client.get_blob_client(
+                    container=Config.BLOB_CONTAINER_NAME,
+                    blob=filename
+                ),
+                block_size=Config.BLOB_BLOCK_SIZE,
+                max_concurrency=Config.BLOB_UPLOAD_CONCURRENCY
+            )
+            # 파서가 읽는 바이트를 그대로 블록 업로드에 전달
+            tee = TeeReader(file_stream, writer.write)
+            source = io.BufferedReader(tee)
+        
+        start = time.perf_counter()
+        try:
+            result = self.sync_chunks(self.iter_stream_chunks(filename, source, metadata))
+        except Exception:
+            if writer:
+                writer.abort()
+            raise
+        
+        result["uploaded"] = False
+        if writer:
+            tee.drain()
+            result["uploaded"] = writer.commit(metadata)
+            self.tracer.record("blob_upload", time.perf_counter() - start, bytes=writer.size)
+            if result["uploaded"]:
+                logger.info(f"Document uploaded successfully: {filename} ({writer.size} bytes)")
+        
+        logger.info(
+            f"Indexed {filename}: {result['embedded']} new, {result['unchanged']} unchanged, "
+            f"{result['deleted']} deleted, {result['failed']} failed chunks"
+        )
+        return result
+    
+    def index_file(self, filename: str, file_content: bytes, metadata: Dict) -> Dict:
+        """파일 하나를 인덱싱하고 현재 버전의 청크 ID와 처리량 통계 반환"""
+        result = self.sync_chunks(self.iter_document_chunks(filename, file_content, metadata))
+        logger.info(
+            f"Indexed {filename}: {result['embedded']} new, {result['unchanged']} unchanged, "
+            f"{result['deleted']} deleted, {result['failed']} failed chunks"
+        )
+        return result
+    
+    def sync_chunks(self, entries: Iterable[Tuple[str, str, Dict]]) -> Dict:
+        """(문서명, 청크, 메타데이터) 스트림을 인덱스와 동기화
+        
+        새로 생기거나 바뀐 청크만 임베딩하여 병합하고, 같은 문서명의 이전 버전에만 있던 청크는 한 번에 삭제한다.
+        임베딩하지 못한 청크(입력 오류로 거절)는 건너뛰지 않고 failed 로 집계하므로, failed 가 0 이 아니면
+        일부만 인덱싱된 것이다 (다시 처리하면 빠진 청크만 임베딩).
+        """
+        state = {
+            "chunk_ids": [],
+            "chunks": 0,
+            "tokens": 0,
+            "embedded": 0,
+            "unchanged": 0,
+            "deleted": 0,
+            "failed": 0,
+            "seen": set(),
+            "names": set(),
+            "existing": set()
+        }
+        pending: List[Tuple[str, str, str, Dict]] = []
+        
+        for name, chunk, metadata in entries:
+            chunk_id = self.make_chunk_id(name, chunk)
+            if chunk_id in state["seen"]:
+                continue
+            state["seen"].add(chunk_id)
+            state["chunks"] += 1
+            state["tokens"] += len(self.tokenizer.encode(chunk))
+            pending.append((chunk_id, name, chunk, metadata))
+            if len(pending) >= Config.CSV_PIPELINE_BATCH_SIZE:
+                self._flush_chunks(pending, state)
+                pending = []
+        
+        if pending:
+            self._flush_chunks(pending, state)
+        
+        stale = sorted(state["existing"] - state["seen"])
+        if stale:
+            state["deleted"] = self.delete_chunks(stale)
+        
+        if self.autosave_indexes:
+            self.save_indexes()
+        return {key: state[key] for key in ("chunk_ids", "chunks", "tokens", "embedded", "unchanged", "deleted", "failed")}
+    
+    def delete_chunks(self, chunk_ids: List[str], batch_size: int = 1000) -> int:
+        """청크 ID 목록을 AI Search 인덱스에서 삭제"""
+        deleted = 0
+        for start in range(0, len(chunk_ids), batch_size):
+            batch = chunk_ids[start:start + batch_size]
+            try:
+                self.azure_services.search_client.delete_documents(
+                    [{"chunk_id": chunk_id} for chunk_id in batch]
+                )
+                deleted += len(batch)
+                self.remove_from_indexes(batch)
+            except Exception as e:
+                logger.error(f"Error deleting chunks: {str(e)}")
+        return deleted
+    
+    def save_indexes(self):
+        """식별자 역색인과 (변경이 있으면) 로컬 벡터 인덱스를 파일에 저장"""
+        if self.identifier_index:
+            self.identifier_index.save()
+        if self.local_index is not None and self.local_index.path and self.local_index.dirty:
+            self.local_index.save()
+    
+    def delete_document(self, filename: str) -> bool:
+        """Blob Storage에서 문서 삭제"""
+        try:
+            blob_client = self.azure_services.blob_service_client.get_blob_client(
+                container=Config.BLOB_CONTAINER_NAME,
+                blob=filename
+            )
+            blob_client.delete_blob()
+            logger.info(f"Document deleted successfully: {filename}")
+            return True
         except Exception as e:
-            logger.error(f"Error indexing document: {str(e)}")
+            logger.error(f"Error deleting document: {str(e)}")
             return False
+    
+    def _flush_chunks(self, pending: List[Tuple[str, str, str, Dict]], state: Dict):
+        """버퍼에 모인 청크 중 인덱스에 없는 것만 한 번에 임베딩하고 병합"""
+        new_names = {name for _, name, _, _ in pending} - state["names"]
+        if new_names:
+            state["existing"] |= self.get_indexed_chunk_ids(sorted(new_names))
+            state["names"] |= new_names
+        
+        to_embed = []
+        for chunk_id, name, chunk, metadata in pending:
+            if chunk_id in state["existing"]:
+                state["unchanged"] += 1
+                state["chunk_ids"].append(chunk_id)
+                # 역색인 도입 전에 인덱싱된 청크도 다시 올리면 식별자가 등록됨
+                self.index_identifiers(chunk_id, chunk)
+            else:
+                to_embed.append((name, chunk, metadata))
+        
+        if not to_embed:
+            return
+        
+        embeddings = self.get_embeddings([chunk for _, chunk, _ in to_embed])
+        documents = []
+        
+        for (name, chunk, metadata), embedding in zip(to_embed, embeddings):
+            document = self.build_search_document(name, chunk, embedding, metadata)
+            if document is None:
+                logger.error(f"Failed to embed a chunk of {name}, marking it as failed.")
+                state["failed"] += 1
+                continue
+            documents.append(document)
+        
+        if documents:
+            with self.tracer.span("search_upload", documents=len(documents)):
+                self.azure_services.search_client.merge_or_upload_documents(documents)
+            state["embedded"] += len(documents)
+            state["chunk_ids"] += [document["chunk_id"] for document in documents]
+            self.add_to_indexes(documents)
+    
+    def index_identifiers(self, chunk_id: str, chunk: str):
+        """청크에 포함된 상품 ID/테이블/Java 심볼을 식별자 역색인에 등록"""
+        if self.identifier_index:
+            self.identifier_index.add(chunk_id, chunk)
+    
+    def add_to_indexes(self, documents: List[Dict]):
+        """AI Search 에 올린 문서를 식별자 역색인과 로컬 벡터 인덱스에 반영"""
+        for document in documents:
+            self.index_identifiers(document["chunk_id"], document["chunk"])
+        if self.local_index is not None:
+            self.local_index.add_documents(documents)
+    
+    def remove_from_indexes(self, chunk_ids: List[str]):
+        """AI Search 에서 지운 청크를 식별자 역색인과 로컬 벡터 인덱스에서 제거"""
+        if self.identifier_index:
+            self.identifier_index.remove(chunk_ids)
+        if self.local_index is not None:
+            self.local_index.delete_documents(chunk_ids)
+
+ANALYSIS_ERROR_MESSAGE = "요구사항 분석 중 오류가 발생했습니다."
+
+class AnalysisStream:
+    """스트리밍 분석 응답 래퍼 (토큰을 순서대로 내보내고 최종 텍스트/사용량 보관)
+    
+    요청/스트리밍 중 오류가 나면 오류 문구를 덧붙이고 failed 를 True 로 둔다 (앞부분이 생성된 뒤의 오류도 포함).
+    """
+    
+    def __init__(self, response, cached_text: Optional[str] = None, on_complete=None, coalesced: bool = False):
+        self.response = response
+        self.cached = cached_text is not None
+        self.coalesced = coalesced
+        self.failed = False
+        self.usage: Optional[Dict] = None
+        self.time_to_first_token: Optional[float] = None
+        self._cached_text = cached_text
+        self._on_complete = on_complete
+        self._parts: List[str] = []
+        self._started_at = time.perf_counter()
+    
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+    
+    def __iter__(self) -> Iterator[str]:
+        if self.cached:
+            # 캐시 적중 시 전체 텍스트를 한 번에 반환
+            self.time_to_first_token = time.perf_counter() - self._started_at
+            self._parts.append(self._cached_text)
+            yield self._cached_text
+            return
+        
+        if self.response is None:
+            self.failed = True
+            self._parts.append(ANALYSIS_ERROR_MESSAGE)
+            yield ANALYSIS_ERROR_MESSAGE
+            return
+        
+        try:
+            for chunk in self.response:
+                # include_usage 사용 시 마지막 청크는 choices 없이 usage만 포함
+                if getattr(chunk, "usage", None):
+                    self.usage = chunk.usage.model_dump()
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    if self.time_to_first_token is None:
+                        self.time_to_first_token = time.perf_counter() - self._started_at
+                    self._parts.append(content)
+                    yield content
+        except Exception as e:
+            logger.error(f"Error streaming analysis: {str(e)}")
+            self.failed = True
+            self._parts.append(ANALYSIS_ERROR_MESSAGE)
+            yield ANALYSIS_ERROR_MESSAGE
+            return
+        
+        if self._on_complete:
+            self._on_complete(self.text, self.usage)
 
 class ProjectAnalyzer:
     """과제 분석 클래스"""
     
-    def __init__(self, azure_services: AzureServices):
+    def __init__(self, azure_services: AzureServices, embedding_cache: Optional[EmbeddingCache] = None,
+                 answer_cache: Optional[AnswerCache] = None, backend: Optional[RetrievalBackend] = None,
+                 tracer: Optional[Tracer] = None, identifier_index: Optional[IdentifierIndex] = None,
+                 embedding_limiter: Optional[RateLimiter] = None, chat_limiter: Optional[RateLimiter] = None):
         self.azure_services = azure_services
+        self.embedding_cache = embedding_cache
+        self.answer_cache = answer_cache
+        # 빈 로컬 인덱스도 len() == 0 이라 거짓이므로 None 으로 비교
+        self.backend = backend if backend is not None else AzureSearchBackend(
+            lambda: azure_services.search_client, Config.SEARCH_DATE_FIELD or None
+        )
+        self.tracer = tracer or Tracer()
+        self.identifier_index = identifier_index
+        # 배포별 할당량 (화면/API 질의는 인제스트보다 먼저 실행)
+        self.embedding_limiter = embedding_limiter or RateLimiter("embedding")
+        self.chat_limiter = chat_limiter or RateLimiter("chat")
+        # 같은 질의가 동시에 들어오면 임베딩/검색/채팅 완성을 한 번만 실행
+        self.single_flight = SingleFlight()
+        self._context_packer = None
+        # (정규화한 검색어, 결과 청크 ID 집합)별 검색 쿼리 임베딩 (같은 입력의 답변 캐시 비교에 재사용)
+        self._search_vectors: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._search_vectors_lock = threading.Lock()
+    
+    @property
+    def tokenizer(self):
+        """tiktoken 인코더 (처음 사용할 때 로드)"""
+        return self.context_packer.tokenizer
     
-    def search_similar_projects(self, query: str, top_k: int = 2) -> List[Dict]:
-        """유사한 과제 검색"""
+    @property
+    def context_packer(self) -> ContextPacker:
+        if self._context_packer is None:
+            self._context_packer = ContextPacker(get_tokenizer(), max_tokens=Config.CONTEXT_TOKEN_BUDGET)
+        return self._context_packer
+    
+    def search_similar_projects(self, query: str, top_k: int = 2, filters: Optional[Dict] = None) -> List[Dict]:
+        """유사한 과제 검색 (같은 조건의 검색이 진행 중이면 그 결과를 함께 사용)
+        
+        필터 형식이 잘못되면 빈 결과 대신 InvalidFilterError 를 발생시킨다.
+        """
+        filters = validate_filters(filters)
+        projects = self.single_flight.do(
+            "search", make_key(query, top_k, filters or {}),
+            lambda: self._search_similar_projects(query, top_k, filters)
+        )
+        return [dict(project) for project in projects]
+    
+    def _search_similar_projects(self, query: str, top_k: int, filters: Optional[Dict]) -> List[Dict]:
         try:
+            # 질의의 식별자로 찾은 청크가 top_k 를 채우면 임베딩/벡터 검색 생략
+            identifier_matches = self._search_identifiers(query, top_k, filters)
+            if len(identifier_matches) >= top_k:
+                return identifier_matches[:top_k]
+            
             # 쿼리 임베딩 생성
             query_embedding = self._get_query_embedding(query)
             if not query_embedding:
-                return []
+                return identifier_matches
             
-            # 벡터 검색 수행
-            vector_query = VectorizedQuery(
-                vector=query_embedding,
-                k_nearest_neighbors=top_k,
-                fields="text_vector"
-            )
+            # 넓은 후보군을 벡터와 함께 검색
+            with self.tracer.span("vector_search", top_k=top_k) as span:
+                candidates = self.backend.search(
+                    query, query_embedding, max(top_k, Config.RETRIEVAL_CANDIDATES), filters, include_vectors=True
+                )
+                span.set(results=len(candidates))
             
-            results = self.azure_services.search_client.search(
-                search_text=query,
-                vector_queries=[vector_query],
-                select=["filename", "chunk", "project_type", "technology", "department"],
-                top=top_k
-            )
-
-            similar_projects = []
-            for result in results:
-                print(result.get("@search.score", 0))
-                similar_projects.append({
-                    "filename": result.get("filename", ""),
-                    "chunk": result.get("chunk", ""),
-                    "project_type": result.get("project_type", ""),
-                    "technology": result.get("technology", ""),
-                    "department": result.get("department", ""),
-                    "score": result.get("@search.score", 0)
-                    # "upload_date": result.get("upload_date", "")
-                })
+            # MMR + 파일별 개수 제한으로 서로 다른 문서 위주의 top_k 선택
+            with self.tracer.span("rerank", candidates=len(candidates)):
+                similar_projects = mmr_rerank(
+                    query_embedding, candidates, top_k, Config.MMR_LAMBDA, Config.MAX_CHUNKS_PER_FILE
+                )
             
+            similar_projects = [
+                {key: value for key, value in project.items() if key != "vector"}
+                for project in similar_projects
+            ]
+            if identifier_matches:
+                # 식별자 일치 결과를 앞에 두고 벡터 결과로 나머지를 채움
+                matched_ids = {project["chunk_id"] for project in identifier_matches}
+                merged = identifier_matches + [p for p in similar_projects if p["chunk_id"] not in matched_ids]
+                similar_projects = dedupe_by_file(merged, top_k, Config.MAX_CHUNKS_PER_FILE)
+            
+            self._remember_search_vector(query, similar_projects, query_embedding)
             return similar_projects
             
         except Exception as e:
             logger.error(f"Error searching similar projects: {str(e)}")
             return []
     
+    def _search_identifiers(self, query: str, top_k: int, filters: Optional[Dict] = None) -> List[Dict]:
+        """식별자 역색인 조회 (일치 식별자가 많은 순, 파일별 개수 제한)"""
+        if not self.identifier_index:
+            return []
+        
+        with self.tracer.span("identifier_lookup") as span:
+            ranked = self.identifier_index.rank(query)[:max(top_k, Config.RETRIEVAL_CANDIDATES)]
+            span.set(matches=len(ranked))
+            if not ranked:
+                return []
+            
+            query_identifiers = {identifier for match in ranked for identifier in match["identifiers"]}
+            matched = {match["chunk_id"]: match["identifiers"] for match in ranked}
+            documents = self.backend.get_documents(list(matched), filters)
+            if not filters and len(documents) < len(matched):
+                # 역색인에는 있지만 검색 백엔드에 없는 청크 (로컬 인덱스가 AI Search 보다 오래된 경우 등)
+                logger.warning(
+                    f"{len(matched) - len(documents)} identifier match(es) are missing from the retrieval backend"
+                )
+        
+        results, per_file = [], {}
+        for document in documents:
+            filename = document.get("filename", "")
+            if Config.MAX_CHUNKS_PER_FILE > 0 and per_file.get(filename, 0) >= Config.MAX_CHUNKS_PER_FILE:
+                continue
+            per_file[filename] = per_file.get(filename, 0) + 1
+            identifiers = matched[document["chunk_id"]]
+            document["score"] = len(identifiers) / len(query_identifiers)
+            document["matched_identifiers"] = identifiers
+            results.append(document)
+        return results
+    
     def _get_query_embedding(self, query: str) -> List[float]:
-        """쿼리 임베딩 생성"""
+        """쿼리 임베딩 생성 (같은 질의의 임베딩 요청이 진행 중이면 그 결과를 함께 사용)"""
+        return self.single_flight.do("query_embedding", make_key(query), lambda: self._embed_query(query))
+    
+    def _embed_query(self, query: str) -> List[float]:
         try:
-            response = self.azure_services.openai_client.embeddings.create(
-                model=Config.EMBEDDING_MODEL,
-                input=query
-            )
-            return response.data[0].embedding
+            if self.embedding_cache:
+                cached = self.embedding_cache.get(embedding_cache_model(), query)
+                if cached is not None:
+                    return cached
+            
+            with self.tracer.span("query_embedding", bytes=payload_size([query])) as span:
+                response = self.embedding_limiter.call(
+                    lambda: self.azure_services.openai_client.embeddings.create(
+                        input=query,
+                        **embedding_options(Config)
+                    ),
+                    len(self.tokenizer.encode(query)), INTERACTIVE
+                )
+                span.set_usage(response.usage)
+            embedding = response.data[0].embedding
+            
+            if self.embedding_cache:
+                self.embedding_cache.put(embedding_cache_model(), query, embedding)
+            return embedding
         except Exception as e:
             logger.error(f"Error getting query embedding: {str(e)}")
             return []
     
     def analyze_requirements(self, user_input: str, similar_projects: List[Dict]) -> str:
-        """요구사항 분석 및 개발 기능 제안"""
+        """요구사항 분석 및 개발 기능 제안 (같은 입력/컨텍스트의 분석이 진행 중이면 그 결과를 함께 사용)"""
+        return self.single_flight.do(
+            "analysis", make_key(user_input, self._context_ids(similar_projects)),
+            lambda: self._analyze_requirements(user_input, similar_projects)
+        )
+    
+    def _analyze_requirements(self, user_input: str, similar_projects: List[Dict]) -> str:
         try:
-            # 유사 과제 정보를 컨텍스트로 구성
-            context = self._build_context(similar_projects)
+            cache_key, cached = self._lookup_answer(user_input, similar_projects)
+            if cached is not None:
+                return cached["text"]
             
-            system_prompt = """
-            당신은 KT 빌링 시스템 전문가입니다. 사용자의 개발 요구사항을 분석하여 다음을 제공해주세요:
-            
-            1. 개발이 필요한 주요 기능들
-            2. 유사한 과거 프로젝트와의 비교 분석
-            
-            답변은 구체적이고 실용적으로 작성해주시고 모든 답변은 {context} 기반으로 작성하세요. {context}에 없는 내용은 작성하지 마시고 {context} 에 상품레퍼런스, 청구레퍼런스 내용 및 자바소스 관련 내용이 있다면 반드시 적어주세요.
+            messages = self._build_messages(user_input, similar_projects)
+            with self.tracer.span("chat_completion", bytes=payload_size([m["content"] for m in messages])) as span:
+                response = self.chat_limiter.call(
+                    lambda: self.azure_services.openai_client.chat.completions.create(
+                        model=Config.CHAT_MODEL,
+                        messages=messages,
+                        temperature=0.3,
+                        max_tokens=2000
+                    ),
+                    estimate_chat_tokens(self.tokenizer, messages, 2000), INTERACTIVE
+                )
+                span.set_usage(response.usage)
             
-            """
+            content = response.choices[0].message.content
+            usage = response.usage.model_dump() if response.usage else None
+            logger.debug(f"Analysis response: {len(content or '')} chars, usage={usage}")
+            self._store_answer(cache_key, content, usage)
+            return content
             
-            user_prompt = f"""
-            신규 개발 요구사항:
-            {user_input}
+        except Exception as e:
+            logger.error(f"Error analyzing requirements: {str(e)}")
+            return ANALYSIS_ERROR_MESSAGE
+    
+    def analyze_requirements_stream(self, user_input: str, similar_projects: List[Dict]) -> "AnalysisStream":
+        """요구사항 분석을 토큰 단위로 스트리밍 (순회가 끝나면 text/usage 사용 가능)
+        
+        같은 입력/컨텍스트의 스트림이 생성 중이면 새로 요청하지 않고 그 응답을 처음부터 함께 받는다.
+        """
+        try:
+            cache_key, cached = self._lookup_answer(user_input, similar_projects)
+            if cached is not None:
+                stream = AnalysisStream(None, cached_text=cached["text"])
+                stream.usage = cached["usage"]
+                return stream
             
-            참고할 수 있는 과거 유사 프로젝트:
-            {context}
+            request = {}
             
-            위 정보를 바탕으로 개발이 필요한 기능과 과거 프로젝트와의 비교를 포함하여 분석해주세요.
-            conetext에 있는 내용만 참고하세요.
-            """
+            def start():
+                request["messages"] = self._build_messages(user_input, similar_projects)
+                request["started"] = time.perf_counter()
+                # 응답 헤더를 받을 때까지만 순서를 잡음 (429 는 스트림 시작 전에 옴)
+                return self.chat_limiter.call(
+                    lambda: self.azure_services.openai_client.chat.completions.create(
+                        model=Config.CHAT_MODEL,
+                        messages=request["messages"],
+                        temperature=0.3,
+                        max_tokens=2000,
+                        stream=True,
+                        stream_options={"include_usage": True}
+                    ),
+                    estimate_chat_tokens(self.tokenizer, request["messages"], 2000), INTERACTIVE
+                )
             
-            response = self.azure_services.openai_client.chat.completions.create(
-                model=Config.CHAT_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,
-                max_tokens=2000
+            response, leader = self.single_flight.stream(
+                "analysis_stream", make_key(user_input, self._context_ids(similar_projects)), start
             )
-            print(1)
-            print(response)
+            if not leader:
+                return AnalysisStream(response, coalesced=True)
             
-            return response.choices[0].message.content
+            def on_complete(text: str, usage: Optional[Dict]):
+                # 스트림을 끝까지 읽은 시점까지를 채팅 완성 구간으로 기록
+                self.tracer.record(
+                    "chat_completion",
+                    time.perf_counter() - request["started"],
+                    bytes=payload_size([m["content"] for m in request["messages"]]),
+                    **{key: (usage or {}).get(key) for key in ("prompt_tokens", "completion_tokens", "total_tokens")}
+                )
+                self._store_answer(cache_key, text, usage)
+            
+            return AnalysisStream(response, on_complete=on_complete)
             
         except Exception as e:
             logger.error(f"Error analyzing requirements: {str(e)}")
-            return "요구사항 분석 중 오류가 발생했습니다."
+            return AnalysisStream(None)
+    
+    def _lookup_answer(self, user_input: str, similar_projects: List[Dict]):
+        """답변 캐시 조회 (입력 + 검색된 청크 ID 집합, 근접 중복 질의는 임베딩 유사도)"""
+        if not self.answer_cache:
+            return None, None
+        
+        chunk_ids = self._context_ids(similar_projects)
+        # 정확한 키가 없을 때만 입력 임베딩 사용: 같은 입력으로 이 결과를 검색했으면 그 벡터, 아니면 입력을 임베딩
+        vector = {"value": self._search_vector(user_input, chunk_ids)}
+        
+        def query_embedding():
+            if vector["value"] is None:
+                vector["value"] = self._get_query_embedding(user_input)
+            return vector["value"]
+        
+        cached = self.answer_cache.get(user_input, chunk_ids, query_embedding)
+        return (user_input, chunk_ids, vector["value"]), cached
+    
+    def _remember_search_vector(self, query: str, similar_projects: List[Dict], query_embedding: List[float]):
+        if not self.answer_cache or not similar_projects:
+            return
+        # 답변 캐시 키와 같은 규칙 (입력 정규화 + 청크 ID 집합) 이므로 다른 질의의 벡터와 섞이지 않음
+        key = AnswerCache.make_key(query, self._context_ids(similar_projects))
+        with self._search_vectors_lock:
+            self._search_vectors[key] = query_embedding
+            self._search_vectors.move_to_end(key)
+            while len(self._search_vectors) > self.answer_cache.max_entries:
+                self._search_vectors.popitem(last=False)
+    
+    def _search_vector(self, user_input: str, chunk_ids: List[str]) -> Optional[List[float]]:
+        with self._search_vectors_lock:
+            return self._search_vectors.get(AnswerCache.make_key(user_input, chunk_ids))
+    
+    @staticmethod
+    def _context_ids(similar_projects: List[Dict]) -> List[str]:
+        """분석 컨텍스트를 구분하는 청크 ID 목록 (ID 가 없으면 본문 해시)"""
+        return [
+            project.get("chunk_id") or hashlib.sha256(project.get("chunk", "").encode("utf-8")).hexdigest()
+            for project in similar_projects
+        ]
+    
+    def _store_answer(self, cache_key, text: str, usage: Optional[Dict]):
+        if self.answer_cache and cache_key and text:
+            user_input, chunk_ids, query_embedding = cache_key
+            self.answer_cache.put(user_input, chunk_ids, query_embedding, text, usage)
+    
+    def _build_messages(self, user_input: str, similar_projects: List[Dict]) -> List[Dict]:
+        """분석 요청 프롬프트 구성"""
+        # 유사 과제 정보를 컨텍스트로 구성
+        with self.tracer.span("context_building", projects=len(similar_projects)) as span:
+            packed = self.context_packer.pack(similar_projects)
+            context = packed.text
+            span.set(chars=len(context), context_tokens=packed.tokens, duplicates=packed.duplicates)
+        logger.debug(
+            f"Packed context: {packed.tokens}/{self.context_packer.max_tokens} tokens, "
+            f"{packed.files} files, {packed.sentences} sentences, truncated={packed.truncated}"
+        )
+        
+        system_prompt = """
+        당신은 KT 빌링 시스템 전문가입니다. 사용자의 개발 요구사항을 분석하여 다음을 제공해주세요:
+        
+        1. 개발이 필요한 주요 기능들
+        2. 유사한 과거 프로젝트와의 비교 분석
+        
+        답변은 구체적이고 실용적으로 작성해주시고 모든 답변은 {context} 기반으로 작성하세요. {context}에 없는 내용은 작성하지 마시고 {context} 에 상품레퍼런스, 청구레퍼런스 내용 및 자바소스 관련 내용이 있다면 반드시 적어주세요.
+        
+        """
+        
+        user_prompt = f"""
+        신규 개발 요구사항:
+        {user_input}
+        
+        참고할 수 있는 과거 유사 프로젝트:
+        {context}
+        
+        위 정보를 바탕으로 개발이 필요한 기능과 과거 프로젝트와의 비교를 포함하여 분석해주세요.
+        conetext에 있는 내용만 참고하세요.
+        """
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
     
     def _build_context(self, similar_projects: List[Dict]) -> str:
-        """유사 프로젝트 컨텍스트 구성"""
-        if not similar_projects:
-            return "관련된 과거 프로젝트를 찾을 수 없습니다."
-        
-        context = "=== 과거 유사 프로젝트 정보 ===\n\n"
-        for i, project in enumerate(similar_projects, 1):
-            context += f"프로젝트 {i}:\n"
-            context += f"- 파일명: {project['filename']}\n"
-            context += f"- 프로젝트 유형: {project['project_type']}\n"
-            context += f"- 기술스택: {project['technology']}\n"
-            context += f"- 담당부서: {project['department']}\n"
-            context += f"- 유사도: {project['score']:.2f}\n"
-            context += f"- 내용: {project['chunk'][:500]}...\n"
-            context += "\n" + "="*50 + "\n\n"
-        
-        return context
+        """유사 프로젝트 컨텍스트 구성 (토큰 예산 안에서 유사도 순으로 문장 단위 패킹)"""
+        return self.context_packer.pack(similar_projects).text
+
+def create_retrieval_backend(azure_services: AzureServices) -> RetrievalBackend:
+    """설정에 따른 검색 백엔드 생성
+    
+    로컬 백엔드도 AI Search 인덱스를 원본으로 사용한다. 인덱스 파일이 없으면 AI Search 에서 한 번 내려받아 저장하고,
+    이후 인제스트/삭제는 DocumentProcessor 가 AI Search 와 함께 반영해 파일에 저장한다.
+    """
+    if Config.RETRIEVAL_BACKEND != "local":
+        # 검색 클라이언트는 첫 검색 때 생성
+        return AzureSearchBackend(lambda: azure_services.search_client, Config.SEARCH_DATE_FIELD or None)
+    
+    if os.path.exists(Config.LOCAL_INDEX_PATH):
+        return LocalVectorBackend.load(Config.LOCAL_INDEX_PATH, Config.SEARCH_DATE_FIELD or None)
+    
+    backend = LocalVectorBackend.from_search_client(
+        azure_services.search_client, dtype=Config.LOCAL_INDEX_DTYPE, date_field=Config.SEARCH_DATE_FIELD or None
+    )
+    backend.save(Config.LOCAL_INDEX_PATH)
+    logger.info(f"Built local vector index with {len(backend)} chunks")
+    return backend
+
+class AppServices:
+    """세션/스레드 간 공유하는 서비스 객체 묶음 (클라이언트, 캐시, 처리기)"""
+    
+    def __init__(self):
+        self.azure_services = AzureServices()
+        self.embedding_cache = create_embedding_cache()
+        self.identifier_index = create_identifier_index()
+        self.tracer = Tracer()
+        # 배포별 할당량 스케줄러 (화면/API/일괄 분석/인제스트가 모두 공유)
+        self.embedding_limiter = create_rate_limiter(
+            "embedding", Config.EMBEDDING_TOKENS_PER_MINUTE, Config.EMBEDDING_REQUESTS_PER_MINUTE
+        )
+        self.chat_limiter = create_rate_limiter(
+            "chat", Config.CHAT_TOKENS_PER_MINUTE, Config.CHAT_REQUESTS_PER_MINUTE
+        )
+        self.retrieval_backend = create_retrieval_backend(self.azure_services)
+        self.document_processor = DocumentProcessor(
+            self.azure_services, self.embedding_cache, self.tracer, self.identifier_index, self.embedding_limiter,
+            self.retrieval_backend if isinstance(self.retrieval_backend, LocalVectorBackend) else None
+        )
+        self.answer_cache = AnswerCache(
+            max_entries=Config.ANSWER_CACHE_MAX_ENTRIES,
+            ttl=Config.ANSWER_CACHE_TTL,
+            similarity_threshold=Config.ANSWER_CACHE_SIMILARITY
+        )
+        self.project_analyzer = ProjectAnalyzer(
+            self.azure_services, self.embedding_cache, self.answer_cache, self.retrieval_backend, self.tracer,
+            self.identifier_index, self.embedding_limiter, self.chat_limiter
+        )
+        self.ingestion_engine = AsyncIngestionEngine(
+            self.document_processor, Config, concurrency=Config.INGEST_CONCURRENCY
+        )
+        self.service_monitor = ServiceMonitor(
+            self.azure_services, ttl=Config.SERVICE_STATUS_TTL, retrieval_backend=self.retrieval_backend
+        )
+    
+    def warm_up(self) -> threading.Thread:
+        """토크나이저 로드와 클라이언트 생성을 백그라운드에서 미리 실행 (첫 요청 지연 단축)
+        
+        생성 자체는 기다리지 않으므로 바로 요청을 받을 수 있고, 실패하면 첫 사용 때 다시 시도한다.
+        """
+        def run():
+            start = time.perf_counter()
+            try:
+                get_tokenizer()
+                self.azure_services.warm_up()
+                logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+            except Exception as e:
+                logger.warning(f"Warm-up failed: {str(e)}")
+        
+        thread = threading.Thread(target=run, name="warm-up", daemon=True)
+        thread.start()
+        return thread
+    
+    def to_prometheus(self) -> str:
+        """단계별 지연/토큰, 동시 요청 합침, 할당량 스케줄러 지표 (Prometheus 텍스트 형식)"""
+        return (
+            self.tracer.to_prometheus()
+            + self.project_analyzer.single_flight.to_prometheus()
+            + self.embedding_limiter.to_prometheus()
+            + self.chat_limiter.to_prometheus()
+        )
+
+@st.cache_resource(show_spinner=False)
+def get_app_services() -> AppServices:
+    """프로세스 수명 동안 한 번만 생성 (Streamlit 재실행마다 새로 만들지 않음)"""
+    services = AppServices()
+    services.warm_up()
+    return services
 
 class StreamlitApp:
     """Streamlit 앱 클래스"""
@@ -351,9 +1332,16 @@ class StreamlitApp:
         # 환경변수 검증
         Config.validate_config()
         
-        self.azure_services = AzureServices()
-        self.document_processor = DocumentProcessor(self.azure_services)
-        self.project_analyzer = ProjectAnalyzer(self.azure_services)
+        # 클라이언트/토크나이저/캐시는 프로세스 전체에서 공유 (재실행마다 새로 만들지 않음)
+        services = get_app_services()
+        self.azure_services = services.azure_services
+        self.embedding_cache = services.embedding_cache
+        self.document_processor = services.document_processor
+        self.project_analyzer = services.project_analyzer
+        self.ingestion_engine = services.ingestion_engine
+        self.service_monitor = services.service_monitor
+        self.tracer = services.tracer
+        self.services = services
     
     def run(self):
         st.set_page_config(
@@ -395,7 +1383,54 @@ class StreamlitApp:
         # 통계 정보
         st.sidebar.subheader("문서 통계")
         total_docs = self._get_document_count()
-        st.sidebar.metric("저장된 문서 수", total_docs)
+        st.sidebar.metric("인덱싱된 청크 수", total_docs)
+        
+        # 단계별 지연/토큰 사용량 (디버그)
+        with st.sidebar.expander("🔍 단계별 지연/토큰 사용량"):
+            self._render_trace_panel()
+    
+    def _render_trace_panel(self):
+        snapshot = self.tracer.snapshot()
+        if not snapshot["stages"]:
+            st.caption("아직 기록된 단계가 없습니다.")
+            return
+        
+        rows = []
+        for stage, stats in snapshot["stages"].items():
+            totals = stats["totals"]
+            rows.append({
+                "단계": stage,
+                "호출": stats["count"],
+                "평균(ms)": round(stats["mean_seconds"] * 1000, 1),
+                "p95(ms)": round(stats["quantiles"]["0.95"] * 1000, 1),
+                "합계(s)": round(stats["total_seconds"], 2),
+                "토큰": int(totals.get("total_tokens", 0)),
+                "바이트": int(totals.get("bytes", 0)),
+                "오류": stats["errors"]
+            })
+        st.dataframe(rows, hide_index=True)
+        
+        # 동시에 들어온 같은 요청을 합친 횟수 (single-flight)
+        coalesced = self.project_analyzer.single_flight.stats()
+        if coalesced:
+            st.caption("동시 동일 요청 합침: " + ", ".join(
+                f"{name} {counts['coalesced']}/{counts['executed'] + counts['coalesced']}"
+                for name, counts in coalesced.items()
+            ))
+        
+        # 할당량 스케줄러 상태 (429 횟수, 현재 동시 실행 한도, 대기 중인 요청)
+        for limiter in (self.services.embedding_limiter, self.services.chat_limiter):
+            stats = limiter.stats()
+            st.caption(
+                f"{limiter.name} 할당량: 429 {stats['throttled']}회, 동시 {stats['in_flight']}/{stats['concurrency_limit']}, "
+                f"대기 {stats['waiting']}건 (누적 {stats['wait_seconds']:.1f}s)"
+            )
+        
+        metrics = self.services.to_prometheus()
+        st.download_button("JSON 스냅샷", self.tracer.to_json(), file_name="trace.json", mime="application/json")
+        st.download_button("Prometheus 형식", metrics, file_name="metrics.prom", mime="text/plain")
+        if st.button("통계 초기화"):
+            self.tracer.reset()
     
     def _render_analysis_tab(self):
         st.header("과제 분석")
@@ -410,77 +1445,128 @@ class StreamlitApp:
                 placeholder="상세한 개발 요구사항을 입력해주세요..."
             )
             
+            with st.expander("검색 필터"):
+                filters = self._render_search_filters()
+            
             submitted = st.form_submit_button("분석 시작", type="primary")
         
         if submitted and requirements:
-            with st.spinner("과제를 분석하고 있습니다..."):
-                # 유사 프로젝트 검색
+            with st.spinner("유사 과제를 검색하고 있습니다..."):
+                # 유사 프로젝트 검색 (선택한 필터는 검색 서비스에서 적용)
                 search_query = f"{project_title} {requirements}"
-                similar_projects = self.project_analyzer.search_similar_projects(search_query)
-                
-                # 요구사항 분석
-                analysis_result = self.project_analyzer.analyze_requirements(
+                try:
+                    similar_projects = self.project_analyzer.search_similar_projects(search_query, filters=filters)
+                except InvalidFilterError as e:
+                    st.error(f"검색 필터가 올바르지 않습니다: {str(e)}")
+                    return
+            
+            col1, col2 = st.columns([2, 1])
+            
+            # 유사 과제를 먼저 보여주고 분석 결과는 생성되는 대로 표시
+            with col2:
+                self._render_similar_projects(similar_projects)
+            
+            with col1:
+                st.subheader("📋 분석 결과")
+                stream = self.project_analyzer.analyze_requirements_stream(
                     requirements, similar_projects
                 )
-                
-                # 결과 표시
-                st.success("분석이 완료되었습니다!")
-                
-                col1, col2 = st.columns([2, 1])
-                
-                with col1:
-                    st.subheader("📋 분석 결과")
-                    st.markdown(analysis_result)
-                
-                with col2:
-                    st.subheader("📚 유사 과제")
-                    if similar_projects:
-                        # 영문 코드를 한국어로 변환
-                        project_type_map = {
-                            "billing_system": "빌링 시스템",
-                            "customer_management": "고객관리", 
-                            "settlement_system": "정산 시스템",
-                            "mobile_app": "모바일 앱",
-                            "web_service": "웹 서비스",
-                            "data_analysis": "데이터 분석",
-                            "infrastructure": "인프라",
-                            "security": "보안",
-                            "others": "기타"
-                        }
-                        
-                        department_map = {
-                            "development_team": "개발팀",
-                            "planning_team": "기획팀",
-                            "operations_team": "운영팀",
-                            "quality_assurance_team": "품질팀",
-                            "data_team": "데이터팀",
-                            "infrastructure_team": "인프라팀", 
-                            "security_team": "보안팀",
-                            "others": "기타"
-                        }
-                        
-                        for i, project in enumerate(similar_projects[:2], 1):
-                            with st.expander(f"유사 과제 {i} (유사도: {project['score']:.2f})"):
-                                st.write(f"**파일명:** {project['filename']}")
-                                
-                                project_type_kr = project_type_map.get(project['project_type'], project['project_type'])
-                                department_kr = department_map.get(project['department'], project['department'])
-                                
-                                st.write(f"**프로젝트 유형:** {project_type_kr}")
-                                st.write(f"**기술스택:** {project['technology']}")
-                                st.write(f"**담당부서:** {department_kr}")
-                                st.write(f"**내용:** {project['chunk'][:500]}...")
-                    else:
-                        st.info("유사한 과거 과제를 찾을 수 없습니다.")
+                st.write_stream(stream)
+                if stream.cached:
+                    st.caption("⚡ 유사한 요청의 캐시된 분석 결과입니다.")
+            
+            logger.info(
+                f"Analysis completed: cached={stream.cached}, coalesced={stream.coalesced}, "
+                f"time_to_first_token={stream.time_to_first_token}, "
+                f"chars={len(stream.text)}, usage={stream.usage}"
+            )
+            st.success("분석이 완료되었습니다!")
+    
+    def _render_search_filters(self) -> Dict:
+        """메타데이터 필터 입력 (선택지와 청크 수는 캐시된 패싯 사용)"""
+        facets = self.service_monitor.facet_counts()
+        defaults = {
+            "project_type": ["Billing", "Order", "SETL"],
+            "technology": [],
+            "department": ["DEV", "OPS", "QA"]
+        }
+        labels = {"project_type": "프로젝트 유형", "technology": "기술스택", "department": "담당부서"}
+        
+        filters = {}
+        columns = st.columns(len(labels))
+        for column, (field, label) in zip(columns, labels.items()):
+            counts = {facet["value"]: facet["count"] for facet in facets.get(field, [])}
+            options = list(counts) or defaults[field]
+            with column:
+                selected = st.multiselect(
+                    label,
+                    options,
+                    format_func=lambda value, counts=counts: f"{value} ({counts[value]})" if value in counts else value
+                )
+            if selected:
+                filters[field] = selected
+        
+        if Config.SEARCH_DATE_FIELD:
+            date_range = st.date_input("업로드 기간", value=(), format="YYYY-MM-DD")
+            if len(date_range) > 0:
+                filters["date_from"] = date_range[0]
+            if len(date_range) > 1:
+                filters["date_to"] = date_range[1]
+        
+        return filters
+    
+    def _render_similar_projects(self, similar_projects: List[Dict]):
+        st.subheader("📚 유사 과제")
+        if similar_projects:
+            # 영문 코드를 한국어로 변환
+            project_type_map = {
+                "billing_system": "빌링 시스템",
+                "customer_management": "고객관리", 
+                "settlement_system": "정산 시스템",
+                "mobile_app": "모바일 앱",
+                "web_service": "웹 서비스",
+                "data_analysis": "데이터 분석",
+                "infrastructure": "인프라",
+                "security": "보안",
+                "others": "기타"
+            }
+            
+            department_map = {
+                "development_team": "개발팀",
+                "planning_team": "기획팀",
+                "operations_team": "운영팀",
+                "quality_assurance_team": "품질팀",
+                "data_team": "데이터팀",
+                "infrastructure_team": "인프라팀", 
+                "security_team": "보안팀",
+                "others": "기타"
+            }
+            
+            for i, project in enumerate(similar_projects[:2], 1):
+                with st.expander(f"유사 과제 {i} (유사도: {project['score']:.2f})"):
+                    st.write(f"**파일명:** {project['filename']}")
+                    
+                    project_type_kr = project_type_map.get(project['project_type'], project['project_type'])
+                    department_kr = department_map.get(project['department'], project['department'])
+                    
+                    st.write(f"**프로젝트 유형:** {project_type_kr}")
+                    st.write(f"**기술스택:** {project['technology']}")
+                    st.write(f"**담당부서:** {department_kr}")
+                    if project.get("matched_identifiers"):
+                        st.write(f"**일치 식별자:** {', '.join(project['matched_identifiers'])}")
+                    st.write(f"**내용:** {project['chunk'][:500]}...")
+        else:
+            st.info("유사한 과거 과제를 찾을 수 없습니다.")
     
     def _render_upload_tab(self):
         st.header("문서 업로드")
         
         with st.form("upload_form"):
-            uploaded_file = st.file_uploader(
+            uploaded_files = st.file_uploader(
                 "과제 문서 선택",
                 type=['txt', 'pdf', 'docx', 'csv'],
-                help="TXT, PDF, DOCX, CSV 파일을 업로드할 수 있습니다."
+                accept_multiple_files=True,
+                help="TXT, PDF, DOCX, CSV 파일을 여러 개 함께 업로드할 수 있습니다."
             )
             
             col1, col2 = st.columns(2)
@@ -498,7 +1584,7 @@ class StreamlitApp:
                 )
             upload_submitted = st.form_submit_button("업로드", type="primary")
         
-        if upload_submitted and uploaded_file:
+        if upload_submitted and uploaded_files:
             with st.spinner("문서를 업로드하고 인덱싱하고 있습니다..."):
                 # 메타데이터 구성
                 metadata = {
@@ -507,55 +1593,44 @@ class StreamlitApp:
                     "department": department
                 }
                 
-                # 파일 업로드
-                file_content = uploaded_file.read()
-                filename = uploaded_file.name
-                
-                # Blob Storage에 업로드
-                upload_success = self.document_processor.upload_document(
-                    file_content, filename, metadata
-                )
-                
-                if upload_success:
-                    # 텍스트 추출 및 인덱싱
-                    file_type = filename.split('.')[-1]
-                    content = self.document_processor.extract_text_from_document(
-                        file_content, file_type
+                # Blob 업로드, 임베딩, 인덱싱을 파일 간/파일 내에서 동시에 실행
+                # (큰 파일은 복사본을 만들지 않고 스트림으로 넘겨 블록 단위로 처리)
+                files = [
+                    (uploaded_file.name, uploaded_file, dict(metadata))
+                    for uploaded_file in uploaded_files
+                ]
+                results = self.ingestion_engine.run(files)
+                self.service_monitor.invalidate()
+                if self.project_analyzer.answer_cache:
+                    self.project_analyzer.answer_cache.invalidate()
+            
+            for result in results:
+                filename = result["filename"]
+                if not result["uploaded"]:
+                    st.error(f"❌ '{filename}' 파일 업로드에 실패했습니다.")
+                elif result["failed_chunks"]:
+                    st.warning(
+                        f"⚠️ '{filename}' 청크 {result['failed_chunks']}개를 인덱싱하지 못했습니다. "
+                        f"다시 업로드하면 빠진 청크만 처리합니다."
+                    )
+                elif result["error"]:
+                    st.error(f"❌ '{filename}' 인덱싱 중 오류가 발생했습니다: {result['error']}")
+                elif result["indexed_chunks"] + result["unchanged_chunks"] > 0:
+                    st.success(
+                        f"✅ '{filename}' 업로드 및 인덱싱이 완료되었습니다! "
+                        f"(신규 {result['indexed_chunks']}개, 유지 {result['unchanged_chunks']}개, "
+                        f"삭제 {result['deleted_chunks']}개 청크)"
                     )
-                    print(content)
-                    if content:
-                        index_success = self.document_processor.index_document(
-                            filename, content, metadata
-                        )
-                        
-                        if index_success:
-                            st.success(f"✅ '{filename}' 업로드 및 인덱싱이 완료되었습니다!")
-                        else:
-                            st.warning("⚠️ 업로드는 완료되었지만 인덱싱에 실패했습니다.")
-                            # st.success(f"✅ '{filename}' 업로드 및 인덱싱이 완료되었습니다!")
-                    else:
-                        st.error("❌ 문서에서 텍스트를 추출할 수 없습니다.")
                 else:
-                    st.error("❌ 파일 업로드에 실패했습니다.")
+                    st.warning(f"⚠️ '{filename}' 업로드는 완료되었지만 인덱싱에 실패했습니다.")
     
     def _check_azure_services(self) -> bool:
-        """Azure 서비스 연결 상태 확인"""
-        try:
-            # 간단한 연결 테스트
-            self.azure_services.blob_service_client.get_account_information()
-            return True
-        except:
-            return False
+        """Azure 서비스 연결 상태 확인 (TTL 캐시, 만료 시 백그라운드 갱신)"""
+        return self.service_monitor.is_healthy()
     
     def _get_document_count(self) -> int:
-        """저장된 문서 수 조회"""
-        try:
-            container_client = self.azure_services.blob_service_client.get_container_client(
-                Config.BLOB_CONTAINER_NAME
-            )
-            return len(list(container_client.list_blobs()))
-        except:
-            return 0
+        """인덱스 문서 수 조회 (Blob 전체 목록 대신 AI Search 문서 수 사용)"""
+        return self.service_monitor.document_count()
 
 def main():
     try:
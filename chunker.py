@@ -0,0 +1,132 @@
+import re
+from collections import deque
+from typing import Deque, Iterable, Iterator, List, Tuple
+
+# 문장 경계: 줄바꿈(불릿/번호 목록 라인 포함) 또는 공백이 뒤따르는 종결부호
+# "CretSvcContInstBO.cretSvcContInstBySb()" 처럼 공백 없는 마침표, "1. " 같은 번호는 경계로 보지 않음
+SENTENCE_PATTERN = re.compile(r'.+?(?:(?<=[^\d\s][.!?。])[ \t]+|\n+|$)', re.S)
+
+
+def split_sentences(text: str) -> Iterator[str]:
+    """텍스트를 문장 단위로 분할 (구분자 포함, 이어붙이면 원문 복원)"""
+    for match in SENTENCE_PATTERN.finditer(text):
+        sentence = match.group(0)
+        if sentence:
+            yield sentence
+
+
+def split_sentences_stream(blocks: Iterable[str]) -> Iterator[str]:
+    """텍스트 조각 스트림을 문장 단위로 분할 (전체를 이어붙여 split_sentences 한 결과와 같음)
+
+    조각 끝의 마지막 문장은 다음 조각에서 이어질 수 있으므로 남겨 두었다가 함께 다시 나눈다.
+    """
+    # 맨 앞 한 글자는 직전 문장의 끝 (종결부호 lookbehind 용)
+    buffer = ""
+    start = 0
+    for block in blocks:
+        if not block:
+            continue
+        buffer += block
+        last = None
+        for match in SENTENCE_PATTERN.finditer(buffer, start):
+            if last is not None:
+                yield last.group(0)
+            last = match
+        if last is not None and last.start() > 0:
+            buffer = buffer[last.start() - 1:]
+            start = 1
+    if buffer[start:]:
+        yield from (match.group(0) for match in SENTENCE_PATTERN.finditer(buffer, start))
+
+
+class TextChunker:
+    """토큰 기준 선형 시간 청크 분할 클래스
+
+    문장마다 한 번만 토큰화하고 누적 토큰 수로 청크를 채운다.
+    """
+
+    def __init__(self, tokenizer, max_tokens: int = 1000, overlap_tokens: int = 0):
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        if overlap_tokens < 0 or overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be in [0, max_tokens)")
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+
+    def chunk(self, text: str) -> List[str]:
+        """텍스트를 청크 리스트로 분할"""
+        return list(self.iter_chunks(split_sentences(text)))
+
+    def chunk_stream(self, blocks: Iterable[str]) -> Iterator[str]:
+        """텍스트 조각 스트림을 청크로 분할 (chunk("".join(blocks)) 와 같은 결과, 조각 단위로 메모리 사용)"""
+        return self.iter_chunks(split_sentences_stream(blocks))
+
+    def iter_chunks(self, sentences: Iterable[str]) -> Iterator[str]:
+        """문장 스트림을 받아 청크를 순차 생성"""
+        window: Deque[Tuple[str, int]] = deque()
+        window_tokens = 0
+        # 직전 청크에서 넘어온 overlap 문장 수 (새 문장 없이 다시 내보내지 않기 위함)
+        carried = 0
+
+        for sentence, n_tokens in self._measure(sentences):
+            if window_tokens + n_tokens > self.max_tokens and len(window) > carried:
+                yield self._join(window)
+                window_tokens = self._trim_to_overlap(window, window_tokens)
+                carried = len(window)
+
+            # overlap 문장과 합쳐 한도를 넘으면 앞에서부터 제거
+            while window and window_tokens + n_tokens > self.max_tokens:
+                window_tokens -= window.popleft()[1]
+                carried = max(carried - 1, 0)
+
+            window.append((sentence, n_tokens))
+            window_tokens += n_tokens
+
+        if len(window) > carried:
+            yield self._join(window)
+
+    def _measure(self, sentences: Iterable[str]) -> Iterator[Tuple[str, int]]:
+        """문장별 토큰 수 계산 (한도 초과 문장은 분할)"""
+        for sentence in sentences:
+            if not sentence.strip():
+                continue
+            n_tokens = len(self.tokenizer.encode(sentence))
+            if n_tokens <= self.max_tokens:
+                yield sentence, n_tokens
+            else:
+                yield from self._split_long_sentence(sentence, n_tokens)
+
+    def _split_long_sentence(self, sentence: str, n_tokens: int) -> Iterator[Tuple[str, int]]:
+        """한도를 넘는 문장을 글자 수 비율로 잘라 토큰 한도 이하로 분할"""
+        step = max(1, len(sentence) * self.max_tokens // n_tokens)
+        start = 0
+        while start < len(sentence):
+            piece = sentence[start:start + step]
+            piece_tokens = len(self.tokenizer.encode(piece))
+            # 한글 등 다중 바이트 문자로 비율이 어긋나면 조각을 줄여 재시도
+            while piece_tokens > self.max_tokens and len(piece) > 1:
+                piece = piece[:len(piece) * self.max_tokens // piece_tokens or 1]
+                piece_tokens = len(self.tokenizer.encode(piece))
+            # 공백뿐인 조각은 빈 청크가 되므로 건너뜀 (짧은 문장의 공백 처리와 같음)
+            if piece.strip():
+                yield piece, piece_tokens
+            start += len(piece)
+
+    def _trim_to_overlap(self, window: Deque[Tuple[str, int]], window_tokens: int) -> int:
+        """overlap 한도 안의 마지막 문장들만 남기고 남은 토큰 수 반환"""
+        kept = 0
+        keep_count = 0
+        for _, n_tokens in reversed(window):
+            if kept + n_tokens > self.overlap_tokens:
+                break
+            kept += n_tokens
+            keep_count += 1
+
+        for _ in range(len(window) - keep_count):
+            window_tokens -= window.popleft()[1]
+        return window_tokens
+
+    @staticmethod
+    def _join(window: Deque[Tuple[str, int]]) -> str:
+        return "".join(sentence for sentence, _ in window).strip()
@@ -0,0 +1,118 @@
+from typing import Dict, List, Optional
+
+from chunker import split_sentences
+
+NO_CONTEXT_MESSAGE = "관련된 과거 프로젝트를 찾을 수 없습니다."
+
+
+class PackedContext:
+    """패킹 결과 (프롬프트에 넣을 텍스트와 사용 토큰 수)"""
+
+    def __init__(self, text: str, tokens: int, files: int, sentences: int, duplicates: int, truncated: bool):
+        self.text = text
+        self.tokens = tokens
+        self.files = files
+        self.sentences = sentences
+        self.duplicates = duplicates
+        self.truncated = truncated
+
+
+class ContextPacker:
+    """토큰 예산 안에서 유사도 순으로 청크를 채우는 컨텍스트 구성기
+
+    파일별 메타데이터는 한 번만 적고, 같은 파일의 겹치는 청크(overlap)는 문장 단위로 중복 제거한다.
+    문장은 통째로만 넣으며, 남은 예산보다 긴 문장(넓은 CSV 행 등)은 건너뛰고 다음 문장/과제로 계속한다.
+    예산을 다 쓰면 멈춘다.
+    """
+
+    def __init__(self, tokenizer, max_tokens: int = 1500):
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+
+    def pack(self, similar_projects: List[Dict], max_tokens: Optional[int] = None) -> PackedContext:
+        if not similar_projects:
+            return PackedContext(NO_CONTEXT_MESSAGE, self._count(NO_CONTEXT_MESSAGE), 0, 0, 0, False)
+
+        budget = max_tokens or self.max_tokens
+        projects = sorted(similar_projects, key=lambda project: project.get("score") or 0, reverse=True)
+
+        # 파일명 -> 본문 문장 목록 (처음 등장한 순서 = 유사도 순서 유지)
+        blocks: Dict[str, List[str]] = {}
+        seen: Dict[str, set] = {}
+        used = 0
+        sentences = 0
+        duplicates = 0
+        truncated = False
+
+        for project in projects:
+            if used >= budget:
+                truncated = True
+                break
+
+            filename = project.get("filename", "")
+            header_tokens = 0
+            if filename not in blocks:
+                header = self._header(len(blocks) + 1, project)
+                header_tokens = self._count(header)
+                if used + header_tokens > budget:
+                    truncated = True
+                    continue
+                blocks[filename] = [header]
+                seen[filename] = set()
+                used += header_tokens
+
+            added = skipped = 0
+            for sentence in split_sentences(project.get("chunk", "")):
+                if used >= budget:
+                    truncated = True
+                    break
+                key = " ".join(sentence.split())
+                if not key:
+                    continue
+                if key in seen[filename]:
+                    duplicates += 1
+                    continue
+
+                n_tokens = self._count(sentence)
+                if used + n_tokens > budget:
+                    # 이 문장만 건너뛰고 뒤의 짧은 문장/다음 과제로 남은 예산을 채움
+                    truncated = True
+                    skipped += 1
+                    continue
+                lines = blocks[filename]
+                if len(lines) > 1 and not lines[-1][-1:].isspace():
+                    # 앞 청크의 마지막 문장(구분자 없음)과 붙지 않도록 줄바꿈
+                    lines[-1] += "\n"
+                lines.append(sentence)
+                seen[filename].add(key)
+                used += n_tokens
+                sentences += 1
+                added += 1
+
+            if header_tokens and skipped and not added:
+                # 예산 때문에 본문이 하나도 들어가지 못한 과제는 메타데이터도 빼고 예산을 돌려받음
+                del blocks[filename], seen[filename]
+                used -= header_tokens
+
+        text = "\n\n".join(self._join(lines) for lines in blocks.values())
+        return PackedContext(text, self._count(text), len(blocks), sentences, duplicates, truncated)
+
+    @staticmethod
+    def _header(index: int, project: Dict) -> str:
+        attributes = [project.get(key) for key in ("project_type", "technology", "department")]
+        details = [" / ".join(str(value) for value in attributes if value)]
+        score = project.get("score")
+        if isinstance(score, (int, float)):
+            details.append(f"유사도 {score:.2f}")
+        details = ", ".join(detail for detail in details if detail)
+        return f"[{index}] {project.get('filename', '')}" + (f" ({details})" if details else "") + "\n"
+
+    @staticmethod
+    def _join(lines: List[str]) -> str:
+        header, body = lines[0], "".join(lines[1:]).strip()
+        return header + body
+
+    def _count(self, text: str) -> int:
+        return len(self.tokenizer.encode(text))
@@ -0,0 +1,44 @@
+import logging
+from typing import Dict, List
+
+from rate_limiter import is_input_error
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_options(config) -> Dict:
+    """임베딩 요청 공통 파라미터 (차원 축소를 설정한 경우 dimensions 포함)"""
+    options = {"model": config.EMBEDDING_MODEL}
+    if config.EMBEDDING_DIMENSIONS:
+        options["dimensions"] = config.EMBEDDING_DIMENSIONS
+    return options
+
+
+def split_rejected_batch(error: Exception, batch: List[int]) -> List[List[int]]:
+    """거절된 배치를 다시 요청할 단위로 분할
+
+    입력 때문에 거절된 경우(400)만 반으로 나눠 거절된 입력을 찾고, 입력 하나까지 좁혀지면 포기한다(빈 목록).
+    인증/설정 오류나 할당량 대기 초과처럼 입력과 무관한 오류는 그대로 발생시킨다.
+    429/일시 오류 재시도는 RateLimiter 가 담당하므로 여기까지 오지 않는다.
+    """
+    if not is_input_error(error):
+        raise error
+    if len(batch) == 1:
+        logger.error(f"Embedding input {batch[0]} rejected, giving up: {str(error)}")
+        return []
+    logger.warning(f"Embedding batch of {len(batch)} rejected, splitting: {str(error)}")
+    middle = len(batch) // 2
+    return [batch[:middle], batch[middle:]]
+
+
+def fill_embeddings(response, batch: List[int], embeddings: List[List[float]]):
+    """응답 순서가 아닌 index 필드로 원래 입력 위치에 매핑"""
+    for item in response.data:
+        embeddings[batch[item.index]] = flatten_embedding(item.embedding)
+
+
+def flatten_embedding(embedding: List) -> List[float]:
+    # 임베딩이 2차원 배열로 반환되는 경우 1차원으로 평탄화
+    if isinstance(embedding, list) and embedding and isinstance(embedding[0], list):
+        embedding = embedding[0]  # 첫 번째 배열을 선택
+    return embedding
@@ -0,0 +1,153 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional
+
+from quantization import check_dtype, decode_vector, encode_vector
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """(모델, 정규화 텍스트 해시) 키 기반 SQLite 임베딩 캐시 (LRU 용량 제한)
+
+    dtype 을 float16/int8 로 주면 벡터를 양자화해 저장한다 (행마다 저장 형식을 기록하므로 기존 항목도 그대로 읽힘).
+    """
+
+    # SQLite 바인딩 변수 상한보다 작게 IN 절을 나눠 조회
+    _QUERY_BATCH = 500
+
+    def __init__(self, path: str, max_entries: int = 50000, dtype: str = "float32"):
+        self.path = path
+        self.max_entries = max_entries
+        self.dtype = check_dtype(dtype)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(embeddings)")}
+        if "dtype" not in columns:
+            # 양자화 도입 전 캐시 파일: 기존 행은 모두 float32
+            self._conn.execute("ALTER TABLE embeddings ADD COLUMN dtype TEXT NOT NULL DEFAULT 'float32'")
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """유니코드 정규화 + 공백 정리 (같은 내용이면 같은 키)"""
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    @staticmethod
+    def model_key(model: str, dimensions: Optional[int] = None) -> str:
+        """차원 축소(dimensions) 설정별로 캐시가 섞이지 않도록 모델명에 차원 수를 붙임"""
+        return f"{model}@{dimensions}" if dimensions else model
+
+    @classmethod
+    def make_key(cls, model: str, text: str) -> str:
+        normalized = cls.normalize_text(text)
+        return hashlib.sha256(f"{model}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        return self.get_many(model, [text])[0]
+
+    def put(self, model: str, text: str, embedding: List[float]):
+        self.put_many(model, [text], [embedding])
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """캐시 조회 (없는 항목은 None)"""
+        keys = [self.make_key(model, text) for text in texts]
+        found: Dict[str, List[float]] = {}
+
+        with self._lock:
+            try:
+                unique_keys = list(dict.fromkeys(keys))
+                for start in range(0, len(unique_keys), self._QUERY_BATCH):
+                    part = unique_keys[start:start + self._QUERY_BATCH]
+                    placeholders = ",".join("?" * len(part))
+                    rows = self._conn.execute(
+                        f"SELECT key, vector, dtype FROM embeddings WHERE key IN ({placeholders})", part
+                    ).fetchall()
+                    for key, blob, dtype in rows:
+                        found[key] = decode_vector(blob, dtype)
+
+                if found:
+                    now = time.time()
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                        [(now, key) for key in found]
+                    )
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache read failed: {str(e)}")
+
+            results = [found.get(key) for key in keys]
+            hit_count = sum(1 for result in results if result is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+
+        return results
+
+    def put_many(self, model: str, texts: List[str], embeddings: List[List[float]]):
+        """임베딩 저장 후 용량 초과분을 오래된 순으로 제거"""
+        now = time.time()
+        rows = [
+            (self.make_key(model, text), model, encode_vector(embedding, self.dtype), self.dtype, now)
+            for text, embedding in zip(texts, embeddings)
+            if embedding
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, model, vector, dtype, last_access) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._evict()
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                logger.warning(f"Embedding cache write failed: {str(e)}")
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_access LIMIT ?)",
+                (overflow,)
+            )
+
+    def stats(self) -> Dict:
+        """히트/미스 카운터 및 저장 항목 수"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "dtype": self.dtype,
+                "vector_bytes": size
+            }
@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Set
+
+logger = logging.getLogger(__name__)
+
+# 식별자 앞뒤 경계 (한글 조사가 바로 붙는 경우도 있으므로 \b 대신 영숫자/밑줄만 경계로 봄)
+_START = r"(?<![A-Za-z0-9_])"
+_END = r"(?![A-Za-z0-9_])"
+
+IDENTIFIER_PATTERNS = [
+    # 상품 ID (예: PL251N387)
+    re.compile(_START + r"[A-Z]{2}\d{3}[A-Z]\d{3}" + _END),
+    # 테이블/컬럼명 (예: PR_PROD_BAS, BL_BILL_RFRN_CD)
+    re.compile(_START + r"[A-Z][A-Z0-9]*(?:_[A-Z0-9]+)+" + _END),
+    # Java BO/DO 클래스와 메서드 (예: CretSvcContInstBO.cretSvcContInstBySb)
+    re.compile(_START + r"[A-Z][A-Za-z0-9]*(?:BO|DO)(?:\.[a-z][A-Za-z0-9]*)?" + _END),
+]
+
+
+def find_identifiers(text: str) -> Dict[str, str]:
+    """텍스트의 식별자 {소문자 키: 원문 표기}
+
+    대소문자 구분 없이 비교하도록 소문자를 키로 쓰고, "Class.method" 는 클래스명과 메서드명으로도 등록한다.
+    """
+    identifiers = {}
+    for pattern in IDENTIFIER_PATTERNS:
+        for match in pattern.findall(text or ""):
+            identifiers.setdefault(match.lower(), match)
+            if "." in match:
+                for part in match.split(".", 1):
+                    identifiers.setdefault(part.lower(), part)
+    return identifiers
+
+
+def extract_identifiers(text: str) -> Set[str]:
+    """텍스트에서 식별자 키 추출"""
+    return set(find_identifiers(text))
+
+
+class IdentifierIndex:
+    """식별자 -> 청크 ID 역색인 (JSON 파일로 저장)
+
+    파일에는 청크별 식별자 목록만 저장하고, 역방향 사전은 로드 시 메모리에서 만든다.
+    다른 프로세스(일괄 인제스트 CLI 등)가 파일을 갱신하면 다음 조회 때 다시 읽는다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._by_chunk: Dict[str, List[str]] = {}
+        self._by_identifier: Dict[str, Set[str]] = {}
+        self._mtime = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"identifiers": len(self._by_identifier), "chunks": len(self._by_chunk)}
+
+    def add(self, chunk_id: str, text: str):
+        """청크의 식별자 등록 (같은 청크 ID 는 내용이 같으므로 이미 있으면 건너뜀)"""
+        identifiers = extract_identifiers(text)
+        with self._lock:
+            if chunk_id in self._by_chunk or not identifiers:
+                return
+            self._by_chunk[chunk_id] = sorted(identifiers)
+            for identifier in identifiers:
+                self._by_identifier.setdefault(identifier, set()).add(chunk_id)
+            self._dirty = True
+
+    def remove(self, chunk_ids: Iterable[str]):
+        with self._lock:
+            for chunk_id in chunk_ids:
+                for identifier in self._by_chunk.pop(chunk_id, []):
+                    ids = self._by_identifier.get(identifier)
+                    if ids is not None:
+                        ids.discard(chunk_id)
+                        if not ids:
+                            del self._by_identifier[identifier]
+                    self._dirty = True
+
+    def lookup(self, text: str) -> Dict[str, List[str]]:
+        """질의에 포함된 식별자(원문 표기)별 청크 ID (식별자마다 사전 조회 한 번)"""
+        self._reload_if_changed()
+        identifiers = find_identifiers(text)
+        with self._lock:
+            return {
+                written: sorted(self._by_identifier[key])
+                for key, written in identifiers.items() if key in self._by_identifier
+            }
+
+    def rank(self, text: str) -> List[Dict]:
+        """질의 식별자와 일치하는 청크를 일치 개수 순으로 정렬 [{"chunk_id", "identifiers"}]"""
+        matches = self.lookup(text)
+        counts = Counter(chunk_id for chunk_ids in matches.values() for chunk_id in chunk_ids)
+        return [
+            {
+                "chunk_id": chunk_id,
+                "identifiers": sorted(identifier for identifier, ids in matches.items() if chunk_id in ids)
+            }
+            for chunk_id, _ in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        ]
+
+    def save(self):
+        """변경이 있을 때만 임시 파일에 쓴 뒤 교체"""
+        with self._lock:
+            if not self._dirty:
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"chunks": self._by_chunk}, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+            self._mtime = os.path.getmtime(self.path)
+            self._dirty = False
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                by_chunk = json.load(f).get("chunks", {})
+            mtime = os.path.getmtime(self.path)
+        except Exception as e:
+            logger.warning(f"Error loading identifier index: {str(e)}")
+            return
+
+        by_identifier: Dict[str, Set[str]] = {}
+        for chunk_id, identifiers in by_chunk.items():
+            for identifier in identifiers:
+                by_identifier.setdefault(identifier, set()).add(chunk_id)
+        with self._lock:
+            self._by_chunk = by_chunk
+            self._by_identifier = by_identifier
+            self._mtime = mtime
+            self._dirty = False
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime and not self._dirty:
+            self._load()
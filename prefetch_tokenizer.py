@@ -0,0 +1,42 @@
+"""tiktoken BPE 파일을 앱 디렉터리에 미리 내려받는 스크립트
+
+tiktoken 은 처음 인코더를 만들 때 BPE 파일(cl100k_base, 약 1.7MB)을 내려받으므로 App Service 콜드 스타트가
+느려지고, 외부 네트워크가 막힌 환경에서는 시작에 실패한다. 배포 전에 한 번 실행해 만든 디렉터리(기본 tiktoken_cache/)를
+앱과 함께 배포하면 get_tokenizer() 가 이 디렉터리를 TIKTOKEN_CACHE_DIR 로 사용한다.
+
+사용법:
+    python prefetch_tokenizer.py
+    python prefetch_tokenizer.py --cache-dir /home/site/tiktoken_cache
+"""
+import argparse
+import os
+import sys
+import time
+
+import tiktoken
+
+from chatbot import Config
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="tiktoken BPE 파일을 캐시 디렉터리에 내려받습니다.")
+    parser.add_argument("--cache-dir", default=Config.TIKTOKEN_CACHE_DIR, help="캐시 디렉터리 (기본: 앱 디렉터리의 tiktoken_cache)")
+    parser.add_argument("--model", default=Config.TOKENIZER_MODEL, help="인코더를 정할 모델 이름")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.cache_dir, exist_ok=True)
+    os.environ["TIKTOKEN_CACHE_DIR"] = args.cache_dir
+    start = time.perf_counter()
+    try:
+        encoding = tiktoken.encoding_for_model(args.model)
+    except Exception as e:
+        print(f"BPE 파일을 내려받지 못했습니다: {str(e)}", file=sys.stderr)
+        return 1
+
+    size = sum(os.path.getsize(os.path.join(args.cache_dir, name)) for name in os.listdir(args.cache_dir))
+    print(f"{args.model}: {encoding.name} -> {args.cache_dir} ({size / 1024:.0f} KB, {time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# 벡터 저장 형식 (float16 은 절반, int8 은 행별 스케일 포함 약 1/4 크기)
+VECTOR_DTYPES = ("float32", "float16", "int8")
+
+INT8_MAX = 127
+
+
+def check_dtype(dtype: str) -> str:
+    if dtype not in VECTOR_DTYPES:
+        raise ValueError(f"Unsupported vector dtype: {dtype} (expected one of {', '.join(VECTOR_DTYPES)})")
+    return dtype
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, np.ndarray]:
+    """(n, d) float 행렬을 저장 형식으로 변환 -> (데이터, 행별 스케일)
+
+    int8 은 행마다 최대 절댓값을 127 로 맞추는 대칭 양자화이고, 나머지 형식의 스케일은 1 이다.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.ones(len(vectors), dtype=np.float32)
+    if check_dtype(dtype) == "int8":
+        peaks = np.abs(vectors).max(axis=1) if vectors.size else scales
+        scales = np.where(peaks > 0, peaks / INT8_MAX, 1.0).astype(np.float32)
+        data = np.clip(np.rint(vectors / scales[:, None]), -INT8_MAX, INT8_MAX).astype(np.int8)
+        return data, scales
+    return vectors.astype(dtype), scales
+
+
+def dequantize(data: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """저장 형식 -> float32 행렬"""
+    vectors = np.asarray(data, dtype=np.float32)
+    if data.dtype == np.int8:
+        vectors *= np.asarray(scales, dtype=np.float32)[:, None]
+    return vectors
+
+
+def encode_vector(vector: Sequence[float], dtype: str) -> bytes:
+    """벡터 하나를 바이트로 직렬화 (int8 은 앞 4바이트에 float32 스케일)"""
+    data, scales = quantize(np.asarray([vector], dtype=np.float32), dtype)
+    if dtype == "int8":
+        return scales.tobytes() + data.tobytes()
+    return data.tobytes()
+
+
+def decode_vector(blob: bytes, dtype: str) -> List[float]:
+    if check_dtype(dtype) == "int8":
+        scales = np.frombuffer(blob[:4], dtype=np.float32)
+        data = np.frombuffer(blob[4:], dtype=np.int8)[None, :]
+        return dequantize(data, scales)[0].tolist()
+    return np.frombuffer(blob, dtype=dtype).astype(np.float32).tolist()
+
+
+def vector_bytes(dimensions: int, dtype: str) -> int:
+    """벡터 하나의 저장 크기 (int8 스케일 포함)"""
+    return dimensions * np.dtype(check_dtype(dtype)).itemsize + (4 if dtype == "int8" else 0)
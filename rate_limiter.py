@@ -0,0 +1,298 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from tracing import METRIC_PREFIX
+
+logger = logging.getLogger(__name__)
+
+# 우선순위 (작을수록 먼저): 화면/API 질의 > 백그라운드 인제스트
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Retry-After 헤더가 없을 때 429 이후 쉬는 시간(초)
+DEFAULT_RETRY_AFTER = 1.0
+
+
+class RateLimitTimeout(TimeoutError):
+    """대기 한도 안에 실행 순서를 받지 못함"""
+
+
+def status_code(error: Exception) -> Optional[int]:
+    return getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return status_code(error) == 429
+
+
+def is_input_error(error: Exception) -> bool:
+    """요청 입력 때문에 거절된 오류 (400: 너무 긴 입력, 잘못된 입력 등, 재시도해도 같은 결과)"""
+    return status_code(error) == 400
+
+
+def is_transient(error: Exception) -> bool:
+    """재시도할 만한 오류 (5xx, 408/409, 연결/타임아웃)"""
+    code = status_code(error)
+    if code is not None:
+        return code in (408, 409) or code >= 500
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError") or isinstance(error, (ConnectionError, TimeoutError))
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """429 응답의 retry-after-ms / retry-after 헤더(초 또는 HTTP 날짜)"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def estimate_chat_tokens(tokenizer, messages: List[Dict], max_tokens: int) -> int:
+    """채팅 요청의 할당량 차감 추정치 (프롬프트 토큰 + 메시지당 오버헤드 + max_tokens)"""
+    return sum(len(tokenizer.encode(message.get("content") or "")) + 4 for message in messages) + max_tokens
+
+
+class RateLimiter:
+    """Azure OpenAI 배포 하나의 TPM/RPM 할당량을 지키는 스케줄러 (스레드/asyncio 공용)
+
+    - 토큰/요청 수 버킷: 분당 할당량을 초 단위로 채우고, 요청 전에 tiktoken 추정치만큼 차감
+    - 우선순위 대기열: 우선순위가 같으면 먼저 온 순서, 대기열 맨 앞만 실행 가능
+    - 동시 실행 수 AIMD: 성공하면 조금씩 늘리고 429 를 받으면 절반으로 줄임
+    - 429 의 Retry-After 동안은 모든 요청을 멈춘 뒤 같은 요청을 다시 보냄 (백그라운드는 max_wait 까지)
+
+    할당량이 0 이면 해당 버킷은 제한하지 않는다.
+    clock/sleep 은 테스트에서 시간을 직접 움직일 때 바꿔 넣는다 (clock 은 time.monotonic 과 같은 초 단위).
+    """
+
+    def __init__(self, name: str = "openai", tokens_per_minute: int = 0, requests_per_minute: int = 0,
+                 max_concurrency: int = 16, min_concurrency: int = 1, max_retries: int = 2,
+                 interactive_max_wait: float = 30.0, background_max_wait: float = 600.0,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.name = name
+        self._clock = clock
+        self._sleep = sleep
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max_retries
+        self.max_wait = {INTERACTIVE: interactive_max_wait, BACKGROUND: background_max_wait}
+
+        self._tokens = float(tokens_per_minute)
+        self._requests = float(requests_per_minute)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._concurrency = float(self.max_concurrency)
+        self._in_flight = 0
+        self._waiting: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._counts = {"granted": 0, "throttled": 0, "retried": 0, "wait_seconds": 0.0}
+
+    def call(self, fn: Callable[[], Any], tokens: int, priority: int = BACKGROUND) -> Any:
+        """순서를 받아 fn() 실행 (429 는 Retry-After 후 재시도, 일시적 오류는 max_retries 까지 재시도)"""
+        deadline = self._clock() + self.max_wait[priority]
+        attempt = 0
+        while True:
+            self.acquire(tokens, priority, deadline)
+            try:
+                result = fn()
+            except Exception as e:
+                self.release(success=False)
+                attempt = self._handle_error(e, attempt, deadline)
+                self._sleep(self._backoff(e, attempt))
+                continue
+            self.release(success=True)
+            return result
+
+    async def call_async(self, fn: Callable[[], Awaitable[Any]], tokens: int, priority: int = BACKGROUND) -> Any:
+        deadline = self._clock() + self.max_wait[priority]
+        attempt = 0
+        while True:
+            await self.acquire_async(tokens, priority, deadline)
+            try:
+                result = await fn()
+            except Exception as e:
+                self.release(success=False)
+                attempt = self._handle_error(e, attempt, deadline)
+                await asyncio.sleep(self._backoff(e, attempt))
+                continue
+            self.release(success=True)
+            return result
+
+    def acquire(self, tokens: int, priority: int = BACKGROUND, deadline: Optional[float] = None):
+        """실행 순서가 올 때까지 대기 후 버킷 차감 (반드시 release 와 짝으로 호출)"""
+        started = self._clock()
+        with self._condition:
+            ticket = self._enqueue(priority)
+            try:
+                while True:
+                    wait = self._try_grant(ticket, tokens, started)
+                    if wait == 0:
+                        return
+                    self._check_deadline(wait, deadline)
+                    self._condition.wait(timeout=wait)
+            except BaseException:
+                self._dequeue(ticket)
+                raise
+
+    async def acquire_async(self, tokens: int, priority: int = BACKGROUND, deadline: Optional[float] = None):
+        """acquire 의 asyncio 버전 (이벤트 루프를 막지 않도록 잠깐씩 잠들며 다시 확인)"""
+        started = self._clock()
+        with self._condition:
+            ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._condition:
+                    wait = self._try_grant(ticket, tokens, started)
+                if wait == 0:
+                    return
+                self._check_deadline(wait, deadline)
+                await asyncio.sleep(min(wait, 0.05))
+        except BaseException:
+            with self._condition:
+                self._dequeue(ticket)
+            raise
+
+    def release(self, success: bool = True):
+        with self._condition:
+            self._in_flight -= 1
+            if success:
+                # 덧셈 증가: 현재 한도만큼 성공하면 1 증가
+                self._concurrency = min(self.max_concurrency, self._concurrency + 1 / self._concurrency)
+            self._condition.notify_all()
+
+    def throttled(self, retry_after: Optional[float] = None):
+        """429 응답 반영: Retry-After 동안 전체 중지, 동시 실행 수 절반, 토큰 버킷 비움"""
+        delay = retry_after if retry_after is not None else DEFAULT_RETRY_AFTER
+        with self._condition:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + delay)
+            self._concurrency = max(self.min_concurrency, self._concurrency / 2)
+            self._tokens = min(self._tokens, 0.0)
+            self._counts["throttled"] += 1
+            self._condition.notify_all()
+        logger.warning(
+            f"{self.name} rate limited, pausing {delay:.1f}s (concurrency limit {int(self._concurrency)})"
+        )
+
+    def stats(self) -> Dict:
+        with self._condition:
+            self._refill(self._clock())
+            return {
+                **self._counts,
+                "concurrency_limit": int(self._concurrency),
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiting),
+                "available_tokens": int(self._tokens) if self.tokens_per_minute else None,
+                "paused_seconds": max(0.0, self._paused_until - self._clock())
+            }
+
+    def to_prometheus(self) -> str:
+        stats = self.stats()
+        label = f'deployment="{self.name}"'
+        lines = []
+        metrics = [
+            ("granted", "counter", "Requests sent after scheduling."),
+            ("throttled", "counter", "429 responses received."),
+            ("retried", "counter", "Requests retried after 429 or transient errors."),
+            ("wait_seconds", "counter", "Time spent waiting for a scheduling slot."),
+            ("concurrency_limit", "gauge", "Current adaptive concurrency limit."),
+            ("in_flight", "gauge", "Requests currently running."),
+            ("waiting", "gauge", "Requests waiting for a slot.")
+        ]
+        for key, metric_type, description in metrics:
+            metric = f"{METRIC_PREFIX}_rate_limiter_{key}" + ("_total" if metric_type == "counter" else "")
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} {metric_type}"]
+            lines.append(f"{metric}{{{label}}} {stats[key]}")
+        return "\n".join(lines) + "\n"
+
+    def _enqueue(self, priority: int) -> Tuple[int, int]:
+        ticket = (priority, next(self._sequence))
+        heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _dequeue(self, ticket: Tuple[int, int]):
+        if ticket in self._waiting:
+            self._waiting.remove(ticket)
+            heapq.heapify(self._waiting)
+            self._condition.notify_all()
+
+    def _try_grant(self, ticket: Tuple[int, int], tokens: int, started: float) -> float:
+        """바로 실행할 수 있으면 버킷을 차감하고 0, 아니면 다시 확인할 때까지 기다릴 시간(초) (잠금 상태에서 호출)"""
+        now = self._clock()
+        self._refill(now)
+        if self._waiting[0] != ticket:
+            return 0.5  # 앞 요청이 실행되면 notify 로 깨어남
+        waits = [self._paused_until - now]
+        if self._in_flight >= int(self._concurrency):
+            waits.append(0.5)
+        if self.tokens_per_minute:
+            # 할당량보다 큰 요청은 버킷이 가득 찼을 때 보냄
+            needed = min(tokens, self.tokens_per_minute)
+            if self._tokens < needed:
+                waits.append((needed - self._tokens) * 60 / self.tokens_per_minute)
+        if self.requests_per_minute and self._requests < 1:
+            waits.append((1 - self._requests) * 60 / self.requests_per_minute)
+
+        wait = max(waits)
+        if wait > 0:
+            return wait
+
+        heapq.heappop(self._waiting)
+        self._tokens -= tokens if self.tokens_per_minute else 0
+        self._requests -= 1 if self.requests_per_minute else 0
+        self._in_flight += 1
+        self._counts["granted"] += 1
+        self._counts["wait_seconds"] += now - started
+        # 다음 대기 요청이 맨 앞이 되었으므로 깨움
+        self._condition.notify_all()
+        return 0
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+
+    def _check_deadline(self, wait: float, deadline: Optional[float]):
+        if deadline is not None and self._clock() + min(wait, 0.5) > deadline:
+            raise RateLimitTimeout("Timed out waiting for rate limit slot")
+
+    def _handle_error(self, error: Exception, attempt: int, deadline: float) -> int:
+        """재시도할 오류면 다음 시도 번호, 아니면 그대로 다시 발생"""
+        if is_rate_limited(error):
+            self.throttled(retry_after_seconds(error))
+        elif not is_transient(error) or attempt >= self.max_retries:
+            raise error
+        else:
+            attempt += 1
+        if self._clock() >= deadline:
+            raise error
+        with self._condition:
+            self._counts["retried"] += 1
+        return attempt
+
+    @staticmethod
+    def _backoff(error: Exception, attempt: int) -> float:
+        # 429 는 acquire 에서 Retry-After 만큼 기다리므로 여기서는 일시적 오류만 지수 백오프
+        if is_rate_limited(error):
+            return 0.0
+        return min(8.0, 0.5 * 2 ** (attempt - 1)) * (0.5 + random.random() / 2)
@@ -0,0 +1,556 @@
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from datetime import date, datetime, time
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from quantization import check_dtype, dequantize, quantize
+
+logger = logging.getLogger(__name__)
+
+# 검색 결과로 돌려주는 필드 (벡터 제외)
+RESULT_FIELDS = ["chunk_id", "filename", "chunk", "project_type", "technology", "department"]
+
+# 필터/패싯 대상 메타데이터 필드
+FILTER_FIELDS = ("project_type", "technology", "department")
+
+# 기간 필터 키 (인덱스에 날짜 필드가 설정된 경우에만 적용)
+DATE_RANGE_KEYS = ("date_from", "date_to")
+
+
+class InvalidFilterError(ValueError):
+    """검색 필터 형식 오류 (허용하지 않는 필드, 문자열이 아닌 값, 잘못된 날짜)"""
+
+
+def parse_filter_date(value: Union[date, datetime, str], end_of_day: bool = False) -> datetime:
+    """날짜/시각 또는 ISO 형식 문자열을 시간대가 있는 datetime 으로 변환 (시간대가 없으면 로컬 시간 기준)"""
+    if isinstance(value, str):
+        try:
+            value = date.fromisoformat(value) if len(value) == 10 else datetime.fromisoformat(value)
+        except ValueError:
+            raise InvalidFilterError(f"Invalid date: {value!r} (expected YYYY-MM-DD or ISO 8601)") from None
+    if not isinstance(value, date):
+        raise InvalidFilterError(f"Invalid date: {value!r}")
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.max if end_of_day else time.min)
+    return value.astimezone()
+
+
+def format_odata_datetime(value: Union[date, datetime, str], end_of_day: bool = False) -> str:
+    """날짜/시각을 OData DateTimeOffset 리터럴로 변환 (시간대가 없으면 로컬 시간 기준)"""
+    return parse_filter_date(value, end_of_day).isoformat()
+
+
+def validate_filters(filters: Optional[Dict]) -> Optional[Dict]:
+    """검색 필터 검증/정규화 ({FILTER_FIELDS 필드: 문자열 목록, date_from/date_to: datetime})
+
+    필드명은 OData 식에 그대로 들어가므로 FILTER_FIELDS/DATE_RANGE_KEYS 외의 키는 허용하지 않는다.
+    형식이 잘못되면 InvalidFilterError.
+    """
+    if not filters:
+        return None
+    if not isinstance(filters, dict):
+        raise InvalidFilterError("Filters must be an object")
+
+    normalized: Dict = {}
+    for key, value in filters.items():
+        if key in DATE_RANGE_KEYS:
+            if value not in (None, ""):
+                normalized[key] = parse_filter_date(value, end_of_day=key == "date_to")
+        elif key in FILTER_FIELDS:
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            values = [v for v in values if v not in (None, "")]
+            if any(not isinstance(v, str) for v in values):
+                raise InvalidFilterError(f"Filter values for {key} must be strings")
+            if values:
+                normalized[key] = sorted(set(values)) if isinstance(value, set) else values
+        else:
+            raise InvalidFilterError(
+                f"Unsupported filter field: {key!r} (allowed: {', '.join(FILTER_FIELDS + DATE_RANGE_KEYS)})"
+            )
+
+    if "date_from" in normalized and "date_to" in normalized and normalized["date_from"] > normalized["date_to"]:
+        raise InvalidFilterError("date_from must not be later than date_to")
+    return normalized or None
+
+
+def build_odata_filter(filters: Optional[Dict], date_field: Optional[str] = None) -> Optional[str]:
+    """{필드: 값 또는 값 목록, date_from/date_to: 기간} 형태의 필터를 OData 식으로 변환 (validate_filters 로 검증)"""
+    filters = validate_filters(filters)
+    if not filters:
+        return None
+
+    clauses = []
+    if date_field:
+        if filters.get("date_from"):
+            clauses.append(f"{date_field} ge {format_odata_datetime(filters['date_from'])}")
+        if filters.get("date_to"):
+            clauses.append(f"{date_field} le {format_odata_datetime(filters['date_to'], end_of_day=True)}")
+
+    for field in FILTER_FIELDS:
+        if field not in filters:
+            continue
+        values = [v.replace("'", "''") for v in filters[field]]
+        if len(values) == 1:
+            clauses.append(f"{field} eq '{values[0]}'")
+        else:
+            clauses.append("(" + " or ".join(f"{field} eq '{v}'" for v in values) + ")")
+    return " and ".join(clauses) or None
+
+
+def mmr_rerank(query_vector: List[float], candidates: List[Dict], top_k: int,
+               lambda_mult: float = 0.7, max_per_file: int = 1) -> List[Dict]:
+    """Maximal Marginal Relevance 재정렬 + 파일별 개수 제한
+
+    후보의 "vector" 로 질의 유사도와 후보 간 유사도를 한 번에 계산한 뒤 탐욕적으로 top_k 를 고른다.
+    파일 제한 때문에 top_k 를 채우지 못하면 제한 없이 나머지를 채운다.
+    """
+    if top_k <= 0 or not candidates:
+        return []
+    if any(candidate.get("vector") is None or not len(candidate["vector"]) for candidate in candidates):
+        # 벡터를 받지 못한 경우(검색 필드가 retrievable 아님 등) 순위를 유지한 채 파일별 제한만 적용
+        return dedupe_by_file(candidates, top_k, max_per_file)
+
+    vectors = np.asarray([candidate["vector"] for candidate in candidates], dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    query = np.asarray(query_vector, dtype=np.float32)
+    query /= max(float(np.linalg.norm(query)), 1e-12)
+
+    relevance = vectors @ query
+    similarity = vectors @ vectors.T
+    _, file_ids = np.unique([candidate.get("filename", "") for candidate in candidates], return_inverse=True)
+    file_counts = np.zeros(file_ids.max() + 1, dtype=np.int64)
+
+    selected: List[int] = []
+    available = np.ones(len(candidates), dtype=bool)
+    redundancy = np.zeros(len(candidates), dtype=np.float32)
+
+    for enforce_file_limit in (True, False):
+        while len(selected) < top_k:
+            allowed = available
+            if enforce_file_limit and max_per_file > 0:
+                allowed = available & (file_counts[file_ids] < max_per_file)
+            if not allowed.any():
+                break
+
+            scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+            best = int(np.argmax(np.where(allowed, scores, -np.inf)))
+
+            selected.append(best)
+            available[best] = False
+            file_counts[file_ids[best]] += 1
+            # 선택된 후보와의 최대 유사도 (첫 선택 전에는 0)
+            redundancy = similarity[best] if len(selected) == 1 else np.maximum(redundancy, similarity[best])
+
+    return [candidates[i] for i in selected]
+
+
+def dedupe_by_file(candidates: List[Dict], top_k: int, max_per_file: int = 1) -> List[Dict]:
+    """순위를 유지하며 파일별 최대 개수 제한 (모자라면 제외했던 후보로 채움)"""
+    if max_per_file <= 0:
+        return candidates[:top_k]
+    selected, skipped = [], []
+    per_file: Dict[str, int] = {}
+    for candidate in candidates:
+        filename = candidate.get("filename", "")
+        if per_file.get(filename, 0) < max_per_file:
+            per_file[filename] = per_file.get(filename, 0) + 1
+            selected.append(candidate)
+        else:
+            skipped.append(candidate)
+    return (selected + skipped)[:top_k]
+
+
+class RetrievalBackend:
+    """유사 청크 검색 백엔드 인터페이스"""
+
+    def search(self, query: str, query_vector: List[float], top_k: int,
+               filters: Optional[Dict] = None, include_vectors: bool = False) -> List[Dict]:
+        """유사도 내림차순 결과 목록 (RESULT_FIELDS + score, include_vectors 면 "vector" 포함)"""
+        raise NotImplementedError
+
+    def get_documents(self, chunk_ids: List[str], filters: Optional[Dict] = None) -> List[Dict]:
+        """청크 ID 로 문서 조회 (임베딩 없이, 필터 적용, 입력 순서 유지)"""
+        raise NotImplementedError
+
+    def facet_counts(self, fields: Iterable[str] = FILTER_FIELDS, limit: int = 50) -> Dict[str, List[Dict]]:
+        """필드별 값과 문서(청크) 수 목록 {필드: [{"value": ..., "count": ...}]}"""
+        return {}
+
+
+class AzureSearchBackend(RetrievalBackend):
+    """Azure AI Search 하이브리드(키워드 + 벡터) 검색"""
+
+    def __init__(self, search_client, date_field: Optional[str] = None):
+        # 클라이언트 대신 클라이언트를 돌려주는 함수를 넘기면 처음 사용할 때 생성
+        self._search_client = search_client
+        self.date_field = date_field
+
+    @property
+    def search_client(self):
+        if callable(self._search_client):
+            self._search_client = self._search_client()
+        return self._search_client
+
+    def search(self, query: str, query_vector: List[float], top_k: int,
+               filters: Optional[Dict] = None, include_vectors: bool = False) -> List[Dict]:
+        from azure.search.documents.models import VectorizedQuery
+
+        vector_query = VectorizedQuery(
+            vector=query_vector,
+            k_nearest_neighbors=top_k,
+            fields="text_vector"
+        )
+
+        results = self.search_client.search(
+            search_text=query,
+            vector_queries=[vector_query],
+            filter=build_odata_filter(filters, self.date_field),
+            select=RESULT_FIELDS + (["text_vector"] if include_vectors else []),
+            top=top_k
+        )
+
+        similar_projects = []
+        for result in results:
+            logger.debug(f"search score: {result.get('@search.score', 0)}")
+            item = {field: result.get(field, "") for field in RESULT_FIELDS}
+            item["score"] = result.get("@search.score", 0)
+            if include_vectors:
+                item["vector"] = result.get("text_vector")
+            similar_projects.append(item)
+        return similar_projects
+
+    def get_documents(self, chunk_ids: List[str], filters: Optional[Dict] = None) -> List[Dict]:
+        if not chunk_ids:
+            return []
+        id_filter = "search.in(chunk_id, '{}', ',')".format(",".join(chunk_ids))
+        metadata_filter = build_odata_filter(filters, self.date_field)
+        results = self.search_client.search(
+            search_text="*",
+            filter=f"{id_filter} and {metadata_filter}" if metadata_filter else id_filter,
+            select=RESULT_FIELDS,
+            top=len(chunk_ids)
+        )
+        documents = {result["chunk_id"]: {field: result.get(field, "") for field in RESULT_FIELDS} for result in results}
+        return [documents[chunk_id] for chunk_id in chunk_ids if chunk_id in documents]
+
+    def facet_counts(self, fields: Iterable[str] = FILTER_FIELDS, limit: int = 50) -> Dict[str, List[Dict]]:
+        fields = list(fields)
+        # 문서는 받지 않고(top=0) 패싯 집계만 요청
+        results = self.search_client.search(
+            search_text="*",
+            facets=[f"{field},count:{limit}" for field in fields],
+            top=0
+        )
+        facets = results.get_facets() or {}
+        return {
+            field: [{"value": facet["value"], "count": facet["count"]} for facet in facets.get(field, [])]
+            for field in fields
+        }
+
+
+class LocalVectorBackend(RetrievalBackend):
+    """프로세스 내 NumPy 벡터 검색
+
+    청크 벡터를 연속된 행렬(정규화된 행)로 보관하고 내적 + argpartition 으로 top-k 를 구한다.
+    dtype 이 float16/int8 이면 양자화해 보관하고, 검색 시 블록 단위로만 float32 로 되돌려 계산한다.
+    마지막으로 불러오거나 저장한 인덱스 파일을 기억해 두고, 다른 프로세스가 그 파일을 새로 저장하면
+    다음 조회 때 다시 로드한다 (아직 저장하지 않은 변경이 있으면 유지).
+    date_field 를 지정하면 문서의 해당 필드도 보관해 AzureSearchBackend 와 같은 기준으로 기간 필터를 적용한다.
+    """
+
+    # 양자화 행렬을 float32 로 되돌릴 때 한 번에 처리할 행 수 (임시 메모리 상한)
+    _SCORE_BLOCK = 8192
+
+    def __init__(self, dimensions: Optional[int] = None, dtype: str = "float32", date_field: Optional[str] = None):
+        self.dimensions = dimensions
+        self.dtype = check_dtype(dtype)
+        self.date_field = date_field
+        self._matrix = np.zeros((0, dimensions or 0), dtype=dtype)
+        self._scales = np.ones(0, dtype=np.float32)
+        self._size = 0
+        self._records: List[Dict] = []
+        self._row_by_id: Dict[str, int] = {}
+        self.path: Optional[str] = None
+        self._version = None
+        self._changes = 0
+        self._saved_changes = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """현재 저장된 벡터 행렬 (n, d, 저장 형식 그대로)"""
+        return self._matrix[:self._size]
+
+    @property
+    def nbytes(self) -> int:
+        """벡터 저장에 쓰는 메모리 (int8 스케일 포함, 여유 용량 제외)"""
+        return self.matrix.nbytes + (self._size * 4 if self.dtype == "int8" else 0)
+
+    def add_documents(self, documents: Iterable[Dict]):
+        """AI Search 업로드 형식의 문서(text_vector 포함)를 추가/갱신"""
+        documents = [document for document in documents if document.get("text_vector")]
+        if not documents:
+            return
+
+        vectors = np.asarray([document["text_vector"] for document in documents], dtype=np.float32)
+        self.refresh()
+        with self._lock:
+            if self.dimensions is None:
+                self.dimensions = vectors.shape[1]
+                self._matrix = np.zeros((0, self.dimensions), dtype=self.dtype)
+            if vectors.shape[1] != self.dimensions:
+                raise ValueError(f"Expected {self.dimensions}-dim vectors, got {vectors.shape[1]}")
+            vectors, scales = quantize(self._normalize(vectors), self.dtype)
+
+            for document, vector, scale in zip(documents, vectors, scales):
+                record = {field: document.get(field, "") for field in RESULT_FIELDS}
+                if self.date_field and document.get(self.date_field):
+                    record[self.date_field] = document[self.date_field]
+                row = self._row_by_id.get(record["chunk_id"])
+                if row is None:
+                    row = self._append_row()
+                    self._row_by_id[record["chunk_id"]] = row
+                    self._records.append(record)
+                else:
+                    self._records[row] = record
+                self._matrix[row] = vector
+                self._scales[row] = scale
+            self._changes += 1
+
+    def delete_documents(self, chunk_ids: Iterable[str]):
+        """마지막 행을 빈 자리로 옮겨 행렬을 연속 상태로 유지"""
+        self.refresh()
+        with self._lock:
+            for chunk_id in chunk_ids:
+                row = self._row_by_id.pop(chunk_id, None)
+                if row is None:
+                    continue
+                last = self._size - 1
+                if row != last:
+                    self._matrix[row] = self._matrix[last]
+                    self._scales[row] = self._scales[last]
+                    self._records[row] = self._records[last]
+                    self._row_by_id[self._records[row]["chunk_id"]] = row
+                self._records.pop()
+                self._size -= 1
+                self._changes += 1
+
+    @property
+    def dirty(self) -> bool:
+        """파일에 저장하지 않은 변경이 있는지"""
+        return self._changes != self._saved_changes
+
+    def search(self, query: str, query_vector: List[float], top_k: int,
+               filters: Optional[Dict] = None, include_vectors: bool = False) -> List[Dict]:
+        return self.search_batch([query_vector], top_k, filters, include_vectors)[0]
+
+    def search_batch(self, query_vectors: List[List[float]], top_k: int,
+                     filters: Optional[Dict] = None, include_vectors: bool = False) -> List[List[Dict]]:
+        """여러 질의를 한 번의 행렬 곱으로 검색"""
+        self.refresh()
+        with self._lock:
+            return self._search_batch(query_vectors, top_k, filters, include_vectors)
+
+    def _search_batch(self, query_vectors: List[List[float]], top_k: int,
+                      filters: Optional[Dict], include_vectors: bool) -> List[List[Dict]]:
+        if self._size == 0 or top_k <= 0:
+            return [[] for _ in query_vectors]
+
+        queries = self._normalize(np.asarray(query_vectors, dtype=np.float32))
+        scores = self._scores(queries)  # (m, n)
+
+        mask = self._filter_mask(filters)
+        if mask is not None:
+            scores[:, ~mask] = -np.inf
+        candidates = int(mask.sum()) if mask is not None else self._size
+        k = min(top_k, candidates)
+        if k == 0:
+            return [[] for _ in query_vectors]
+
+        if k < self._size:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(self._size), (len(queries), 1))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+
+        results = []
+        for rows, row_scores, row_order in zip(top, top_scores, order):
+            hits = []
+            for i in row_order:
+                hit = {**self._result(self._records[rows[i]]), "score": float(row_scores[i])}
+                if include_vectors:
+                    row = rows[i]
+                    hit["vector"] = dequantize(self._matrix[row:row + 1], self._scales[row:row + 1])[0]
+                hits.append(hit)
+            results.append(hits)
+        return results
+
+    def save(self, path: Optional[str] = None):
+        """인덱스 파일 저장 (임시 파일에 쓴 뒤 교체하므로 다른 프로세스가 쓰다 만 파일을 읽지 않음)"""
+        path = path or self.path
+        with self._lock:
+            matrix = self.matrix.copy()
+            scales = self._scales[:self._size].copy()
+            records = json.dumps(self._records, ensure_ascii=False)
+            changes = self._changes
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, matrix=matrix, scales=scales, records=np.array(records))
+        os.replace(temp_path, path)
+
+        with self._lock:
+            if self.path in (None, path):
+                self.path = path
+                self._version = self._file_version(path)
+                self._saved_changes = changes
+
+    @classmethod
+    def load(cls, path: str, date_field: Optional[str] = None) -> "LocalVectorBackend":
+        """저장된 형식(dtype) 그대로 로드 (scales 가 없는 이전 파일은 float32)"""
+        backend = cls(date_field=date_field)
+        backend._read(path)
+        return backend
+
+    def refresh(self) -> bool:
+        """다른 프로세스가 인덱스 파일을 새로 저장했으면 다시 로드"""
+        if not self.path or self.dirty:
+            return False
+        version = self._file_version(self.path)
+        if version is None or version == self._version:
+            return False
+        with self._lock:
+            if self.dirty or version == self._version:
+                return False
+            self._read(self.path)
+        logger.info(f"Reloaded local vector index from {self.path} ({self._size} chunks)")
+        return True
+
+    def _read(self, path: str):
+        version = self._file_version(path)
+        with np.load(path) as data:
+            matrix = data["matrix"]
+            scales = data["scales"] if "scales" in data.files else np.ones(len(matrix), dtype=np.float32)
+            records = json.loads(str(data["records"]))
+        with self._lock:
+            self.dimensions = matrix.shape[1] if matrix.size else None
+            self.dtype = check_dtype(matrix.dtype.name)
+            self._matrix = np.ascontiguousarray(matrix)
+            self._scales = np.ascontiguousarray(scales, dtype=np.float32)
+            self._size = len(records)
+            self._records = records
+            self._row_by_id = {record["chunk_id"]: row for row, record in enumerate(records)}
+            self.path = path
+            self._version = version
+            self._saved_changes = self._changes
+
+    @staticmethod
+    def _file_version(path: str):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @classmethod
+    def from_search_client(cls, search_client, page_size: int = 1000, dtype: str = "float32",
+                           date_field: Optional[str] = None) -> "LocalVectorBackend":
+        """AI Search 인덱스 전체(벡터 포함)를 내려받아 로컬 인덱스 구성"""
+        backend = cls(dtype=dtype, date_field=date_field)
+        select = RESULT_FIELDS + ([date_field] if date_field else []) + ["text_vector"]
+        results = search_client.search(search_text="*", select=select, top=None)
+        batch = []
+        for result in results:
+            batch.append(dict(result))
+            if len(batch) >= page_size:
+                backend.add_documents(batch)
+                batch = []
+        backend.add_documents(batch)
+        return backend
+
+    def _append_row(self) -> int:
+        # 용량을 두 배씩 늘려 추가 비용을 분할 상환
+        if self._size == len(self._matrix):
+            capacity = max(16, len(self._matrix) * 2)
+            grown = np.zeros((capacity, self.dimensions), dtype=self.dtype)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+            scales = np.ones(capacity, dtype=np.float32)
+            scales[:self._size] = self._scales[:self._size]
+            self._scales = scales
+        self._size += 1
+        return self._size - 1
+
+    def get_documents(self, chunk_ids: List[str], filters: Optional[Dict] = None) -> List[Dict]:
+        self.refresh()
+        with self._lock:
+            mask = self._filter_mask(filters)
+            rows = [self._row_by_id[chunk_id] for chunk_id in chunk_ids if chunk_id in self._row_by_id]
+            return [self._result(self._records[row]) for row in rows if mask is None or mask[row]]
+
+    def facet_counts(self, fields: Iterable[str] = FILTER_FIELDS, limit: int = 50) -> Dict[str, List[Dict]]:
+        self.refresh()
+        with self._lock:
+            records = self._records[:self._size]
+        return {
+            field: [
+                {"value": value, "count": count}
+                for value, count in Counter(record.get(field) for record in records if record.get(field)).most_common(limit)
+            ]
+            for field in fields
+        }
+
+    def _filter_mask(self, filters: Optional[Dict]) -> Optional[np.ndarray]:
+        filters = validate_filters(filters)
+        if not filters:
+            return None
+        mask = np.ones(self._size, dtype=bool)
+        for field in FILTER_FIELDS:
+            if field not in filters:
+                continue
+            values = set(filters[field])
+            mask &= np.fromiter((record.get(field) in values for record in self._records), dtype=bool, count=self._size)
+        # build_odata_filter 와 같이 날짜 필드가 설정된 경우에만 기간 적용 (날짜가 없는 문서는 제외)
+        if self.date_field and ("date_from" in filters or "date_to" in filters):
+            mask &= np.fromiter(
+                (self._in_date_range(record, filters.get("date_from"), filters.get("date_to")) for record in self._records),
+                dtype=bool, count=self._size
+            )
+        return mask
+
+    def _in_date_range(self, record: Dict, date_from: Optional[datetime], date_to: Optional[datetime]) -> bool:
+        try:
+            value = parse_filter_date(record.get(self.date_field) or "")
+        except InvalidFilterError:
+            return False
+        return (date_from is None or value >= date_from) and (date_to is None or value <= date_to)
+
+    @staticmethod
+    def _result(record: Dict) -> Dict:
+        return {field: record.get(field, "") for field in RESULT_FIELDS}
+
+    def _scores(self, queries: np.ndarray) -> np.ndarray:
+        if self.dtype == "float32":
+            return queries @ self.matrix.T
+        scores = np.empty((len(queries), self._size), dtype=np.float32)
+        for start in range(0, self._size, self._SCORE_BLOCK):
+            end = min(start + self._SCORE_BLOCK, self._size)
+            scores[:, start:end] = queries @ dequantize(self._matrix[start:end], self._scales[start:end]).T
+        return scores
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
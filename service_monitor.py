@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshingValue:
+    """TTL 캐시 값 (만료 시 이전 값을 바로 돌려주고 백그라운드에서 갱신)"""
+
+    def __init__(self, loader: Callable[[], Any], ttl: float, default: Any = None):
+        self.loader = loader
+        self.ttl = ttl
+        self.default = default
+        self._value = default
+        self._loaded_at = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        with self._lock:
+            loaded_at = self._loaded_at
+            if loaded_at is not None and time.monotonic() - loaded_at < self.ttl:
+                return self._value
+            start_background = loaded_at is not None and not self._refreshing
+            if start_background:
+                self._refreshing = True
+
+        # 처음 한 번은 동기 조회, 이후에는 만료된 값을 반환하면서 백그라운드 갱신
+        if loaded_at is None:
+            return self.refresh()
+        if start_background:
+            threading.Thread(target=self._refresh_in_background, daemon=True).start()
+        return self._value
+
+    def refresh(self) -> Any:
+        try:
+            value = self.loader()
+        except Exception as e:
+            logger.warning(f"Error refreshing cached value: {str(e)}")
+            value = self.default
+        with self._lock:
+            self._value = value
+            self._loaded_at = time.monotonic()
+        return value
+
+    def invalidate(self):
+        """다음 조회 때 백그라운드 갱신이 일어나도록 만료 처리"""
+        with self._lock:
+            if self._loaded_at is not None:
+                self._loaded_at = float("-inf")
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+class ServiceMonitor:
+    """Azure 서비스 상태와 문서 통계, 검색 필터 패싯 (TTL 캐시 + 백그라운드 갱신)"""
+
+    def __init__(self, azure_services, ttl: float = 60.0, retrieval_backend=None):
+        self.azure_services = azure_services
+        self.retrieval_backend = retrieval_backend
+        self._health = RefreshingValue(self._check_health, ttl, default=False)
+        self._document_count = RefreshingValue(self._count_documents, ttl, default=0)
+        self._facets = RefreshingValue(self._load_facets, ttl, default={})
+
+    def is_healthy(self) -> bool:
+        return self._health.get()
+
+    def document_count(self) -> int:
+        return self._document_count.get()
+
+    def facet_counts(self) -> Dict[str, List[Dict]]:
+        """필터 필드별 값과 청크 수"""
+        return self._facets.get()
+
+    def invalidate(self):
+        """문서가 추가/삭제된 뒤 호출"""
+        self._document_count.invalidate()
+        self._facets.invalidate()
+
+    def _check_health(self) -> bool:
+        try:
+            # 간단한 연결 테스트
+            self.azure_services.blob_service_client.get_account_information()
+            return True
+        except Exception as e:
+            logger.warning(f"Azure service health check failed: {str(e)}")
+            return False
+
+    def _count_documents(self) -> int:
+        # 컨테이너 전체 목록 대신 인덱스가 관리하는 문서(청크) 수 사용
+        return self.azure_services.search_client.get_document_count()
+
+    def _load_facets(self) -> Dict[str, List[Dict]]:
+        if self.retrieval_backend is None:
+            return {}
+        return self.retrieval_backend.facet_counts()
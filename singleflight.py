@@ -0,0 +1,166 @@
+import json
+import threading
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from tracing import METRIC_PREFIX
+
+
+def make_key(*parts) -> str:
+    """호출 키 (문자열은 유니코드 정규화 + 공백 정리 후 비교)"""
+    def normalize(value):
+        if isinstance(value, str):
+            return " ".join(unicodedata.normalize("NFC", value).split())
+        return value
+    return json.dumps([normalize(part) for part in parts], ensure_ascii=False, sort_keys=True, default=str)
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SharedIterator:
+    """원본 이터레이터를 백그라운드 스레드에서 한 번만 끝까지 읽고, 구독자마다 처음부터 같은 항목을 내보냄
+
+    구독자가 중간에 읽기를 멈춰도 원본은 끝까지 소비되므로 다른 구독자가 멈추지 않는다.
+    """
+
+    def __init__(self, source: Iterable, on_finish: Optional[Callable[[], None]] = None):
+        self.finished = False
+        self._items: List[Any] = []
+        self._error: Optional[BaseException] = None
+        self._on_finish = on_finish
+        self._condition = threading.Condition()
+        threading.Thread(target=self._pump, args=(iter(source),), daemon=True).start()
+
+    def subscribe(self) -> Iterator:
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self._items) and not self.finished:
+                    self._condition.wait()
+                items = self._items[index:]
+                finished, error = self.finished, self._error
+            for item in items:
+                yield item
+            index += len(items)
+            if finished and index >= len(self._items):
+                if error is not None:
+                    raise error
+                return
+
+    def _pump(self, source: Iterator):
+        try:
+            for item in source:
+                with self._condition:
+                    self._items.append(item)
+                    self._condition.notify_all()
+        except Exception as e:
+            with self._condition:
+                self._error = e
+        finally:
+            with self._condition:
+                self.finished = True
+                self._condition.notify_all()
+            if self._on_finish:
+                self._on_finish()
+
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 호출을 한 번의 실행으로 합침 (먼저 온 호출이 실행하고 나머지는 결과를 기다림)
+
+    결과를 보관하지 않는 점이 캐시와 다르다. 실행이 끝나면 키를 지우므로 이후 호출은 다시 실행한다.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, name: str, key: str, fn: Callable[[], Any]) -> Any:
+        """fn() 결과 (같은 키로 실행 중인 호출이 있으면 그 결과를 함께 받음)"""
+        value, _ = self._run(name, key, fn, keep=False)
+        return value
+
+    def stream(self, name: str, key: str, fn: Callable[[], Iterable]) -> Tuple[Iterator, bool]:
+        """fn() 이 돌려준 이터레이터를 공유 -> (구독 이터레이터, 직접 실행 여부)
+
+        스트림이 끝날 때까지 같은 키의 호출은 새로 실행하지 않고 처음부터 같은 항목을 받는다.
+        """
+        full_key = self._full_key(name, key)
+        shared, leader = self._run(
+            name, key, lambda: SharedIterator(fn(), on_finish=lambda: self._forget_finished(full_key)), keep=True
+        )
+        return shared.subscribe(), leader
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """이름별 실행/합쳐진 호출 수와 현재 실행 중인 키 수"""
+        with self._lock:
+            stats = {name: dict(counts) for name, counts in self._stats.items()}
+            for name in stats:
+                stats[name]["in_flight"] = sum(1 for key in self._calls if key.startswith(self._full_key(name, "")))
+            return stats
+
+    def to_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식 (작업별 실행/합쳐진 호출 카운터, 실행 중 키 게이지)"""
+        stats = self.stats()
+        lines = []
+        metrics = [
+            ("executed", "counter", "Calls executed upstream."),
+            ("coalesced", "counter", "Calls that waited on an identical in-flight call."),
+            ("in_flight", "gauge", "Keys currently being executed.")
+        ]
+        for key, metric_type, description in metrics:
+            metric = f"{METRIC_PREFIX}_singleflight_{key}" + ("_total" if metric_type == "counter" else "")
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} {metric_type}"]
+            lines += [f'{metric}{{operation="{name}"}} {counts[key]}' for name, counts in stats.items()]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _full_key(name: str, key: str) -> str:
+        return f"{name}\0{key}"
+
+    def _run(self, name: str, key: str, fn: Callable[[], Any], keep: bool) -> Tuple[Any, bool]:
+        key = self._full_key(name, key)
+        with self._lock:
+            counts = self._stats.setdefault(name, {"executed": 0, "coalesced": 0})
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                counts["executed"] += 1
+            else:
+                counts["coalesced"] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, False
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            self._forget(key, call)
+            raise
+        finally:
+            call.event.set()
+        # 공유 스트림은 끝날 때 키를 지움 (값을 넘기기 전에 이미 끝났다면 여기서 지움)
+        if not keep or call.value.finished:
+            self._forget(key, call)
+        return call.value, True
+
+    def _forget(self, key: str, call: _Call):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+    def _forget_finished(self, key: str):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and isinstance(call.value, SharedIterator) and call.value.finished:
+                del self._calls[key]
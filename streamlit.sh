@@ -1,3 +1,5 @@
 python3 -m pip install --upgrade pip
 pip install -r requirements.txt
+# 앱과 함께 배포한 tiktoken_cache/ 가 없으면 BPE 파일을 한 번 내려받음
+python prefetch_tokenizer.py
 python -m streamlit run test.py --server.port 8000 --server.address 0.0.0.0
\ No newline at end of file
@@ -0,0 +1,68 @@
+import os
+import sys
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from batch_analyze import BatchAnalyzer
+from chatbot import ANALYSIS_ERROR_MESSAGE, AnalysisStream
+
+
+def broken_stream(words):
+    """몇 토큰을 보낸 뒤 연결이 끊기는 채팅 스트림"""
+    for word in words:
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word))], usage=None)
+    raise ConnectionError("stream reset")
+
+
+class StubAnalyzer:
+    def __init__(self, response):
+        self.response = response
+
+    def search_similar_projects(self, query, top_k=2, filters=None):
+        return []
+
+    def analyze_requirements_stream(self, requirements, similar_projects):
+        return AnalysisStream(self.response)
+
+
+def test_error_mid_stream_marks_failed():
+    stream = AnalysisStream(broken_stream(["요금제 ", "변경 "]))
+
+    text = "".join(stream)
+
+    assert stream.failed
+    assert text == "요금제 변경 " + ANALYSIS_ERROR_MESSAGE
+
+
+def test_completed_stream_is_not_failed():
+    completed = []
+    chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="요금제 변경"))], usage=None)]
+    stream = AnalysisStream(iter(chunks), on_complete=lambda text, usage: completed.append(text))
+
+    assert "".join(stream) == "요금제 변경"
+    assert not stream.failed
+    assert completed == ["요금제 변경"]
+
+
+def test_batch_row_with_partial_analysis_is_failed():
+    analyzer = BatchAnalyzer(StubAnalyzer(broken_stream(["요금제 ", "변경 "])))
+
+    row = analyzer.analyze("r1", {"title": "요금제", "requirements": "요금제 변경"})
+
+    assert row["status"] == "failed"
+
+
+def test_api_reports_partial_analysis_as_failed():
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    api_server.app.state.services = SimpleNamespace(project_analyzer=StubAnalyzer(broken_stream(["요금제 "])))
+    client = TestClient(api_server.app)
+
+    response = client.post("/analyze", json={"requirements": "요금제 변경", "stream": False})
+
+    assert response.status_code == 502
+    assert response.json()["detail"]["status"] == "failed"
@@ -0,0 +1,71 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from answer_cache import AnswerCache
+from chatbot import ProjectAnalyzer
+from context_packer import ContextPacker
+from fakes import create_fake_services
+from retrieval import LocalVectorBackend
+
+
+class WordTokenizer:
+    """공백 단위 토큰 수를 세는 테스트용 토크나이저 (tiktoken BPE 파일 없이 실행)"""
+
+    def encode(self, text):
+        return text.split()
+
+
+def make_analyzer():
+    services = create_fake_services(dimensions=64)
+    backend = LocalVectorBackend()
+    texts = ["요금제 변경 요구사항.", "청구서 표시 요구사항."]
+    vectors = services.openai_client.embeddings.create(model="fake", input=texts).data
+    backend.add_documents([
+        {"chunk_id": f"c{i}", "filename": f"doc{i}.txt", "chunk": text, "project_type": "Billing",
+         "text_vector": vector.embedding}
+        for i, (text, vector) in enumerate(zip(texts, vectors))
+    ])
+    analyzer = ProjectAnalyzer(services, answer_cache=AnswerCache(), backend=backend)
+    analyzer._context_packer = ContextPacker(WordTokenizer(), max_tokens=500)
+    return analyzer, services.openai_client.embeddings
+
+
+def test_exact_hit_does_not_embed():
+    analyzer, embeddings = make_analyzer()
+    projects = [{"chunk_id": "c0", "filename": "doc0.txt", "chunk": "요금제 변경 요구사항.", "score": 0.9}]
+
+    analyzer.analyze_requirements("요금제 추가", projects)
+    requests = embeddings.requests
+    analyzer.analyze_requirements("요금제  추가", projects)
+
+    assert embeddings.requests == requests
+    assert analyzer.answer_cache.hits == 1
+
+
+def test_search_vector_of_another_query_is_not_reused():
+    analyzer, embeddings = make_analyzer()
+    projects = analyzer.search_similar_projects("요금제 변경", top_k=2)
+    analyzer.analyze_requirements("요금제 변경", projects)
+
+    # 같은 청크 집합이 검색된 다른 질의: 앞 검색의 벡터가 아니라 자기 입력을 임베딩해 비교
+    other = analyzer.search_similar_projects("해지 위약금 계산", top_k=2)
+    assert {p["chunk_id"] for p in other} == {p["chunk_id"] for p in projects}
+    requests = embeddings.requests
+    analyzer.analyze_requirements("전혀 다른 분석 요청", other)
+
+    assert embeddings.requests == requests + 1
+    assert analyzer.answer_cache.similar_hits == 0
+
+
+def test_search_vector_is_reused_for_the_same_input():
+    analyzer, embeddings = make_analyzer()
+    projects = analyzer.search_similar_projects("요금제 변경", top_k=2)
+    requests = embeddings.requests
+
+    analyzer.analyze_requirements("요금제 변경", projects)
+
+    assert embeddings.requests == requests
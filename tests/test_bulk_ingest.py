@@ -0,0 +1,67 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from bulk_ingest import BulkIngestor, IngestManifest
+from chatbot import DocumentProcessor
+from fakes import create_fake_services
+
+
+class WordTokenizer:
+    """공백 단위 토큰 수를 세는 테스트용 토크나이저 (tiktoken BPE 파일 없이 실행)"""
+
+    def encode(self, text):
+        return text.split()
+
+
+def make_ingestor(tmp_path):
+    services = create_fake_services(dimensions=16)
+    processor = DocumentProcessor(services)
+    processor._tokenizer = WordTokenizer()
+    manifest = IngestManifest(str(tmp_path / "manifest.json"))
+    return BulkIngestor(processor, manifest, metadata={}, upload_blobs=False), services.search_client
+
+
+def fail_deletes(search_client):
+    def delete_documents(documents):
+        raise ConnectionError("search unavailable")
+    search_client.delete_documents = delete_documents
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_incomplete_stale_delete_keeps_previous_entry(tmp_path):
+    ingestor, search_client = make_ingestor(tmp_path)
+    path = write(tmp_path / "spec.txt", "요금제 변경 요구사항입니다.")
+    assert ingestor.ingest_file("spec.txt", path)["status"] == "new"
+    previous = {**ingestor.manifest.get("spec.txt"), "chunk_ids": ["stale-chunk"], "sha256": "old"}
+    ingestor.manifest.set("spec.txt", previous)
+
+    fail_deletes(search_client)
+    result = ingestor.ingest_file("spec.txt", path)
+
+    assert result["status"] == "failed"
+    assert ingestor.manifest.get("spec.txt") == previous
+
+
+def test_incomplete_remove_keeps_entry_for_retry(tmp_path):
+    ingestor, search_client = make_ingestor(tmp_path)
+    path = write(tmp_path / "spec.txt", "요금제 변경 요구사항입니다.")
+    ingestor.ingest_file("spec.txt", path)
+    chunk_ids = ingestor.manifest.get("spec.txt")["chunk_ids"]
+    delete_documents = search_client.delete_documents
+
+    fail_deletes(search_client)
+    assert ingestor.remove_file("spec.txt")["status"] == "failed"
+    assert ingestor.manifest.get("spec.txt")["chunk_ids"] == chunk_ids
+
+    search_client.delete_documents = delete_documents
+    assert ingestor.remove_file("spec.txt")["status"] == "deleted"
+    assert ingestor.manifest.get("spec.txt") is None
+    assert search_client.get_document_count() == 0
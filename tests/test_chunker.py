@@ -0,0 +1,102 @@
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from chunker import TextChunker, split_sentences, split_sentences_stream
+
+
+class CharTokenizer:
+    """글자 하나를 토큰 하나로 세는 테스트용 토크나이저"""
+
+    def encode(self, text):
+        return list(text)
+
+
+TEXT = (
+    "요금제 변경 요구사항입니다. 월정액 상품의 할인 조건을 바꿉니다! 적용 시점은?  다음 달 1일입니다.\n"
+    "1. CretSvcContInstBO.cretSvcContInstBySb() 호출 흐름을 유지합니다.\n\n"
+    "- 청구서 표시 문구 변경\n"
+    "버전 2.5 에서 확인함。 마지막 문장은 종결부호가 없음"
+)
+
+
+def random_blocks(text, rng):
+    """빈 조각을 포함해 임의 위치에서 텍스트를 자름"""
+    cuts = sorted(rng.randint(0, len(text)) for _ in range(rng.randint(0, 12)))
+    return [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+
+@pytest.mark.parametrize("text", [TEXT, "", "문장 하나", "\n\n끝.\n", "1. 2. 3. 번호만", "a. b. c. " * 50])
+def test_sentences_round_trip(text):
+    assert "".join(split_sentences(text)) == text
+
+
+def test_sentence_boundaries():
+    sentences = list(split_sentences(TEXT))
+
+    assert sentences[:3] == ["요금제 변경 요구사항입니다. ", "월정액 상품의 할인 조건을 바꿉니다! ", "적용 시점은?  "]
+    assert "1. CretSvcContInstBO.cretSvcContInstBySb() 호출 흐름을 유지합니다.\n\n" in sentences
+    assert sentences[-1] == "마지막 문장은 종결부호가 없음"
+
+
+def test_stream_matches_split_sentences_across_block_boundaries():
+    rng = random.Random(7)
+    texts = [TEXT, TEXT * 5, "a. b. c. " * 50, "줄\n" * 30]
+    for text in texts:
+        expected = list(split_sentences(text))
+        for _ in range(200):
+            assert list(split_sentences_stream(random_blocks(text, rng))) == expected
+        assert list(split_sentences_stream(text)) == expected
+
+
+@pytest.mark.parametrize("max_tokens,overlap_tokens", [(20, 0), (40, 10), (7, 3), (1, 0)])
+def test_chunks_stay_within_max_tokens(max_tokens, overlap_tokens):
+    tokenizer = CharTokenizer()
+    chunker = TextChunker(tokenizer, max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+
+    chunks = chunker.chunk(TEXT * 3)
+
+    assert chunks
+    assert all(0 < len(tokenizer.encode(chunk)) <= max_tokens for chunk in chunks)
+
+
+def test_chunks_cover_text_without_overlap():
+    chunker = TextChunker(CharTokenizer(), max_tokens=30)
+
+    chunks = chunker.chunk(TEXT)
+
+    assert "".join(chunks).replace(" ", "").replace("\n", "") == TEXT.replace(" ", "").replace("\n", "")
+
+
+def test_overlap_repeats_trailing_sentences():
+    sentences = [f"문장{i:02d} 내용입니다. " for i in range(12)]
+    chunker = TextChunker(CharTokenizer(), max_tokens=3 * len(sentences[0]), overlap_tokens=len(sentences[0]))
+
+    chunks = chunker.chunk("".join(sentences))
+
+    assert len(chunks) == 6
+    for previous, current in zip(chunks, chunks[1:]):
+        last_sentence = previous.rsplit(". ", 1)[-1]
+        assert current.startswith(last_sentence)
+    assert chunks[0] == "".join(sentences[:3]).strip()
+    assert chunks[1] == "".join(sentences[2:5]).strip()
+
+
+def test_chunk_stream_matches_chunk():
+    rng = random.Random(11)
+    chunker = TextChunker(CharTokenizer(), max_tokens=25, overlap_tokens=8)
+    text = TEXT * 4
+
+    for _ in range(50):
+        assert list(chunker.chunk_stream(random_blocks(text, rng))) == chunker.chunk(text)
+
+
+@pytest.mark.parametrize("max_tokens,overlap_tokens", [(0, 0), (10, 10), (10, -1)])
+def test_invalid_limits(max_tokens, overlap_tokens):
+    with pytest.raises(ValueError):
+        TextChunker(CharTokenizer(), max_tokens=max_tokens, overlap_tokens=overlap_tokens)
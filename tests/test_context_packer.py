@@ -0,0 +1,60 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from context_packer import ContextPacker
+
+
+class WordTokenizer:
+    """공백 단위 토큰 수를 세는 테스트용 토크나이저 (tiktoken BPE 파일 없이 실행)"""
+
+    def encode(self, text):
+        return text.split()
+
+
+def make_project(filename, chunk, score):
+    return {"filename": filename, "chunk": chunk, "score": score, "project_type": "Billing"}
+
+
+def test_long_first_sentence_is_skipped_and_later_projects_are_packed():
+    wide_row = " ".join(["컬럼: 값"] * 200) + "\n"
+    projects = [
+        make_project("wide.csv", wide_row + "짧은 마지막 문장.", 0.9),
+        make_project("second.txt", "두 번째 과제 요구사항.", 0.8),
+        make_project("third.txt", "세 번째 과제 요구사항.", 0.7)
+    ]
+
+    packed = ContextPacker(WordTokenizer(), max_tokens=60).pack(projects)
+
+    assert packed.truncated
+    assert packed.files == 3
+    assert "짧은 마지막 문장." in packed.text
+    assert "두 번째 과제 요구사항." in packed.text
+    assert "세 번째 과제 요구사항." in packed.text
+    assert "컬럼: 값" not in packed.text
+    assert packed.tokens <= 60
+
+
+def test_project_without_fitting_sentence_is_dropped():
+    projects = [
+        make_project("wide.csv", " ".join(["값"] * 500), 0.9),
+        make_project("second.txt", "두 번째 과제 요구사항.", 0.8)
+    ]
+
+    packed = ContextPacker(WordTokenizer(), max_tokens=30).pack(projects)
+
+    assert packed.files == 1
+    assert "wide.csv" not in packed.text
+    assert packed.text.startswith("[1] second.txt")
+
+
+def test_stops_when_budget_is_exhausted():
+    sentences = " ".join(f"문장 {i} 입니다." for i in range(100))
+    projects = [make_project("a.txt", sentences, 0.9), make_project("b.txt", "다음 과제.", 0.8)]
+
+    packed = ContextPacker(WordTokenizer(), max_tokens=40).pack(projects)
+
+    assert packed.truncated
+    assert packed.tokens <= 40
+    assert "b.txt" not in packed.text
@@ -0,0 +1,116 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from chatbot import Config, DocumentProcessor
+from embedding_batch import split_rejected_batch
+from fakes import FakeEmbeddings, create_fake_services
+
+
+class WordTokenizer:
+    """공백 단위 토큰 수를 세는 테스트용 토크나이저 (tiktoken BPE 파일 없이 실행)"""
+
+    def encode(self, text):
+        return text.split()
+
+
+class APIError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class RecordingEmbeddings(FakeEmbeddings):
+    """요청별 입력을 기록하고, 거절할 입력이 들어 있거나 error 가 설정되면 실패하는 임베딩"""
+
+    def __init__(self, rejected=(), error=None):
+        super().__init__(dimensions=8)
+        self.rejected = set(rejected)
+        self.error = error
+        self.batches = []
+
+    def create(self, model, input, dimensions=None, **kwargs):
+        self.batches.append(list(input))
+        if self.error is not None:
+            raise self.error
+        if self.rejected.intersection(input):
+            raise APIError(400)
+        return super().create(model, input, dimensions, **kwargs)
+
+
+def make_processor(embeddings):
+    services = create_fake_services(dimensions=8)
+    services.openai_client = SimpleNamespace(embeddings=embeddings)
+    processor = DocumentProcessor(services)
+    processor._tokenizer = WordTokenizer()
+    return processor
+
+
+def test_batches_respect_count_limit(monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_BATCH_SIZE", 3)
+    processor = make_processor(RecordingEmbeddings())
+    texts = [f"문장 {i}" for i in range(8)]
+
+    batches = list(processor.iter_embedding_batches(texts, list(range(8))))
+
+    assert batches == [[0, 1, 2], [3, 4, 5], [6, 7]]
+
+
+def test_batches_respect_token_limit(monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_BATCH_MAX_TOKENS", 5)
+    processor = make_processor(RecordingEmbeddings())
+    texts = ["a b", "c d", "e f", "g h i j k l", "m"]
+
+    batches = list(processor.iter_embedding_batches(texts, [0, 1, 2, 3, 4]))
+
+    # 한도를 넘는 입력 하나는 단독 배치로 보냄
+    assert batches == [[0, 1], [2], [3], [4]]
+    for batch in batches[:2]:
+        assert sum(len(texts[i].split()) for i in batch) <= 5
+
+
+def test_rejected_input_is_isolated_and_order_is_kept(monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_BATCH_SIZE", 8)
+    embeddings = RecordingEmbeddings(rejected={"문장 5"})
+    processor = make_processor(embeddings)
+    texts = [f"문장 {i}" for i in range(8)]
+
+    result = processor.get_embeddings(texts)
+
+    assert result[5] == []
+    for i, text in enumerate(texts):
+        if i != 5:
+            assert result[i] == embeddings.embed(text)
+    # 8 -> 4 + 4 -> (2 + 2) -> (1 + 1) 로 분할하며 거절된 입력만 남김
+    assert ["문장 5"] in embeddings.batches
+    assert ["문장 0", "문장 1", "문장 2", "문장 3"] in embeddings.batches
+
+
+def test_invalid_inputs_are_not_sent(monkeypatch):
+    embeddings = RecordingEmbeddings()
+    processor = make_processor(embeddings)
+
+    result = processor.get_embeddings(["요금제", "  ", None, "청구서"])
+
+    assert result[1] == [] and result[2] == []
+    assert embeddings.batches == [["요금제", "청구서"]]
+
+
+def test_non_input_errors_propagate():
+    processor = make_processor(RecordingEmbeddings(error=APIError(401)))
+
+    with pytest.raises(APIError):
+        processor.get_embeddings(["요금제", "청구서"])
+
+
+def test_split_rejected_batch():
+    assert split_rejected_batch(APIError(400), [4, 5, 6]) == [[4], [5, 6]]
+    assert split_rejected_batch(APIError(400), [4]) == []
+    with pytest.raises(APIError):
+        split_rejected_batch(APIError(403), [4, 5])
@@ -0,0 +1,79 @@
+import os
+import sys
+from datetime import date
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from retrieval import (
+    InvalidFilterError, LocalVectorBackend, build_odata_filter, format_odata_datetime, validate_filters
+)
+
+
+def test_values_are_escaped():
+    odata = build_odata_filter({"technology": "O'Reilly' or project_type eq 'x"})
+
+    assert odata == "technology eq 'O''Reilly'' or project_type eq ''x'"
+
+
+def test_multiple_values_are_grouped():
+    odata = build_odata_filter({"project_type": ["Billing", "Order"], "department": "DEV"})
+
+    assert odata == "(project_type eq 'Billing' or project_type eq 'Order') and department eq 'DEV'"
+
+
+@pytest.mark.parametrize("filters", [
+    {"chunk": "요금제"},
+    {"project_type eq 'Billing' or chunk_id": "x"},
+    {"project_type": ["Billing", 1]},
+    {"department": {"$ne": "DEV"}},
+    {"date_from": "어제"},
+    {"date_from": 20240101},
+    {"date_from": "2024-03-01", "date_to": "2024-02-01"},
+    ["project_type", "Billing"],
+])
+def test_invalid_filters_are_rejected(filters):
+    with pytest.raises(InvalidFilterError):
+        validate_filters(filters)
+    with pytest.raises(InvalidFilterError):
+        build_odata_filter(filters, "upload_date")
+
+
+def test_empty_values_are_dropped():
+    assert validate_filters({"project_type": ["", None], "date_from": ""}) is None
+    assert build_odata_filter({"technology": []}) is None
+
+
+def test_date_range_is_inclusive_by_day():
+    odata = build_odata_filter({"date_from": "2024-02-01", "date_to": date(2024, 2, 29)}, "upload_date")
+
+    assert odata == (
+        f"upload_date ge {format_odata_datetime('2024-02-01')} and "
+        f"upload_date le {format_odata_datetime('2024-02-29', end_of_day=True)}"
+    )
+    assert "T23:59:59.999999" in odata
+
+
+def test_date_range_needs_date_field():
+    assert build_odata_filter({"date_from": "2024-02-01"}) is None
+
+
+def test_local_backend_uses_same_date_bounds():
+    # build_odata_filter 와 같은 경계: date_to 는 그날 끝까지 포함, date_from 은 그날 0시부터
+    backend = LocalVectorBackend(date_field="upload_date")
+    dates = {
+        "before": format_odata_datetime("2024-01-31", end_of_day=True),
+        "start": format_odata_datetime("2024-02-01"),
+        "end": format_odata_datetime("2024-02-29", end_of_day=True),
+        "after": format_odata_datetime("2024-03-01"),
+    }
+    backend.add_documents([
+        {"chunk_id": name, "filename": f"{name}.txt", "upload_date": value, "text_vector": [1.0, float(i)]}
+        for i, (name, value) in enumerate(dates.items())
+    ])
+
+    documents = backend.get_documents(list(dates), {"date_from": "2024-02-01", "date_to": "2024-02-29"})
+
+    assert [d["chunk_id"] for d in documents] == ["start", "end"]
@@ -0,0 +1,103 @@
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from identifier_index import IdentifierIndex, extract_identifiers, find_identifiers
+
+
+def bump_mtime(path, seconds=10):
+    """같은 시각 해상도 안에서 저장해도 변경으로 보이도록 수정 시각을 옮김"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 1_000_000_000))
+
+
+def test_patterns():
+    text = (
+        "PL251N387 상품의 PR_PROD_BAS 테이블과 BL_BILL_RFRN_CD를 CretSvcContInstBO.cretSvcContInstBySb 에서 조회. "
+        "SvcDO 사용, xPL251N387 과 PR_ 와 BO 는 제외"
+    )
+
+    assert find_identifiers(text) == {
+        "pl251n387": "PL251N387",
+        "pr_prod_bas": "PR_PROD_BAS",
+        "bl_bill_rfrn_cd": "BL_BILL_RFRN_CD",
+        "cretsvccontinstbo.cretsvccontinstbysb": "CretSvcContInstBO.cretSvcContInstBySb",
+        "cretsvccontinstbo": "CretSvcContInstBO",
+        "cretsvccontinstbysb": "cretSvcContInstBySb",
+        "svcdo": "SvcDO",
+    }
+    assert extract_identifiers("요금제 변경") == set()
+
+
+def test_lookup_and_rank(tmp_path):
+    index = IdentifierIndex(str(tmp_path / "identifiers.json"))
+    index.add("c1", "PR_PROD_BAS 와 PL251N387")
+    index.add("c2", "PR_PROD_BAS 와 CretSvcContInstBO")
+    index.add("c3", "식별자 없음")
+
+    assert index.lookup("PR_PROD_BAS 조회") == {"PR_PROD_BAS": ["c1", "c2"]}
+    # 질의 표기와 관계없이 소문자 키로 비교
+    assert index.lookup("CRETSVCCONTINSTBO 호출") == {"CRETSVCCONTINSTBO": ["c2"]}
+    assert index.rank("PL251N387 의 PR_PROD_BAS") == [
+        {"chunk_id": "c1", "identifiers": ["PL251N387", "PR_PROD_BAS"]},
+        {"chunk_id": "c2", "identifiers": ["PR_PROD_BAS"]},
+    ]
+    assert index.stats() == {"identifiers": 3, "chunks": 2}
+
+
+def test_persistence_round_trip(tmp_path):
+    path = str(tmp_path / "nested" / "identifiers.json")
+    index = IdentifierIndex(path)
+    index.add("c1", "PR_PROD_BAS 와 PL251N387")
+    index.add("c2", "CretSvcContInstBO.cretSvcContInstBySb")
+    index.remove(["c1"])
+    index.save()
+
+    loaded = IdentifierIndex(path)
+
+    assert loaded.stats() == index.stats()
+    assert loaded.lookup("CretSvcContInstBO.cretSvcContInstBySb") == {
+        "CretSvcContInstBO.cretSvcContInstBySb": ["c2"], "CretSvcContInstBO": ["c2"], "cretSvcContInstBySb": ["c2"]
+    }
+    assert loaded.lookup("PR_PROD_BAS") == {}
+    with open(path, encoding="utf-8") as f:
+        assert list(json.load(f)["chunks"]) == ["c2"]
+
+
+def test_save_without_changes_does_not_write(tmp_path):
+    path = str(tmp_path / "identifiers.json")
+    IdentifierIndex(path).save()
+
+    assert not os.path.exists(path)
+
+
+def test_reloads_when_file_changes(tmp_path):
+    path = str(tmp_path / "identifiers.json")
+    writer = IdentifierIndex(path)
+    writer.add("c1", "PR_PROD_BAS")
+    writer.save()
+    reader = IdentifierIndex(path)
+
+    writer.add("c2", "PR_PROD_BAS")
+    writer.save()
+    bump_mtime(path)
+
+    assert reader.lookup("PR_PROD_BAS") == {"PR_PROD_BAS": ["c1", "c2"]}
+
+
+def test_unsaved_changes_are_kept_on_file_change(tmp_path):
+    path = str(tmp_path / "identifiers.json")
+    writer = IdentifierIndex(path)
+    writer.add("c1", "PR_PROD_BAS")
+    writer.save()
+    reader = IdentifierIndex(path)
+    reader.add("c9", "PR_PROD_BAS")
+
+    writer.add("c2", "PR_PROD_BAS")
+    writer.save()
+    bump_mtime(path)
+
+    assert reader.lookup("PR_PROD_BAS") == {"PR_PROD_BAS": ["c1", "c9"]}
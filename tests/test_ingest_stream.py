@@ -0,0 +1,54 @@
+import io
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from chatbot import DocumentProcessor
+from fakes import create_fake_services
+
+
+class WordTokenizer:
+    """공백 단위 토큰 수를 세는 테스트용 토크나이저 (tiktoken BPE 파일 없이 실행)"""
+
+    def encode(self, text):
+        return text.split()
+
+
+def make_processor():
+    processor = DocumentProcessor(create_fake_services(dimensions=16))
+    processor._tokenizer = WordTokenizer()
+    return processor
+
+
+def indexed_ids(processor):
+    return processor.get_indexed_chunk_ids(["spec.txt"])
+
+
+def test_decode_error_mid_stream_keeps_previous_chunks():
+    processor = make_processor()
+    # 첫 디코딩 블록(1M 문자)보다 길어야 잘못된 바이트 앞의 청크가 먼저 인덱싱됨
+    head = "".join(f"문장 {i} 의 요구사항입니다. " for i in range(60000)).encode("utf-8")
+    tail = "".join(f"뒷부분 {i} 의 요구사항입니다. " for i in range(2000)).encode("utf-8")
+    processor.ingest_stream("spec.txt", io.BytesIO(head + tail), {}, upload=False)
+    before = indexed_ids(processor)
+
+    with pytest.raises(UnicodeDecodeError):
+        processor.ingest_stream("spec.txt", io.BytesIO(head + b"\xff" + tail), {}, upload=False)
+
+    assert before <= indexed_ids(processor)
+
+
+def test_stream_matches_in_memory_ingest():
+    content = "".join(f"문장 {i} 입니다. " for i in range(3000)).encode("utf-8")
+    streamed, in_memory = make_processor(), make_processor()
+
+    streamed_result = streamed.ingest_stream("spec.txt", io.BytesIO(content), {}, upload=False)
+    in_memory_result = in_memory.index_file("spec.txt", content, {})
+
+    assert streamed_result["chunk_ids"] == in_memory_result["chunk_ids"]
+    assert streamed_result["failed"] == 0
@@ -0,0 +1,123 @@
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from retrieval import RESULT_FIELDS, LocalVectorBackend
+
+
+def vector(i, dimensions=8):
+    return np.random.default_rng(i).standard_normal(dimensions).tolist()
+
+
+def document(i, **fields):
+    return {
+        "chunk_id": f"c{i}", "filename": f"doc{i % 3}.txt", "chunk": f"청크 {i}",
+        "project_type": "Billing" if i % 2 else "Order", "technology": "", "department": "DEV",
+        "text_vector": vector(i), **fields
+    }
+
+
+def top_hit(backend, i):
+    return backend.search("", vector(i), 1)[0]
+
+
+def test_upsert_replaces_row():
+    backend = LocalVectorBackend()
+    backend.add_documents([document(i) for i in range(4)])
+
+    backend.add_documents([document(1, chunk="바뀐 청크", text_vector=vector(99))])
+
+    assert len(backend) == 4
+    assert backend.get_documents(["c1"])[0]["chunk"] == "바뀐 청크"
+    assert top_hit(backend, 99)["chunk_id"] == "c1"
+
+
+def test_swap_delete_keeps_rows_consistent():
+    backend = LocalVectorBackend()
+    backend.add_documents([document(i) for i in range(6)])
+
+    backend.delete_documents(["c0", "c3", "missing", "c5"])
+
+    assert len(backend) == 3
+    for i in (1, 2, 4):
+        hit = top_hit(backend, i)
+        assert hit["chunk_id"] == f"c{i}"
+        assert abs(hit["score"] - 1.0) < 1e-5
+    assert backend.get_documents(["c0", "c3", "c5"]) == []
+
+
+def test_get_documents_keeps_order_and_applies_filters():
+    backend = LocalVectorBackend()
+    backend.add_documents([document(i) for i in range(5)])
+
+    documents = backend.get_documents(["c4", "missing", "c1", "c2"])
+    billing = backend.get_documents(["c4", "c1", "c3"], {"project_type": ["Billing"]})
+
+    assert [d["chunk_id"] for d in documents] == ["c4", "c1", "c2"]
+    assert all(set(d) == set(RESULT_FIELDS) for d in documents)
+    assert [d["chunk_id"] for d in billing] == ["c1", "c3"]
+
+
+def test_reloads_when_another_process_saves(tmp_path):
+    path = str(tmp_path / "index.npz")
+    writer = LocalVectorBackend()
+    writer.add_documents([document(0)])
+    writer.save(path)
+    reader = LocalVectorBackend.load(path)
+
+    writer.add_documents([document(1)])
+    writer.save(path)
+
+    assert [d["chunk_id"] for d in reader.get_documents(["c0", "c1"])] == ["c0", "c1"]
+    assert not reader.dirty
+
+
+def test_unsaved_changes_are_not_overwritten_by_reload(tmp_path):
+    path = str(tmp_path / "index.npz")
+    writer = LocalVectorBackend()
+    writer.add_documents([document(0)])
+    writer.save(path)
+    reader = LocalVectorBackend.load(path)
+    reader.add_documents([document(2)])
+
+    writer.add_documents([document(1)])
+    writer.save(path)
+
+    assert not reader.refresh()
+    assert [d["chunk_id"] for d in reader.get_documents(["c0", "c1", "c2"])] == ["c0", "c2"]
+
+
+def test_date_filters_use_date_field(tmp_path):
+    backend = LocalVectorBackend(date_field="upload_date")
+    backend.add_documents([
+        document(0, upload_date="2024-01-10T09:00:00+09:00"),
+        document(1, upload_date="2024-02-01T00:00:00+09:00"),
+        document(2, upload_date="2024-02-29T23:30:00+09:00"),
+        document(3),
+    ])
+    ids = ["c0", "c1", "c2", "c3"]
+
+    def matched(filters, index=backend):
+        return [d["chunk_id"] for d in index.get_documents(ids, filters)]
+
+    assert matched({"date_from": "2024-02-01T00:00:00+09:00"}) == ["c1", "c2"]
+    assert matched({"date_to": "2024-01-31T00:00:00+09:00"}) == ["c0"]
+    assert matched({"date_from": "2024-01-01T00:00:00+09:00", "project_type": ["Billing"]}) == ["c1"]
+    # 날짜가 없는 문서는 기간 필터에서 제외 (AI Search 의 null 비교와 같음)
+    assert sorted(hit["chunk_id"] for hit in backend.search("", vector(3), 4, {"date_to": "2025-01-01"})) == ["c0", "c1", "c2"]
+    assert "upload_date" not in backend.get_documents(["c0"])[0]
+
+    path = str(tmp_path / "index.npz")
+    backend.save(path)
+    assert matched({"date_from": "2024-02-01T00:00:00+09:00"}, LocalVectorBackend.load(path, "upload_date")) == ["c1", "c2"]
+
+
+def test_date_filters_are_ignored_without_date_field():
+    backend = LocalVectorBackend()
+    backend.add_documents([document(0, upload_date="2024-01-10T09:00:00+09:00"), document(1)])
+
+    assert len(backend.get_documents(["c0", "c1"], {"date_from": "2030-01-01"})) == 2
@@ -0,0 +1,206 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from rate_limiter import BACKGROUND, INTERACTIVE, RateLimiter, RateLimitTimeout
+
+
+class FakeClock:
+    """직접 움직이는 시계 (sleep 도 시간만 앞으로 옮김)"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class APIError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"status_code": status_code, "headers": headers or {}})()
+
+
+def make_limiter(clock, **kwargs):
+    return RateLimiter("test", clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    limiter = make_limiter(clock, tokens_per_minute=600)
+
+    limiter.acquire(600, deadline=clock())
+    limiter.release()
+    assert limiter.stats()["available_tokens"] == 0
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(10, deadline=clock())
+
+    clock.now += 30
+    assert limiter.stats()["available_tokens"] == 300
+    limiter.acquire(300, deadline=clock())
+    limiter.release()
+
+    # 버킷은 분당 할당량 이상으로 차지 않음
+    clock.now += 600
+    assert limiter.stats()["available_tokens"] == 600
+
+
+def test_request_bucket_limits_requests():
+    clock = FakeClock()
+    limiter = make_limiter(clock, requests_per_minute=2)
+
+    for _ in range(2):
+        limiter.acquire(0, deadline=clock())
+        limiter.release()
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(0, deadline=clock())
+
+    clock.now += 30
+    limiter.acquire(0, deadline=clock())
+    limiter.release()
+
+
+def test_oversized_request_waits_for_full_bucket():
+    clock = FakeClock()
+    limiter = make_limiter(clock, tokens_per_minute=100)
+    limiter.acquire(50, deadline=clock())
+    limiter.release()
+
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(1000, deadline=clock())
+    clock.now += 30
+    limiter.acquire(1000, deadline=clock())
+    limiter.release()
+
+
+def test_aimd_backoff_and_recovery():
+    clock = FakeClock()
+    limiter = make_limiter(clock, max_concurrency=8, min_concurrency=2)
+
+    limiter.throttled(retry_after=5)
+    assert limiter.stats()["concurrency_limit"] == 4
+    assert limiter.stats()["paused_seconds"] == 5
+    limiter.throttled(retry_after=1)
+    limiter.throttled(retry_after=1)
+    # 절반씩 줄되 min_concurrency 아래로는 내려가지 않고, 더 짧은 Retry-After 가 중지 시간을 줄이지 않음
+    assert limiter.stats()["concurrency_limit"] == 2
+    assert limiter.stats()["paused_seconds"] == 5
+
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(0, deadline=clock())
+    clock.now += 5
+    for _ in range(2):
+        limiter.acquire(0, deadline=clock())
+    # 동시 실행 한도에 도달
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(0, deadline=clock())
+
+    # 한도만큼 성공할 때마다 1 씩 증가
+    for _ in range(2):
+        limiter.release(success=True)
+    assert limiter.stats()["concurrency_limit"] == 2
+    for _ in range(3):
+        limiter.acquire(0, deadline=clock())
+        limiter.release(success=True)
+    assert limiter.stats()["concurrency_limit"] == 3
+
+    for _ in range(100):
+        limiter.acquire(0, deadline=clock())
+        limiter.release(success=True)
+    assert limiter.stats()["concurrency_limit"] == 8
+
+
+def test_call_retries_after_rate_limit_and_transient_errors():
+    clock = FakeClock()
+    limiter = make_limiter(clock, max_retries=2)
+    errors = [APIError(429, {"retry-after-ms": "0"}), APIError(503)]
+
+    def fn():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert limiter.call(fn, 0, INTERACTIVE) == "ok"
+    stats = limiter.stats()
+    assert stats["throttled"] == 1
+    assert stats["retried"] == 2
+    assert stats["in_flight"] == 0
+    # 429 는 acquire 에서 Retry-After 만큼 기다리므로 sleep 하지 않고, 일시 오류만 백오프
+    assert len(clock.sleeps) == 2 and clock.sleeps[0] == 0.0 and 0.25 <= clock.sleeps[1] <= 0.5
+
+
+def test_call_gives_up_on_input_errors_and_after_max_retries():
+    clock = FakeClock()
+    limiter = make_limiter(clock, max_retries=1)
+    calls = []
+
+    def rejected():
+        calls.append("rejected")
+        raise APIError(400)
+
+    def unavailable():
+        calls.append("unavailable")
+        raise APIError(500)
+
+    with pytest.raises(APIError):
+        limiter.call(rejected, 0)
+    with pytest.raises(APIError):
+        limiter.call(unavailable, 0)
+
+    assert calls == ["rejected", "unavailable", "unavailable"]
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_timeout_while_paused_leaves_queue_empty():
+    clock = FakeClock()
+    # 다시 확인하기 전에 대기 한도를 넘으므로 기다리지 않고 바로 실패
+    limiter = make_limiter(clock, interactive_max_wait=0.2)
+    limiter.throttled(retry_after=10)
+
+    with pytest.raises(RateLimitTimeout):
+        limiter.call(lambda: "ok", 0, INTERACTIVE)
+
+    assert limiter.stats()["waiting"] == 0
+
+
+def test_interactive_runs_before_waiting_background():
+    limiter = RateLimiter("test", max_concurrency=1)
+    order = []
+    limiter.acquire(0)
+
+    def worker(name, priority):
+        limiter.acquire(0, priority, deadline=time.monotonic() + 5)
+        order.append(name)
+        limiter.release()
+
+    background = threading.Thread(target=worker, args=("background", BACKGROUND))
+    background.start()
+    wait_until(lambda: limiter.stats()["waiting"] == 1)
+    interactive = threading.Thread(target=worker, args=("interactive", INTERACTIVE))
+    interactive.start()
+    wait_until(lambda: limiter.stats()["waiting"] == 2)
+
+    limiter.release()
+    background.join(5)
+    interactive.join(5)
+
+    assert order == ["interactive", "background"]
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
@@ -0,0 +1,82 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from retrieval import dedupe_by_file, mmr_rerank
+
+QUERY = [1.0, 0.0, 0.0]
+
+
+def candidate(chunk_id, filename, vector):
+    return {"chunk_id": chunk_id, "filename": filename, "vector": vector}
+
+
+# a1/a2 는 질의와 가장 가깝지만 서로 거의 같고, b1 은 조금 덜 가깝지만 다른 방향
+CANDIDATES = [
+    candidate("a1", "a.txt", [1.0, 0.05, 0.0]),
+    candidate("a2", "b.txt", [1.0, 0.06, 0.0]),
+    candidate("b1", "c.txt", [0.8, 0.0, 0.6]),
+    candidate("c1", "d.txt", [0.1, 1.0, 0.0]),
+]
+
+
+def ids(results):
+    return [result["chunk_id"] for result in results]
+
+
+def test_lambda_one_is_pure_relevance():
+    assert ids(mmr_rerank(QUERY, CANDIDATES, 4, lambda_mult=1.0, max_per_file=0)) == ["a1", "a2", "b1", "c1"]
+
+
+def test_lambda_zero_prefers_diversity():
+    # 첫 선택은 redundancy 가 모두 0 이라 첫 후보, 이후로는 가장 다른 후보
+    results = ids(mmr_rerank(QUERY, CANDIDATES, 3, lambda_mult=0.0, max_per_file=0))
+
+    assert results[0] == "a1"
+    assert "a2" not in results
+
+
+def test_lower_lambda_skips_near_duplicate():
+    assert ids(mmr_rerank(QUERY, CANDIDATES, 2, lambda_mult=0.7, max_per_file=0)) == ["a1", "a2"]
+    assert "a2" not in ids(mmr_rerank(QUERY, CANDIDATES, 3, lambda_mult=0.3, max_per_file=0))
+
+
+def test_top_k_larger_than_candidates():
+    results = mmr_rerank(QUERY, CANDIDATES, 10)
+
+    assert sorted(ids(results)) == ["a1", "a2", "b1", "c1"]
+    assert mmr_rerank(QUERY, [], 3) == []
+    assert mmr_rerank(QUERY, CANDIDATES, 0) == []
+
+
+def test_file_limit_relaxed_when_top_k_not_filled():
+    same_file = [candidate(f"x{i}", "x.txt", [1.0, 0.1 * i, 0.0]) for i in range(3)] + [
+        candidate("y0", "y.txt", [0.0, 1.0, 0.0])
+    ]
+
+    results = ids(mmr_rerank(QUERY, same_file, 3, lambda_mult=1.0))
+
+    assert results[:2] == ["x0", "y0"]
+    assert results[2] == "x1"
+
+
+def test_missing_vectors_fall_back_to_dedupe():
+    candidates = [{"chunk_id": c["chunk_id"], "filename": "same.txt"} for c in CANDIDATES]
+
+    assert ids(mmr_rerank(QUERY, candidates, 2)) == ["a1", "a2"]
+
+
+def test_dedupe_by_file_keeps_rank_order():
+    candidates = [
+        {"chunk_id": "a1", "filename": "a"}, {"chunk_id": "a2", "filename": "a"},
+        {"chunk_id": "b1", "filename": "b"}, {"chunk_id": "a3", "filename": "a"},
+        {"chunk_id": "c1", "filename": "c"},
+    ]
+
+    assert ids(dedupe_by_file(candidates, 3)) == ["a1", "b1", "c1"]
+    # 모자라면 제외했던 후보를 원래 순위대로 채움
+    assert ids(dedupe_by_file(candidates, 5)) == ["a1", "b1", "c1", "a2", "a3"]
+    assert ids(dedupe_by_file(candidates, 4, max_per_file=2)) == ["a1", "a2", "b1", "c1"]
+    assert ids(dedupe_by_file(candidates, 2, max_per_file=0)) == ["a1", "a2"]
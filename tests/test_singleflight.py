@@ -0,0 +1,169 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from singleflight import SingleFlight, make_key
+
+WAITERS = 8
+
+
+class CountingUpstream:
+    """호출 수를 세고, release 될 때까지 응답을 붙잡아 두는 원본 호출 대역"""
+
+    def __init__(self, items=("요금제", "변경", "분석"), error=None):
+        self.items = list(items)
+        self.error = error
+        self.calls = 0
+        self.released = threading.Event()
+        self.produced = threading.Semaphore(0)
+
+    def call(self):
+        self.calls += 1
+        self.released.wait(5)
+        if self.error is not None:
+            raise self.error
+        return list(self.items)
+
+    def stream(self):
+        self.calls += 1
+        return self._iterate()
+
+    def _iterate(self):
+        for i, item in enumerate(self.items):
+            if i == 1:
+                # 첫 항목을 내보낸 뒤 release 될 때까지 멈춤 (늦게 합류한 구독자 확인용)
+                self.released.wait(5)
+            yield item
+            self.produced.release()
+        if self.error is not None:
+            raise self.error
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def run_threads(target, count=WAITERS):
+    results = [None] * count
+
+    def worker(i):
+        try:
+            results[i] = ("ok", target())
+        except Exception as e:
+            results[i] = ("error", e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def join(threads):
+    for thread in threads:
+        thread.join(5)
+        assert not thread.is_alive()
+
+
+def test_concurrent_calls_share_one_upstream_call():
+    flight = SingleFlight()
+    upstream = CountingUpstream()
+
+    threads, results = run_threads(lambda: flight.do("analysis", "k", upstream.call))
+    wait_for(lambda: flight.stats()["analysis"]["coalesced"] == WAITERS - 1)
+    upstream.released.set()
+    join(threads)
+
+    assert upstream.calls == 1
+    assert results == [("ok", ["요금제", "변경", "분석"])] * WAITERS
+    assert flight.stats()["analysis"] == {"executed": 1, "coalesced": WAITERS - 1, "in_flight": 0}
+
+    # 끝난 뒤의 호출은 다시 실행
+    flight.do("analysis", "k", upstream.call)
+    assert upstream.calls == 2
+
+
+def test_exception_reaches_all_waiters():
+    flight = SingleFlight()
+    error = ConnectionError("upstream failed")
+    upstream = CountingUpstream(error=error)
+
+    threads, results = run_threads(lambda: flight.do("analysis", "k", upstream.call))
+    wait_for(lambda: flight.stats()["analysis"]["coalesced"] == WAITERS - 1)
+    upstream.released.set()
+    join(threads)
+
+    assert upstream.calls == 1
+    assert all(status == "error" and raised is error for status, raised in results)
+    assert flight.stats()["analysis"]["in_flight"] == 0
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    upstream = CountingUpstream()
+    upstream.released.set()
+
+    flight.do("analysis", make_key("요금제  변경"), upstream.call)
+    flight.do("analysis", make_key("청구서"), upstream.call)
+
+    assert upstream.calls == 2
+    assert make_key("요금제  변경 ") == make_key("요금제 변경")
+
+
+def test_late_joiner_gets_full_stream():
+    flight = SingleFlight()
+    upstream = CountingUpstream()
+
+    first, leader = flight.stream("analysis", "k", upstream.stream)
+    assert leader
+    assert next(first) == "요금제"
+    assert upstream.produced.acquire(timeout=5)
+
+    # 원본이 첫 항목을 내보낸 뒤에 합류해도 처음부터 받음
+    late, late_leader = flight.stream("analysis", "k", upstream.stream)
+    upstream.released.set()
+
+    assert not late_leader
+    assert list(late) == ["요금제", "변경", "분석"]
+    assert list(first) == ["변경", "분석"]
+    assert upstream.calls == 1
+    wait_for(lambda: flight.stats()["analysis"]["in_flight"] == 0)
+
+
+def test_stream_error_reaches_every_subscriber():
+    flight = SingleFlight()
+    error = ConnectionError("stream reset")
+    upstream = CountingUpstream(error=error)
+
+    subscribers = [flight.stream("analysis", "k", upstream.stream)[0] for _ in range(3)]
+    upstream.released.set()
+
+    for subscriber in subscribers:
+        received = []
+        with pytest.raises(ConnectionError) as raised:
+            for item in subscriber:
+                received.append(item)
+        assert raised.value is error
+        assert received == ["요금제", "변경", "분석"]
+    assert upstream.calls == 1
+
+
+def test_abandoned_subscriber_does_not_block_others():
+    flight = SingleFlight()
+    upstream = CountingUpstream()
+
+    abandoned, _ = flight.stream("analysis", "k", upstream.stream)
+    other, _ = flight.stream("analysis", "k", upstream.stream)
+    assert next(abandoned) == "요금제"
+    abandoned.close()
+    upstream.released.set()
+
+    assert list(other) == ["요금제", "변경", "분석"]
@@ -0,0 +1,182 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# Prometheus 메트릭 이름 접두사
+METRIC_PREFIX = "kos_chatbot"
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Span:
+    """진행 중인 단계 하나 (종료 시 소요 시간과 수치 속성을 Tracer 에 기록)"""
+
+    def __init__(self, name: str, attributes: Dict):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.error = False
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration = 0.0
+
+    def set(self, **attributes):
+        """토큰 수, 바이트 수 등 속성 추가 (None 은 무시)"""
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+    def set_usage(self, usage):
+        """openai 응답의 usage(객체 또는 dict) 토큰 수 기록"""
+        if usage is None:
+            return
+        if not isinstance(usage, dict):
+            usage = usage.model_dump() if hasattr(usage, "model_dump") else vars(usage)
+        self.set(**{key: usage.get(key) for key in ("prompt_tokens", "completion_tokens", "total_tokens")})
+
+
+class StageStats:
+    """단계별 누적 통계"""
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.totals: Dict[str, float] = {}
+        self.durations = deque(maxlen=window)
+
+    def add(self, span: Span):
+        self.count += 1
+        self.errors += int(span.error)
+        self.total_seconds += span.duration
+        self.max_seconds = max(self.max_seconds, span.duration)
+        self.durations.append(span.duration)
+        for key, value in span.attributes.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.totals[key] = self.totals.get(key, 0) + value
+
+    def snapshot(self) -> Dict:
+        durations = sorted(self.durations)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_seconds": self.total_seconds,
+            "mean_seconds": self.total_seconds / self.count if self.count else 0.0,
+            "max_seconds": self.max_seconds,
+            "quantiles": {str(q): percentile(durations, q) for q in QUANTILES},
+            "totals": dict(self.totals)
+        }
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Tracer:
+    """단계별 소요 시간/토큰 사용량/페이로드 크기 수집 (스레드 안전)
+
+    사용 예:
+        with tracer.span("chat_completion", prompt_chars=1200) as span:
+            response = client.chat.completions.create(...)
+            span.set_usage(response.usage)
+    """
+
+    def __init__(self, window: int = 1024, recent: int = 200):
+        self.window = window
+        self.started_at = time.time()
+        self._stages: Dict[str, StageStats] = {}
+        self._recent = deque(maxlen=recent)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        span = Span(name, attributes)
+        try:
+            yield span
+        except Exception:
+            span.error = True
+            raise
+        finally:
+            span.duration = time.perf_counter() - span._start
+            self._record(span)
+
+    def record(self, name: str, duration: float, **attributes):
+        """이미 측정한 구간 기록 (스트리밍 응답처럼 with 블록으로 감쌀 수 없는 경우)"""
+        span = Span(name, {})
+        span.set(**attributes)
+        span.duration = duration
+        span.started_at -= duration
+        self._record(span)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._recent.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "stages": {name: stats.snapshot() for name, stats in sorted(self._stages.items())}
+            }
+
+    def recent_spans(self) -> List[Dict]:
+        """최근 단계 기록 (최신순)"""
+        with self._lock:
+            return list(reversed(self._recent))
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식"""
+        stages = self.snapshot()["stages"]
+        duration = f"{METRIC_PREFIX}_stage_duration_seconds"
+        lines = [
+            f"# HELP {duration} Stage latency in seconds.",
+            f"# TYPE {duration} summary"
+        ]
+        for name, stats in stages.items():
+            for q, value in stats["quantiles"].items():
+                lines.append(f'{duration}{{stage="{name}",quantile="{q}"}} {value}')
+            lines.append(f'{duration}_sum{{stage="{name}"}} {stats["total_seconds"]}')
+            lines.append(f'{duration}_count{{stage="{name}"}} {stats["count"]}')
+
+        errors = f"{METRIC_PREFIX}_stage_errors_total"
+        lines += [f"# HELP {errors} Failed stage executions.", f"# TYPE {errors} counter"]
+        lines += [f'{errors}{{stage="{name}"}} {stats["errors"]}' for name, stats in stages.items()]
+
+        # 토큰 수/바이트 수 등 수치 속성은 속성별 카운터로 노출
+        attributes = sorted({key for stats in stages.values() for key in stats["totals"]})
+        for key in attributes:
+            metric = f"{METRIC_PREFIX}_stage_{key}_total"
+            lines += [f"# HELP {metric} Sum of {key} per stage.", f"# TYPE {metric} counter"]
+            lines += [
+                f'{metric}{{stage="{name}"}} {stats["totals"][key]}'
+                for name, stats in stages.items() if key in stats["totals"]
+            ]
+        return "\n".join(lines) + "\n"
+
+    def _record(self, span: Span):
+        with self._lock:
+            stats = self._stages.get(span.name)
+            if stats is None:
+                stats = self._stages[span.name] = StageStats(self.window)
+            stats.add(span)
+            self._recent.append({
+                "stage": span.name,
+                "started_at": span.started_at,
+                "duration_ms": span.duration * 1000,
+                "error": span.error,
+                **span.attributes
+            })
+
+
+def payload_size(texts: Optional[List[str]]) -> int:
+    """UTF-8 기준 요청 본문 크기(바이트)"""
+    return sum(len(text.encode("utf-8")) for text in texts or [])